@@ -0,0 +1,286 @@
+"""
+Chunking and encoding benchmark for the large-file transcription path.
+
+Synthesizes meeting-length test audio and transcribes it with
+advanced_transcribe against the offline FakeOpenAI client, the way the app
+handles an upload over the Whisper limit: the upload is written to disk,
+measured, planned, encoded chunk by chunk, transcribed concurrently with a
+checkpoint and merged. For each case it records:
+
+- wall time of the whole run, and the time, count and bytes of each pipeline
+  stage from the spans it records (temp_write, decode, plan, encode, api_call,
+  merge); encode and api_call spans overlap when chunks run concurrently, so
+  their totals can exceed the wall time
+- peak RSS of the Python process
+- number of decode and encode passes (ffmpeg runs and pydub decodes/exports);
+  ffprobe runs are counted separately, and include the fake client reading
+  chunk durations
+- peak bytes in the temporary directory
+
+Each case runs in a fresh subprocess with its own temporary directory, so the
+peaks of one case never leak into the next. Results are written as JSON so
+runs can be compared across versions:
+
+    python benchmarks/bench_chunking.py --durations 10,60,180 --formats wav,mp3-32k,mp3-64k,mp3-128k
+    python benchmarks/bench_chunking.py --durations 10 --modes ffmpeg,pydub --output before.json
+
+Requires ffmpeg on PATH to synthesize the audio.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from common import benchmark_parser, write_results
+
+# Constants for the benchmark
+DEFAULT_DURATIONS_MIN = "10,60,180"  # Meeting lengths to synthesize
+DEFAULT_FORMATS = "wav,mp3-32k,mp3-64k,mp3-128k"  # Source formats to synthesize
+DEFAULT_MODES = "ffmpeg"  # ffmpeg (stream from disk) and/or pydub (decode in memory)
+SYNTH_SAMPLE_RATE = 16000  # Sample rate of the synthesized audio
+SYNTH_GAP_EVERY_SECONDS = 37  # A 2-second pause this often, so boundary snapping has gaps to find
+SAMPLE_INTERVAL_SECONDS = 0.02  # How often RSS and temp-directory size are sampled
+
+def synthesize_audio(path, duration_min, source_format):
+    """
+    Write a tone with regular pauses, standing in for speech.
+
+    Args:
+        path: Output file path
+        duration_min: Length in minutes
+        source_format: "wav" or "mp3-<bitrate>" (e.g. "mp3-64k")
+    """
+    if source_format == "wav":
+        codec = ["-c:a", "pcm_s16le"]
+    elif source_format.startswith("mp3-"):
+        codec = ["-c:a", "libmp3lame", "-b:a", source_format[4:]]
+    else:
+        raise ValueError(f"Unknown source format: {source_format}")
+
+    subprocess.run([
+        "ffmpeg", "-v", "error", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate={SYNTH_SAMPLE_RATE}:duration={duration_min * 60}",
+        "-af", f"volume='if(lt(mod(t,{SYNTH_GAP_EVERY_SECONDS}),{SYNTH_GAP_EVERY_SECONDS - 2}),0.5,0)':eval=frame",
+        "-ac", "1", *codec, path,
+    ], check=True)
+
+class ResourceSampler(threading.Thread):
+    """Samples RSS and temporary-directory size in the background, tracking the peak per stage."""
+
+    def __init__(self, temp_dir):
+        super().__init__(daemon=True)
+        self.temp_dir = temp_dir
+        self.stage = None
+        self.peaks = {}
+        self._stop_event = threading.Event()
+
+    @staticmethod
+    def _rss_bytes():
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def _temp_bytes(self):
+        total = 0
+        for root, _, files in os.walk(self.temp_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass  # Deleted while walking
+        return total
+
+    def sample(self):
+        if self.stage is None:
+            return
+        peaks = self.peaks.setdefault(self.stage, {"peak_rss_bytes": 0, "peak_temp_bytes": 0})
+        peaks["peak_rss_bytes"] = max(peaks["peak_rss_bytes"], self._rss_bytes())
+        peaks["peak_temp_bytes"] = max(peaks["peak_temp_bytes"], self._temp_bytes())
+
+    def run(self):
+        while not self._stop_event.wait(SAMPLE_INTERVAL_SECONDS):
+            self.sample()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+class PassCounter:
+    """Counts decode/encode passes by wrapping the ffmpeg helpers and pydub."""
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, name):
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def install(self):
+        import utils.ffmpeg as ffmpeg_module
+        from pydub import AudioSegment
+
+        original_run = ffmpeg_module._run
+        def counting_run(cmd):
+            if cmd[0] == ffmpeg_module.FFPROBE_BINARY:
+                self.add("probes")
+            elif "s16le" in cmd:
+                self.add("decodes")  # PCM analysis: decode only
+            else:
+                self.add("decodes")  # Every ffmpeg transcode decodes its input...
+                self.add("encodes")  # ...and encodes its output
+            return original_run(cmd)
+        ffmpeg_module._run = counting_run
+
+        original_from_file = AudioSegment.from_file.__func__
+        def counting_from_file(cls, *args, **kwargs):
+            self.add("decodes")
+            return original_from_file(cls, *args, **kwargs)
+        AudioSegment.from_file = classmethod(counting_from_file)
+
+        original_export = AudioSegment.export
+        def counting_export(segment, *args, **kwargs):
+            self.add("encodes")
+            return original_export(segment, *args, **kwargs)
+        AudioSegment.export = counting_export
+
+def run_case(audio_path, mode, latency, workers):
+    """
+    Transcribe one file with advanced_transcribe and measure the run.
+    Called in the benchmark subprocess; TMPDIR points at a fresh directory.
+
+    Returns:
+        Dictionary with per-stage span totals and case totals
+    """
+    counter = PassCounter()
+    counter.install()
+
+    from utils.transcribe import advanced_transcribe
+    from utils.checkpoint import ChunkCheckpoint
+    from utils.fake_openai import FakeOpenAI
+    from utils.instrumentation import trace, recent_spans, summarize_spans
+
+    sampler = ResourceSampler(tempfile.gettempdir())
+    sampler.stage = "transcribe"
+    sampler.start()
+
+    client = FakeOpenAI(latency=latency)
+    checkpoint = ChunkCheckpoint(os.path.join(tempfile.gettempdir(), "checkpoint"))
+    # Opened as a file object, like an upload, so writing it to disk is part of the run
+    with trace() as trace_id, open(audio_path, "rb") as audio_data:
+        started = time.perf_counter()
+        result = advanced_transcribe(client, audio_data, max_workers=workers, checkpoint=checkpoint)
+        wall_seconds = time.perf_counter() - started
+    sampler.sample()
+    sampler.stop()
+
+    spans = recent_spans([trace_id])
+    plan = next(record for record in spans if record["name"] == "plan")
+    chunk_encodes = [record for record in spans
+                     if record["name"] == "encode" and record["attributes"].get("kind") == "chunk"]
+    peaks = sampler.peaks.get("transcribe", {})
+    return {
+        "audio_minutes": round(plan["attributes"]["duration_ms"] / 60000, 2),
+        "source_bytes": os.path.getsize(audio_path),
+        "chunks": len(chunk_encodes),
+        "chunk_bytes": sum(record["attributes"].get("bytes", 0) for record in chunk_encodes),
+        "segments": len(result.segments),
+        "stages": {
+            row["name"]: {
+                "count": row["count"],
+                "total_seconds": round(row["total_seconds"], 4),
+                "max_seconds": round(row["max_seconds"], 4),
+                "bytes": row["bytes"],
+            }
+            for row in summarize_spans(spans)
+        },
+        "total": {
+            "wall_seconds": round(wall_seconds, 4),
+            "decodes": counter.counts.get("decodes", 0),
+            "encodes": counter.counts.get("encodes", 0),
+            "probes": counter.counts.get("probes", 0),
+            "peak_rss_bytes": peaks.get("peak_rss_bytes", 0),
+            "peak_temp_bytes": peaks.get("peak_temp_bytes", 0),
+            # ru_maxrss is in kilobytes on Linux
+            "peak_child_rss_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+        },
+    }
+
+def parse_args(argv=None):
+    parser = benchmark_parser("Benchmark chunking and encoding of long recordings.", "chunking_results.json")
+    parser.add_argument("--durations", default=DEFAULT_DURATIONS_MIN, help="Comma-separated meeting lengths in minutes")
+    parser.add_argument("--formats", default=DEFAULT_FORMATS, help="Comma-separated source formats (wav, mp3-<bitrate>)")
+    parser.add_argument("--modes", default=DEFAULT_MODES, help="Comma-separated modes: ffmpeg, pydub")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per transcription request")
+    parser.add_argument("--workers", type=int, default=4, help="Chunks transcribed concurrently")
+    parser.add_argument("--audio-dir", default=os.path.join(tempfile.gettempdir(), "meeting_tool_bench_audio"),
+                        help="Where synthesized audio is kept between runs")
+    parser.add_argument("--run-case", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.run_case:
+        # Child process: run one case and print its metrics as the last line
+        case = json.loads(args.run_case)
+        if case["mode"] == "pydub":
+            import utils.transcribe as transcribe
+            transcribe.ffmpeg_available = lambda: False
+        with open(os.devnull, "w") as devnull:
+            stdout = sys.stdout
+            sys.stdout = devnull  # Keep pipeline logging out of the result line
+            try:
+                metrics = run_case(case["audio_path"], case["mode"], case["latency"], case["workers"])
+            finally:
+                sys.stdout = stdout
+        print(json.dumps(metrics))
+        return 0
+
+    os.makedirs(args.audio_dir, exist_ok=True)
+    cases = []
+    for duration_min in [int(d) for d in args.durations.split(",")]:
+        for source_format in args.formats.split(","):
+            extension = "wav" if source_format == "wav" else "mp3"
+            audio_path = os.path.join(args.audio_dir, f"meeting_{duration_min}min_{source_format}.{extension}")
+            if not os.path.exists(audio_path):
+                print(f"Synthesizing {os.path.basename(audio_path)}")
+                synthesize_audio(audio_path, duration_min, source_format)
+
+            for mode in args.modes.split(","):
+                label = f"{duration_min}min {source_format} {mode}"
+                case_tmp = tempfile.mkdtemp(prefix="bench_case_")
+                try:
+                    completed = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--run-case", json.dumps({
+                            "audio_path": audio_path, "mode": mode,
+                            "latency": args.latency, "workers": args.workers,
+                        })],
+                        capture_output=True, text=True, env={**os.environ, "TMPDIR": case_tmp},
+                    )
+                finally:
+                    shutil.rmtree(case_tmp, ignore_errors=True)
+
+                case = {"duration_min": duration_min, "source_format": source_format, "mode": mode}
+                if completed.returncode == 0:
+                    case.update(json.loads(completed.stdout.strip().splitlines()[-1]))
+                    total = case["total"]
+                    print(f"{label:>24}: {total['wall_seconds']:7.2f}s  "
+                          f"rss {total['peak_rss_bytes'] / 2**20:7.1f} MB  "
+                          f"temp {total['peak_temp_bytes'] / 2**20:7.1f} MB  "
+                          f"decodes {total['decodes']}  encodes {total['encodes']}  chunks {case['chunks']}")
+                else:
+                    case["error"] = completed.stderr.strip()[-1000:]
+                    print(f"{label:>24}: failed ({case['error'].splitlines()[-1] if case['error'] else 'no output'})")
+                cases.append(case)
+
+    write_results("chunking", {"latency": args.latency, "workers": args.workers}, cases, args.output)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
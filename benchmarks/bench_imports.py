@@ -0,0 +1,133 @@
+"""
+Cold-start import benchmark for the app, CLI, HTTP service and job workers.
+
+Each entry point's imports run in a fresh interpreter with `python -X importtime`.
+For every entry point it records:
+
+- total import time (sum of the top-level imports)
+- the cumulative time of each heavy package that got loaded
+- wall time of the whole interpreter start-up
+
+For the Streamlit app, the top-level imports of main.py are read with ast and
+run on their own, because importing main.py would run the script.
+
+Heavy packages listed in LAZY_PACKAGES are only needed on specific code paths,
+such as reportlab for PDF exports or openai once a request is made. With
+--check, the benchmark exits with status 1 if an entry point loads one of them
+at start-up:
+
+    python benchmarks/bench_imports.py --repeats 5
+    python benchmarks/bench_imports.py --check
+"""
+import os
+import re
+import sys
+import ast
+import time
+import subprocess
+from common import REPO_ROOT, benchmark_parser, write_results
+
+# Constants for the benchmark
+DEFAULT_REPEATS = 5  # Cold starts per entry point; the fastest one is reported
+HEAVY_PACKAGES = (
+    "openai", "reportlab", "pydub", "numpy", "pandas", "pydantic", "tiktoken", "fastapi", "streamlit",
+)
+LAZY_PACKAGES = {
+    # Entry point -> heavy packages it must not load at start-up
+    "app": ("openai", "reportlab", "pydub", "tiktoken"),
+    "cli": ("openai", "reportlab", "pydub", "numpy", "tiktoken"),
+    "server": ("openai", "reportlab", "pydub", "numpy", "tiktoken"),
+    "worker": ("openai", "reportlab", "pydub", "numpy", "tiktoken", "streamlit"),
+}
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def app_imports():
+    """The top-level import statements of main.py, as source code."""
+    with open(os.path.join(REPO_ROOT, "main.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+def entry_points():
+    """Code run for each entry point."""
+    return {
+        "app": app_imports(),
+        "cli": "import cli",
+        "server": "import server",
+        # What a job worker needs to run the transcription and report pipeline
+        "worker": "import utils.pipeline, utils.report, utils.exports",
+    }
+
+def measure(code):
+    """
+    Run code in a fresh interpreter with -X importtime.
+
+    Returns:
+        Dictionary with total import time, wall time and heavy packages loaded
+    """
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    wall_seconds = time.perf_counter() - started
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    total_us = 0
+    packages = {}
+    parents = []  # (indent, top-level package) of the enclosing imports
+    # Modules are listed after the modules they import, so walk the output
+    # backwards to see each parent before its children
+    for line in reversed(completed.stderr.splitlines()):
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative_us, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        package = name.split(".")[0]
+        while parents and parents[-1][0] >= indent:
+            parents.pop()
+        if indent == 1:  # Imported directly by the entry point
+            total_us += cumulative_us
+        # Count a heavy package where another package first pulls it in, not again for its submodules
+        if package in HEAVY_PACKAGES and (not parents or parents[-1][1] != package):
+            packages[package] = packages.get(package, 0) + cumulative_us
+        parents.append((indent, package))
+
+    return {
+        "import_ms": round(total_us / 1000, 1),
+        "wall_ms": round(wall_seconds * 1000, 1),
+        "packages_ms": {name: round(us / 1000, 1) for name, us in sorted(packages.items())},
+    }
+
+def parse_args(argv=None):
+    parser = benchmark_parser("Measure cold-start import time of each entry point.", "import_results.json")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Cold starts per entry point")
+    parser.add_argument("--entry-points", default=",".join(LAZY_PACKAGES), help="Comma-separated entry points")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if an entry point loads a package it should load lazily")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    code_by_entry_point = entry_points()
+
+    cases = []
+    violations = []
+    for name in args.entry_points.split(","):
+        runs = [measure(code_by_entry_point[name]) for _ in range(args.repeats)]
+        best = min(runs, key=lambda run: run["import_ms"])
+        eager = sorted(set(best["packages_ms"]) & set(LAZY_PACKAGES.get(name, ())))
+        cases.append({"entry_point": name, **best, "all_import_ms": [run["import_ms"] for run in runs],
+                      "eager_lazy_packages": eager})
+        violations += [f"{name} loads {package} at start-up" for package in eager]
+        heavy = ", ".join(f"{package} {ms:.0f}ms" for package, ms in best["packages_ms"].items()) or "none"
+        print(f"{name:>8}: imports {best['import_ms']:7.1f} ms  wall {best['wall_ms']:7.1f} ms  heavy: {heavy}")
+
+    write_results("imports", {"repeats": args.repeats}, cases, args.output)
+
+    for violation in violations:
+        print(f"Not lazy: {violation}")
+    return 1 if args.check and violations else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
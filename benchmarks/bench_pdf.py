@@ -0,0 +1,136 @@
+"""
+PDF rendering benchmark for large meeting reports.
+
+Builds synthetic MeetingReports with 10 to 5,000 items (takeaways, summary
+points and action items, including text with markup characters), renders each
+one with utils.pdf and records:
+
+- time to build the flowables and time to lay out and write the PDF
+- peak Python memory allocated during the render (tracemalloc; measured in
+  a separate render because tracing slows rendering down several times)
+- PDF size
+
+The first render in the process also pays for building the shared styles; it
+is reported separately as "first_render_seconds". Results are written as JSON
+so runs can be compared across versions:
+
+    python benchmarks/bench_pdf.py --items 10,100,1000,5000 --repeats 3
+"""
+import io
+import sys
+import time
+import tracemalloc
+from common import benchmark_parser, write_results
+
+# Constants for the benchmark
+DEFAULT_ITEMS = "10,100,1000,5000"  # Total items per synthetic report
+DEFAULT_REPEATS = 3  # Renders per size; the fastest one is reported
+POINTS_PER_SECTION = 10  # Summary points in each detailed-summary section
+ITEM_TEXT = "Review the Q3 budget & timeline <draft> with the design team before the launch review"
+
+def synthetic_report(items):
+    """
+    Build a valid MeetingReport dictionary with about `items` items:
+    10% takeaways, 60% summary points and 30% action items.
+    """
+    from utils.report_model import MeetingReport
+
+    takeaways = max(1, items // 10)
+    action_items = max(1, items * 3 // 10)
+    points = max(1, items - takeaways - action_items)
+    sections = [
+        {
+            "section_title": f"Topic {start // POINTS_PER_SECTION + 1}: {ITEM_TEXT[:30]}",
+            "points": [f"{ITEM_TEXT} ({i + 1})" for i in range(start, min(points, start + POINTS_PER_SECTION))],
+        }
+        for start in range(0, points, POINTS_PER_SECTION)
+    ]
+    report = {
+        "meeting_name": "All-hands <quarterly> review & planning",
+        "purpose": ITEM_TEXT,
+        "takeaways": [f"{ITEM_TEXT} ({i + 1})" for i in range(takeaways)],
+        "detailed_summary": sections,
+        "action_items": [
+            {"assignee": f"Owner {i % 25}", "title": f"Follow up {i + 1}", "description": ITEM_TEXT}
+            for i in range(action_items)
+        ],
+    }
+    return MeetingReport.model_validate(report).model_dump()
+
+def render_once(report_data):
+    """Render the report once and return its timings and size."""
+    from reportlab.platypus import SimpleDocTemplate
+    from utils.pdf import build_report_story, PDF_PAGE_SIZE, PDF_MARGIN
+
+    started = time.perf_counter()
+    story = build_report_story(report_data)
+    story_seconds = time.perf_counter() - started
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=PDF_PAGE_SIZE, rightMargin=PDF_MARGIN, leftMargin=PDF_MARGIN,
+                            topMargin=PDF_MARGIN, bottomMargin=PDF_MARGIN)
+    started = time.perf_counter()
+    doc.build(story)
+    build_seconds = time.perf_counter() - started
+
+    return {
+        "story_seconds": round(story_seconds, 4),
+        "build_seconds": round(build_seconds, 4),
+        "total_seconds": round(story_seconds + build_seconds, 4),
+        "pdf_bytes": len(buffer.getvalue()),
+        "pages": doc.page,
+    }
+
+def peak_alloc_bytes(report_data):
+    """Peak Python memory allocated while rendering the report."""
+    from utils.pdf import render_pdf
+
+    tracemalloc.start()
+    try:
+        render_pdf(report_data)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def parse_args(argv=None):
+    parser = benchmark_parser("Benchmark PDF rendering of large meeting reports.", "pdf_results.json")
+    parser.add_argument("--items", default=DEFAULT_ITEMS, help="Comma-separated report sizes (total items)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Renders per size")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # The first render builds the shared styles; time it on its own
+    started = time.perf_counter()
+    render_once(synthetic_report(1))
+    first_render_seconds = round(time.perf_counter() - started, 4)
+
+    cases = []
+    for items in [int(n) for n in args.items.split(",")]:
+        report_data = synthetic_report(items)
+        runs = [render_once(report_data) for _ in range(args.repeats)]
+        best = min(runs, key=lambda run: run["total_seconds"])
+        case = {
+            "items": items,
+            **best,
+            "all_total_seconds": [run["total_seconds"] for run in runs],
+            "peak_alloc_bytes": peak_alloc_bytes(report_data),
+        }
+        cases.append(case)
+        print(f"{items:>6} items: {best['total_seconds']:7.3f}s  "
+              f"(story {best['story_seconds']:.3f}s, build {best['build_seconds']:.3f}s)  "
+              f"peak {case['peak_alloc_bytes'] / 2**20:6.1f} MB  "
+              f"{best['pages']} pages  {best['pdf_bytes'] / 1024:.0f} KB")
+
+    write_results(
+        "pdf",
+        {"repeats": args.repeats},
+        cases,
+        args.output,
+        first_render_seconds=first_render_seconds,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Streamed report parsing benchmark.
+
+Builds synthetic report JSON of 7 KB to 56 KB, feeds it to the
+PartialJSONParser in small deltas (as the Responses API streams it), and
+records for each size:
+
+- CPU time spent in feed() for the whole response
+- CPU time per KB of response
+- how many feeds changed the parsed value (each one re-renders the preview)
+
+Parsing is meant to be linear in the response size, so the time per KB should
+stay flat as reports grow. With --check, the benchmark exits with status 1 if
+the time per KB of the largest report is more than MAX_PER_KB_GROWTH times
+that of the smallest one, or if the parsed value differs from json.loads:
+
+    python benchmarks/bench_streaming.py --sizes 7,28,56 --delta-chars 4
+    python benchmarks/bench_streaming.py --check
+"""
+import sys
+import json
+import time
+from common import benchmark_parser, write_results
+
+# Constants for the benchmark
+DEFAULT_SIZES = "7,28,56"  # Report sizes in KB
+DEFAULT_DELTA_CHARS = 4  # Roughly one token per streamed delta
+DEFAULT_REPEATS = 3  # Runs per size; the fastest one is reported
+MAX_PER_KB_GROWTH = 2.0  # Allowed growth of the time per KB from the smallest to the largest report
+POINTS_PER_SECTION = 10  # Summary points in each detailed-summary section
+ITEM_TEXT = "Review the Q3 budget \"draft\" and timeline with the design team before the launch review"
+
+def synthetic_report_json(size_kb):
+    """Build report JSON with the MeetingReport fields, at least size_kb kilobytes long."""
+    report = {
+        "meeting_name": "All-hands quarterly review & planning",
+        "purpose": ITEM_TEXT,
+        "takeaways": [],
+        "detailed_summary": [],
+        "action_items": [],
+    }
+    i = 0
+    while len(json.dumps(report)) < size_kb * 1024:
+        i += 1
+        report["takeaways"].append(f"{ITEM_TEXT} ({i})")
+        if not report["detailed_summary"] or len(report["detailed_summary"][-1]["points"]) == POINTS_PER_SECTION:
+            report["detailed_summary"].append({"section_title": f"Topic {i}", "points": []})
+        report["detailed_summary"][-1]["points"].extend(f"{ITEM_TEXT} ({i}.{n})" for n in range(6))
+        report["action_items"].append({"assignee": f"Owner {i % 25}", "title": f"Follow up {i}",
+                                       "description": ITEM_TEXT})
+    return json.dumps(report)
+
+def parse_once(text, delta_chars):
+    """Feed the text in deltas and return the CPU time, number of changes and final value."""
+    from utils.streaming import PartialJSONParser
+
+    parser = PartialJSONParser()
+    deltas = [text[i:i + delta_chars] for i in range(0, len(text), delta_chars)]
+    changes = 0
+    started = time.process_time()
+    for delta in deltas:
+        if parser.feed(delta):
+            changes += 1
+    return time.process_time() - started, changes, parser.value
+
+def parse_args(argv=None):
+    parser = benchmark_parser("Benchmark incremental parsing of streamed report JSON.", "streaming_results.json")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated report sizes in KB")
+    parser.add_argument("--delta-chars", type=int, default=DEFAULT_DELTA_CHARS, help="Characters per streamed delta")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Runs per size")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit with status 1 if parsing is not linear in the report size or the result is wrong")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    cases = []
+    failures = []
+    for size_kb in [int(n) for n in args.sizes.split(",")]:
+        text = synthetic_report_json(size_kb)
+        runs = [parse_once(text, args.delta_chars) for _ in range(args.repeats)]
+        seconds, changes, value = min(runs, key=lambda run: run[0])
+        if value != json.loads(text):
+            failures.append(f"{size_kb} KB: parsed value differs from json.loads")
+        case = {
+            "size_kb": size_kb,
+            "bytes": len(text),
+            "deltas": -(-len(text) // args.delta_chars),
+            "changes": changes,
+            "cpu_seconds": round(seconds, 4),
+            "all_cpu_seconds": [round(run[0], 4) for run in runs],
+            "cpu_ms_per_kb": round(seconds * 1000 / (len(text) / 1024), 4),
+        }
+        cases.append(case)
+        print(f"{size_kb:>5} KB: {case['cpu_seconds']:7.3f}s CPU  {case['cpu_ms_per_kb']:6.3f} ms/KB  "
+              f"{case['deltas']} deltas, {changes} re-renders")
+
+    if len(cases) > 1:
+        growth = cases[-1]["cpu_ms_per_kb"] / max(cases[0]["cpu_ms_per_kb"], 1e-9)
+        print(f"Time per KB grew {growth:.2f}x from {cases[0]['size_kb']} KB to {cases[-1]['size_kb']} KB")
+        if growth > MAX_PER_KB_GROWTH:
+            failures.append(f"time per KB grew {growth:.2f}x (limit {MAX_PER_KB_GROWTH}x)")
+
+    write_results(
+        "streaming",
+        {"delta_chars": args.delta_chars, "repeats": args.repeats},
+        cases,
+        args.output,
+        failures=failures,
+    )
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if args.check and failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
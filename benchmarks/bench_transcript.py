@@ -0,0 +1,181 @@
+"""
+Transcript merge and cleaning benchmark for long, chunked meetings.
+
+Replays prebuilt Whisper verbose_json responses (with token lists and decoder
+statistics, as the API returns them) through the chunked transcription path
+and records for 1,000 to 20,000 segments:
+
+- time to merge the chunk results (process_audio_chunks)
+- time to serialize the raw transcription and to clean it
+- peak Python memory allocated by the three stages (tracemalloc; measured in
+  a separate run because tracing slows them down)
+- memory still held by the raw and cleaned results afterwards
+
+No audio is decoded and no API is called, so the numbers only cover the
+transcript handling itself. Results are written as JSON so runs can be
+compared across versions:
+
+    python benchmarks/bench_transcript.py --segments 1000,10000,20000 --repeats 3
+"""
+import os
+import sys
+import gc
+import json
+import logging
+import time
+import tempfile
+import tracemalloc
+from common import benchmark_parser, write_results
+
+# Constants for the benchmark
+DEFAULT_SEGMENTS = "1000,10000,20000"  # Total segments per synthetic meeting
+DEFAULT_REPEATS = 3  # Runs per size; the fastest one is reported
+SEGMENTS_PER_CHUNK = 500  # Roughly what Whisper returns for one 25MB chunk of speech
+SEGMENT_SECONDS = 4.0  # Length of each synthetic segment
+TOKENS_PER_SEGMENT = 30  # Token ids the API returns with every segment
+REPLAY_REQUESTS_PER_MINUTE = 10 ** 9  # Replayed chunks are not paced like real API requests
+SEGMENT_TEXT = " Let's review the launch timeline and the budget for next quarter."
+
+class ReplayClient:
+    """Stands in for the OpenAI client and returns a prebuilt response for each chunk file."""
+
+    def __init__(self, responses):
+        self.responses = responses  # Chunk path -> response
+        self.audio = self
+        self.transcriptions = self
+
+    def create(self, model, file, **options):
+        return self.responses[file.name]
+
+def synthetic_responses(segments):
+    """
+    Build one verbose_json response per chunk, with chunk-relative timestamps.
+
+    Returns:
+        List of (chunk duration in seconds, response) tuples
+    """
+    from openai.types.audio import TranscriptionVerbose, TranscriptionSegment
+
+    responses = []
+    for first in range(0, segments, SEGMENTS_PER_CHUNK):
+        count = min(SEGMENTS_PER_CHUNK, segments - first)
+        chunk_segments = [
+            TranscriptionSegment(
+                id=i, seek=0, start=i * SEGMENT_SECONDS, end=(i + 1) * SEGMENT_SECONDS, text=SEGMENT_TEXT,
+                tokens=list(range(50000, 50000 + TOKENS_PER_SEGMENT)), temperature=0.0,
+                avg_logprob=-0.2, compression_ratio=1.4, no_speech_prob=0.01,
+            )
+            for i in range(count)
+        ]
+        responses.append((count * SEGMENT_SECONDS, TranscriptionVerbose(
+            duration=count * SEGMENT_SECONDS, language="english", text=SEGMENT_TEXT * count, segments=chunk_segments,
+        )))
+    return responses
+
+def run_stages(responses, timings=None):
+    """
+    Merge, serialize and clean the chunk responses.
+
+    Args:
+        responses: Result of synthetic_responses
+        timings: Optional dict that receives the time of each stage
+
+    Returns:
+        Tuple of (raw, cleaned) transcripts
+    """
+    from utils.transcribe import process_audio_chunks, _chunk_info
+    from utils.cache import serialize_transcription
+    from utils.exports import clean_transcript
+
+    # _transcribe_chunk deletes each chunk file, so every run gets new ones
+    chunk_files = []
+    replies = {}
+    start_ms = 0
+    for duration, response in responses:
+        fd, path = tempfile.mkstemp(suffix=".mp3")
+        os.close(fd)
+        chunk_files.append(_chunk_info(path, start_ms, int(duration * 1000)))
+        # Responses are mutated by the merge, so each run replays a copy
+        replies[path] = response.model_copy(update={"segments": list(response.segments)})
+        start_ms += int(duration * 1000)
+
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    combined = process_audio_chunks(ReplayClient(replies), chunk_files)
+    timings["merge_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    raw = serialize_transcription(combined)
+    timings["serialize_seconds"] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    cleaned = clean_transcript(combined)
+    timings["clean_seconds"] = round(time.perf_counter() - started, 4)
+    timings["total_seconds"] = round(sum(timings[key] for key in ("merge_seconds", "serialize_seconds",
+                                                                  "clean_seconds")), 4)
+    return raw, cleaned
+
+def memory_usage(responses):
+    """Peak memory allocated by the stages, and memory still held by their results."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        results = run_stages(responses)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        del results
+        return peak, retained
+    finally:
+        tracemalloc.stop()
+
+def parse_args(argv=None):
+    parser = benchmark_parser("Benchmark merging and cleaning of long chunked transcripts.", "transcript_results.json")
+    parser.add_argument("--segments", default=DEFAULT_SEGMENTS, help="Comma-separated transcript sizes (segments)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Runs per size")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Only the benchmark's own output is of interest, and replayed responses need no request pacing
+    from utils import retry
+    logging.disable(logging.WARNING)
+    retry.RATE_LIMITS_PER_MINUTE["audio"] = REPLAY_REQUESTS_PER_MINUTE
+
+    cases = []
+    for segments in [int(n) for n in args.segments.split(",")]:
+        responses = synthetic_responses(segments)
+        runs = []
+        for _ in range(args.repeats):
+            timings = {}
+            raw, cleaned = run_stages(responses, timings)
+            runs.append(timings)
+        best = min(runs, key=lambda run: run["total_seconds"])
+        peak, retained = memory_usage(responses)
+        case = {
+            "segments": segments,
+            "chunks": len(responses),
+            **best,
+            "all_total_seconds": [run["total_seconds"] for run in runs],
+            "peak_alloc_bytes": peak,
+            "retained_bytes": retained,
+            "cleaned_segments": len(cleaned["segments"]),
+            "raw_json_bytes": len(json.dumps(raw)),
+        }
+        cases.append(case)
+        print(f"{segments:>6} segments: {best['total_seconds']:7.3f}s  "
+              f"(merge {best['merge_seconds']:.3f}s, serialize {best['serialize_seconds']:.3f}s, "
+              f"clean {best['clean_seconds']:.3f}s)  peak {peak / 2**20:6.1f} MB  "
+              f"retained {retained / 2**20:6.1f} MB  raw JSON {case['raw_json_bytes'] / 2**20:.1f} MB")
+
+    write_results(
+        "transcript",
+        {"repeats": args.repeats, "segments_per_chunk": SEGMENTS_PER_CHUNK, "tokens_per_segment": TOKENS_PER_SEGMENT},
+        cases,
+        args.output,
+    )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark takes an --output path and writes one JSON results file with
+the same run metadata (commit, Python version, platform), so runs can be
+compared across versions and machines.
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+def git_commit():
+    """Return the commit the benchmark ran against, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+def benchmark_parser(description, output):
+    """
+    Build an argument parser with the options every benchmark takes.
+
+    Args:
+        description: Description shown by --help
+        output: Default results file name
+
+    Returns:
+        argparse.ArgumentParser to add the benchmark's own options to
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--output", default=output, help="Results file")
+    return parser
+
+def write_results(name, settings, cases, path, **extra):
+    """
+    Write a benchmark's results with the run metadata as JSON.
+
+    Args:
+        name: Benchmark name, e.g. "pdf"
+        settings: Options the cases were run with
+        cases: One dict of measurements per case
+        path: Results file
+        **extra: Additional top-level fields
+
+    Returns:
+        The results dictionary that was written
+    """
+    results = {
+        "benchmark": name,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        **extra,
+        "cases": cases,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+    return results
@@ -0,0 +1,239 @@
+"""
+Command-line batch processing for the Meeting Transcription Tool.
+
+Transcribes every recording in a directory (or matching a glob), generates the
+structured report and writes the requested exports, without Streamlit:
+
+    OPENAI_API_KEY=sk-... python cli.py recordings/ --output-dir reports/
+    python cli.py "recordings/*.mp3" --file-workers 4 --chunk-workers 2 --formats json,markdown
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from utils.transcribe import MAX_UPLOAD_SIZE_MB, BYTES_PER_MB, TRANSCRIBE_MAX_WORKERS
+from utils.pipeline import transcribe_audio
+from utils.audio_source import AudioSource
+from utils.report import generate_report, REPORT_MAX_WORKERS
+from utils.exports import render_report
+from utils.instrumentation import configure_logging
+
+# Constants for batch processing
+AUDIO_EXTENSIONS = (".mp3", ".wav")  # Same formats the web app accepts
+FILE_WORKERS = 2  # Recordings processed at the same time
+EXPORT_SUFFIXES = {
+    "json": ".report.json",
+    "markdown": ".report.md",
+    "pdf": ".report.pdf",
+}
+TRANSCRIPT_SUFFIX = ".transcript.json"
+SUMMARY_FILENAME = "summary.json"
+COVERAGE_WARNING_THRESHOLD = 0.9  # Transcripts covering less of the recording are flagged in the summary
+
+def find_recordings(inputs):
+    """
+    Expand directories and glob patterns into a sorted list of audio files.
+
+    Args:
+        inputs: Directory paths, file paths or glob patterns
+
+    Returns:
+        Sorted list of unique audio file paths
+    """
+    paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern, recursive=True)
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(AUDIO_EXTENSIONS):
+                paths.add(os.path.abspath(path))
+    return sorted(paths)
+
+def output_stem(audio_path):
+    """Name the outputs after the full file name, so meeting.mp3 and meeting.wav stay apart."""
+    return os.path.basename(audio_path)
+
+def find_duplicate_stems(recordings):
+    """
+    Find recordings from different directories that would write the same output files.
+
+    Args:
+        recordings: Audio file paths from find_recordings
+
+    Returns:
+        Dictionary mapping each shared output stem to the recordings that use it
+    """
+    by_stem = {}
+    for path in recordings:
+        by_stem.setdefault(output_stem(path), []).append(path)
+    return {stem: paths for stem, paths in by_stem.items() if len(paths) > 1}
+
+def output_paths(audio_path, output_dir, formats):
+    """Return the transcript and export paths for one recording."""
+    stem = output_stem(audio_path)
+    outputs = {"transcript": os.path.join(output_dir, stem + TRANSCRIPT_SUFFIX)}
+    for export_format in formats:
+        outputs[export_format] = os.path.join(output_dir, stem + EXPORT_SUFFIXES[export_format])
+    return outputs
+
+def process_recording(client, audio_path, output_dir, formats, chunk_workers, report_workers,
+                      optimize_speech=True, force=False):
+    """
+    Run the full pipeline for one recording and write its outputs.
+
+    Args:
+        client: OpenAI client instance
+        audio_path: Path to the recording
+        output_dir: Directory the transcript and exports are written to
+        formats: Export formats to write (keys of EXPORT_SUFFIXES); empty to skip the report
+        chunk_workers: Maximum number of chunks transcribed concurrently
+        report_workers: Maximum number of transcript windows summarized concurrently
+        optimize_speech: Re-encode files over the Whisper limit as compact speech audio
+        force: Process the recording even if all its outputs already exist
+
+    Returns:
+        Dictionary with the file, its status and the time spent in each stage
+    """
+    outputs = output_paths(audio_path, output_dir, formats)
+    timing = {"file": audio_path, "status": "done"}
+    if not force and all(os.path.exists(path) for path in outputs.values()):
+        timing["status"] = "skipped"
+        return timing
+
+    started = time.perf_counter()
+    try:
+        if os.path.getsize(audio_path) > MAX_UPLOAD_SIZE_MB * BYTES_PER_MB:
+            raise Exception(f"File is larger than {MAX_UPLOAD_SIZE_MB}MB")
+
+        # Every stage reads the recording in place; it is never copied to a temp file
+        result = transcribe_audio(client, AudioSource.from_path(audio_path), optimize_speech=optimize_speech,
+                                  max_workers=chunk_workers)
+        with open(outputs["transcript"], "w", encoding="utf-8") as f:
+            json.dump(result["cleaned"], f, indent=2)
+        timing["transcribe_seconds"] = round(time.perf_counter() - started, 2)
+        if result.get("coverage") is not None:
+            timing["coverage"] = round(result["coverage"], 3)
+        if result.get("text_only_chunks"):
+            timing["text_only_chunks"] = result["text_only_chunks"]
+
+        if formats:
+            stage_started = time.perf_counter()
+            report_data = generate_report(client, result["cleaned"], max_workers=report_workers).model_dump()
+            timing["report_seconds"] = round(time.perf_counter() - stage_started, 2)
+
+            stage_started = time.perf_counter()
+            for export_format in formats:
+                with open(outputs[export_format], "wb") as f:
+                    f.write(render_report(report_data, export_format))
+            timing["export_seconds"] = round(time.perf_counter() - stage_started, 2)
+    except Exception as e:
+        timing["status"] = "failed"
+        timing["error"] = str(e)
+
+    timing["total_seconds"] = round(time.perf_counter() - started, 2)
+    return timing
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe and summarize a batch of meeting recordings.")
+    parser.add_argument("inputs", nargs="+", help="Directories, audio files or glob patterns (quote globs)")
+    parser.add_argument("--output-dir", default="output", help="Where transcripts, reports and the summary are written")
+    parser.add_argument("--formats", default="json,markdown,pdf",
+                        help="Comma-separated export formats (json, markdown, pdf), or 'none' for transcripts only")
+    parser.add_argument("--file-workers", type=int, default=FILE_WORKERS, help="Recordings processed at the same time")
+    parser.add_argument("--chunk-workers", type=int, default=TRANSCRIBE_MAX_WORKERS,
+                        help="Chunks of one recording transcribed at the same time")
+    parser.add_argument("--report-workers", type=int, default=REPORT_MAX_WORKERS,
+                        help="Transcript windows of one recording summarized at the same time")
+    parser.add_argument("--no-speech-optimize", action="store_true",
+                        help="Do not re-encode large files as compact speech audio")
+    parser.add_argument("--fake-api", action="store_true",
+                        help="Use the offline fake OpenAI client (synthetic output, no API key needed)")
+    parser.add_argument("--force", action="store_true", help="Reprocess recordings whose outputs already exist")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_logging()
+
+    formats = [] if args.formats == "none" else [f.strip().lower() for f in args.formats.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in EXPORT_SUFFIXES]
+    if unknown:
+        print(f"Unknown export format(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key and not args.fake_api:
+        print("Set the OPENAI_API_KEY environment variable.", file=sys.stderr)
+        return 2
+
+    recordings = find_recordings(args.inputs)
+    if not recordings:
+        print("No .mp3 or .wav recordings found.", file=sys.stderr)
+        return 1
+
+    # Two workers writing the same outputs would overwrite each other and both count as done next run
+    duplicates = find_duplicate_stems(recordings)
+    if duplicates:
+        print("Recordings with the same file name would write the same outputs:", file=sys.stderr)
+        for paths in duplicates.values():
+            print("  " + ", ".join(paths), file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.fake_api:
+        from utils.fake_openai import FakeOpenAI
+        client = FakeOpenAI()
+    else:
+        from openai import OpenAI
+        # Retries are handled by utils.retry, so the client's own retries are disabled
+        client = OpenAI(api_key=api_key, max_retries=0)
+
+    print(f"Processing {len(recordings)} recordings ({args.file_workers} at a time)")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.file_workers) as executor:
+        results = list(executor.map(
+            lambda path: process_recording(
+                client,
+                path,
+                args.output_dir,
+                formats,
+                args.chunk_workers,
+                args.report_workers,
+                optimize_speech=not args.no_speech_optimize,
+                force=args.force,
+            ),
+            recordings
+        ))
+    wall_seconds = round(time.perf_counter() - started, 2)
+
+    summary = {"wall_seconds": wall_seconds, "files": results}
+    with open(os.path.join(args.output_dir, SUMMARY_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
+
+    for result in results:
+        line = f"{result['status']:>8}  {os.path.basename(result['file'])}"
+        if "total_seconds" in result:
+            line += (
+                f"  transcribe {result.get('transcribe_seconds', 0):.1f}s"
+                f"  report {result.get('report_seconds', 0):.1f}s"
+                f"  export {result.get('export_seconds', 0):.1f}s"
+                f"  total {result['total_seconds']:.1f}s"
+            )
+        if result.get("coverage", 1) < COVERAGE_WARNING_THRESHOLD:
+            line += f"  [coverage {result['coverage']*100:.0f}%]"
+        if result.get("text_only_chunks"):
+            line += f"  [chunks {', '.join(map(str, result['text_only_chunks']))} text only]"
+        if "error" in result:
+            line += f"  ({result['error']})"
+        print(line)
+    print(f"Finished in {wall_seconds:.1f}s")
+
+    return 1 if any(result["status"] == "failed" for result in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
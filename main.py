@@ -1,13 +1,30 @@
+import io
 import os
-import json
+import uuid
 import streamlit as st
-from openai import OpenAI
 from datetime import datetime
 
-from utils.report_model import MeetingReport
-from utils.transcribe import simple_transcribe, advanced_transcribe
-from utils.transcribe import MAX_UPLOAD_SIZE_MB, WHISPER_SIZE_LIMIT_MB
-from utils.exports import clean_transcript, export_to_json, export_to_pdf, export_to_markdown
+from utils.transcribe import MAX_UPLOAD_SIZE_MB
+from utils.cache import get_transcription_cache
+from utils.pipeline import transcribe_audio, transcription_key
+from utils.report import generate_report
+from utils.prompt import encode_transcript, count_tokens
+from utils.transcript import Transcript
+from utils.jobs import get_job_manager, QueueFullError
+from utils.exports import render_report
+from utils.instrumentation import configure_logging, span, trace, recent_spans, summarize_spans, prometheus_text
+
+configure_logging()
+
+# File extension and MIME type of each export format
+EXPORT_FORMATS = {
+    "JSON": (".json", "application/json"),
+    "Markdown": (".md", "text/markdown"),
+    "PDF": (".pdf", "application/pdf"),
+}
+
+# Transcripts covering less of the recording than this are flagged in the UI
+COVERAGE_WARNING_THRESHOLD = 0.9
 
 # Initialize session state
 if 'audio_data' not in st.session_state:
@@ -16,14 +33,139 @@ if 'raw_transcript' not in st.session_state:
     st.session_state.raw_transcript = None
 if 'cleaned_transcript' not in st.session_state:
     st.session_state.cleaned_transcript = None
+if 'transcript' not in st.session_state:
+    # Columnar copy of the cleaned transcript that the transcript views read from
+    st.session_state.transcript = None
+    st.session_state.transcript_tokens = 0
 if 'report' not in st.session_state:
     st.session_state.report = None
+if 'transcription_job' not in st.session_state:
+    # The job ID is also kept in the URL so a browser refresh can pick the job up again
+    st.session_state.transcription_job = st.query_params.get("job")
+if 'transcription_error' not in st.session_state:
+    # Set by the job fragment, which reruns the app so the message is shown outside it
+    st.session_state.transcription_error = None
+if 'transcription_warning' not in st.session_state:
+    # Coverage gaps of the last finished transcription
+    st.session_state.transcription_warning = None
+if 'session_trace' not in st.session_state:
+    # Spans from this session (report, exports) and from its transcription jobs
+    st.session_state.session_trace = uuid.uuid4().hex
+    st.session_state.trace_ids = [st.session_state.session_trace]
+    if st.session_state.transcription_job:
+        st.session_state.trace_ids.append(st.session_state.transcription_job)
 
 st.set_page_config(page_title="Meeting Transcription Tool", page_icon=":memo:")
 
-# Load OpenAI API key from Streamlit secrets
-OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
-client = OpenAI(api_key=OPENAI_API_KEY)
+@st.cache_resource
+def get_client():
+    """
+    Build the API client once per process; every session and rerun shares it
+    (and its connection pool). The openai package is only imported here, the
+    first time a transcription or report needs it.
+    """
+    if os.environ.get("MEETING_TOOL_FAKE_OPENAI"):
+        # Offline mode for demos and benchmarks: synthetic transcripts and reports, no API key needed
+        from utils.fake_openai import FakeOpenAI
+        return FakeOpenAI()
+    from openai import OpenAI
+    # Load OpenAI API key from Streamlit secrets
+    OPENAI_API_KEY = st.secrets["OPENAI_API_KEY"]
+    # Retries are handled by utils.retry, so the client's own retries are disabled
+    return OpenAI(api_key=OPENAI_API_KEY, max_retries=0)
+
+def set_transcription_result(result):
+    """
+    Store a finished transcription in the session. The columnar transcript and
+    its prompt size are computed once here instead of on every rerun.
+    """
+    st.session_state.raw_transcript = result["raw"]
+    st.session_state.cleaned_transcript = result["cleaned"]
+    st.session_state.transcript = Transcript.from_cleaned(result["cleaned"])
+    # Size of the compact transcript encoding that the report requests send
+    st.session_state.transcript_tokens = count_tokens(encode_transcript(st.session_state.transcript))
+    
+    # Flag transcripts with gaps; results cached before coverage was recorded have neither key
+    warnings = []
+    coverage = result.get("coverage")
+    if coverage is not None and coverage < COVERAGE_WARNING_THRESHOLD:
+        warnings.append(f"Transcription completed with {coverage*100:.1f}% coverage.")
+    if result.get("text_only_chunks"):
+        chunks = ", ".join(str(chunk) for chunk in result["text_only_chunks"])
+        warnings.append(f"Chunks {chunks} were only recovered as plain text, so their timestamps are approximate.")
+    st.session_state.transcription_warning = " ".join(warnings) or None
+
+@st.fragment(run_every="1s")
+def show_transcription_job():
+    """Poll the background transcription job and collect its result when it finishes."""
+    # The fragment keeps ticking until the next full rerun, even after the job is collected
+    if st.session_state.transcription_job is None:
+        return
+    
+    job_manager = get_job_manager()
+    job = job_manager.get(st.session_state.transcription_job)
+    
+    if job is None:
+        st.session_state.transcription_job = None
+        st.query_params.pop("job", None)
+        st.session_state.transcription_error = "The transcription job is no longer available. Please transcribe again."
+        st.rerun()
+    elif job.status == "queued":
+        position = job_manager.queue_position(job.job_id)
+        st.info(f"Waiting for a free transcription worker ({position} jobs ahead)...")
+    elif job.status == "running":
+        st.progress(job.progress)
+        st.info(job.message)
+    elif job.status == "done":
+        set_transcription_result(job.result)
+        st.session_state.transcription_job = None
+        st.query_params.pop("job", None)
+        job_manager.discard(job.job_id)
+        st.rerun()
+    else:
+        st.session_state.transcription_job = None
+        st.query_params.pop("job", None)
+        job_manager.discard(job.job_id)
+        st.session_state.transcription_error = f"Transcription failed: {job.error}"
+        st.rerun()
+
+def render_report_preview(placeholder, partial_report):
+    """Render the report fields that have arrived so far while the report is generated."""
+    with placeholder.container():
+        if "meeting_name" in partial_report:
+            st.markdown(f"#### {partial_report['meeting_name']}")
+        if "purpose" in partial_report:
+            st.markdown(f"**Purpose:** {partial_report['purpose']}")
+        if partial_report.get("takeaways"):
+            st.markdown("**Key Takeaways**")
+            st.markdown("\n".join(f"- {takeaway}" for takeaway in partial_report["takeaways"]))
+        for section in partial_report.get("detailed_summary", []):
+            st.markdown(f"**{section.get('section_title', '')}**")
+            st.markdown("\n".join(f"- {point}" for point in section.get("points", [])))
+        if partial_report.get("action_items"):
+            st.markdown("**Action Items**")
+            st.markdown("\n".join(
+                f"- **{item.get('title', '')}** ({item.get('assignee', '')}): {item.get('description', '')}"
+                for item in partial_report["action_items"]
+            ))
+
+def deferred_export(report_data, export_format, trace_id):
+    """
+    Return a callable that renders the export when the download button is clicked.
+
+    Args:
+        report_data: Report dictionary from session state
+        export_format: "JSON", "Markdown" or "PDF"
+        trace_id: Session trace the export span is recorded under
+
+    Returns:
+        Function with no arguments returning the file contents as bytes
+    """
+    def render():
+        # Runs on a separate thread after the click, so it gets its values from the closure
+        with trace(trace_id):
+            return render_report(report_data, export_format.lower())
+    return render
 
 st.title("Meeting Transcription Tool")
 st.write(
@@ -71,7 +213,16 @@ if st.session_state.audio_data is not None:
     with col1:
         st.subheader("2. Transcription")
     with col3:
-        transcribe_clicked = st.button("Transcribe", use_container_width=True)
+        transcribe_clicked = st.button(
+            "Transcribe",
+            use_container_width=True,
+            disabled=st.session_state.transcription_job is not None
+        )
+    optimize_speech = st.checkbox(
+        "Optimize large files for speech",
+        value=True,
+        help="Convert files over the Whisper limit to compact mono speech audio so they can be transcribed in a single request."
+    )
     
     # Always show transcription tabs if we have data
     if st.session_state.raw_transcript is not None:
@@ -91,11 +242,14 @@ if st.session_state.audio_data is not None:
         with tab_timestamps:
             if st.session_state.cleaned_transcript:
                 with st.expander("Transcript with Timestamps", expanded=False):
-                    for i, segment in enumerate(st.session_state.cleaned_transcript["segments"]):
+                    # One markdown block for the whole transcript rather than one element per segment
+                    lines = []
+                    for start, end, text in st.session_state.transcript.rows():
                         # Format timestamps as minutes:seconds
-                        start_time = f"{int(segment['start']//60)}:{int(segment['start']%60):02d}"
-                        end_time = f"{int(segment['end']//60)}:{int(segment['end']%60):02d}"
-                        st.markdown(f"**[{start_time} - {end_time}]** {segment['text']}")
+                        start_time = f"{int(start//60)}:{int(start%60):02d}"
+                        end_time = f"{int(end//60)}:{int(end%60):02d}"
+                        lines.append(f"**[{start_time} - {end_time}]** {text}")
+                    st.markdown("\n\n".join(lines))
         
         # Tab 3: Raw transcription data
         with tab_raw:
@@ -103,6 +257,8 @@ if st.session_state.audio_data is not None:
                 st.json(st.session_state.raw_transcript)
     
     if transcribe_clicked:
+        st.session_state.transcription_error = None
+        st.session_state.transcription_warning = None
         # Get file size to determine if we need chunking
         file_size = st.session_state.audio_data.size
         
@@ -111,63 +267,41 @@ if st.session_state.audio_data is not None:
             st.error(f"File is too large ({file_size/(1024*1024):.1f} MB). Maximum allowed size is {MAX_UPLOAD_SIZE_MB} MB.")
             st.stop()
         
-        if file_size > WHISPER_SIZE_LIMIT_MB * 1024 * 1024:  # Larger than Whisper limit (25MB)
-            
-            with st.spinner("Processing large audio file... This may take several minutes."):
-                try:
-                    # Set up progress indicators
-                    progress_bar = st.progress(0)
-                    status_text = st.empty()
-                    
-                    # Define progress callback function
-                    def update_progress(step, message, percentage):
-                        progress_bar.progress(percentage)
-                        status_text.info(message)
-                    
-                    # Use advanced transcribe function with progress updates
-                    transcription = advanced_transcribe(
-                        client, 
-                        st.session_state.audio_data, 
-                        progress_callback=update_progress
-                    )
-                    
-                    # Store both raw and cleaned transcripts
-                    st.session_state.raw_transcript = transcription
-                    st.session_state.cleaned_transcript = clean_transcript(transcription)
-                    
-                    # Verify the duration coverage for user feedback
-                    audio_duration = file_size / (10 * 1024 * 1024) * 60
-                    
-                    processed_duration = 0
-                    if st.session_state.cleaned_transcript["segments"]:
-                        # Get the last end timestamp to determine processed duration
-                        processed_duration = st.session_state.cleaned_transcript["segments"][-1]["end"]
-                    
-                    if processed_duration > 0:
-                        coverage = (processed_duration / audio_duration) * 100
-                        if coverage < 90:
-                            status_text.warning(f"Transcription completed with {coverage:.1f}% coverage.")
-                        else:
-                            status_text.success(f"Transcription complete! Processed {processed_duration/60:.1f} minutes of audio.")
-                    else:
-                        status_text.success("Transcription complete!")
-                        
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Transcription failed: {e}")
-        else:
-            # Use simple_transcribe for files under 25MB            
-            with st.spinner("Transcribing audio..."):
-                try:
-                    transcription = simple_transcribe(client, st.session_state.audio_data)
-                    
-                    st.session_state.raw_transcript = transcription
-                    st.session_state.cleaned_transcript = clean_transcript(transcription)
-                    
-                    st.success("Transcription complete!")
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Transcription failed: {e}")
+        # A cache hit is instant, so skip the job queue entirely
+        cached = get_transcription_cache().get(
+            transcription_key(st.session_state.audio_data, optimize_speech)
+        )
+        if cached is not None:
+            set_transcription_result(cached)
+            st.rerun()
+        
+        # Run the transcription in the shared worker pool so it survives reruns.
+        # The job gets its own buffer so it never shares a file pointer with the UI.
+        with trace(st.session_state.session_trace), span("upload") as upload_span:
+            audio_copy = io.BytesIO(st.session_state.audio_data.getvalue())
+            audio_copy.name = st.session_state.audio_data.name
+            audio_copy.type = st.session_state.audio_data.type
+            upload_span.set(bytes=audio_copy.getbuffer().nbytes)
+        try:
+            st.session_state.transcription_job = get_job_manager().submit(
+                transcribe_audio,
+                get_client(),
+                audio_copy,
+                optimize_speech=optimize_speech,
+                name="transcription"
+            )
+            st.query_params["job"] = st.session_state.transcription_job
+            st.session_state.trace_ids.append(st.session_state.transcription_job)
+        except QueueFullError as e:
+            st.error(str(e))
+
+# A running transcription job is shown even after a refresh, when the upload is gone
+if st.session_state.transcription_job is not None:
+    show_transcription_job()
+elif st.session_state.transcription_error is not None:
+    st.error(st.session_state.transcription_error)
+elif st.session_state.transcription_warning is not None:
+    st.warning(st.session_state.transcription_warning)
 
 # --- 3. Report Generation Section ---
 if st.session_state.raw_transcript is not None:
@@ -175,6 +309,13 @@ if st.session_state.raw_transcript is not None:
     col1, col2, col3 = st.columns([2,1,1])
     with col1:
         st.subheader("3. Generate Report")
+    with col2:
+        st.caption(f"~{st.session_state.transcript_tokens:,} transcript tokens")
+        force_regenerate = st.checkbox(
+            "Force regenerate",
+            value=False,
+            help="Ignore the cached report for this transcript and generate a new one."
+        )
     with col3:
         generate_report_clicked = st.button("Generate Report", use_container_width=True)
     
@@ -187,17 +328,18 @@ if st.session_state.raw_transcript is not None:
     
     if generate_report_clicked:
         with st.spinner("Generating structured meeting report..."):
+            # Fields are shown here as they stream in; the validated report replaces them on rerun
+            preview = st.empty()
             try:
-                response = client.responses.parse(
-                    model="gpt-4.1-mini-2025-04-14", # gpt-4.1 mini
-                    input=[
-                        {"role": "system", "content": "From the given transcript, extract a structured meeting report with meeting_name, purpose, takeaways, detailed_summary (as sections with title and points), action_items (with assignee, title, description). Use the MeetingReport pydantic model."},
-                        {"role": "user", "content": json.dumps(st.session_state.cleaned_transcript, indent=2)},
-                    ],
-                    text_format=MeetingReport,
-                )
+                with trace(st.session_state.session_trace):
+                    report = generate_report(
+                        get_client(),
+                        st.session_state.cleaned_transcript,
+                        force_regenerate=force_regenerate,
+                        on_partial=lambda partial: render_report_preview(preview, partial)
+                    )
                 # Store the report in session state
-                st.session_state.report = response.output_parsed.model_dump()
+                st.session_state.report = report.model_dump()
                 st.success("Meeting report generated!")
                 st.rerun()
             except Exception as e:
@@ -212,53 +354,45 @@ if st.session_state.report is not None:
     with col1:
         export_format = st.selectbox(
             "Export format",
-            ["JSON", "Markdown", "PDF"],
+            list(EXPORT_FORMATS),
             index=0,
             label_visibility="collapsed"
         )
     
-    # Generate the file based on selected format in memory and provide download button
-    try:
-        if export_format == "JSON":
-            temp_json_path = export_to_json(st.session_state.report)
-            with open(temp_json_path, "r", encoding="utf-8") as f:
-                file_data = f.read()
-            filename = f"meeting_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            mime = "application/json"
-            try:
-                os.remove(temp_json_path)
-            except Exception:
-                pass
-        elif export_format == "Markdown":
-            temp_md_path = export_to_markdown(st.session_state.report)
-            with open(temp_md_path, "r", encoding="utf-8") as f:
-                file_data = f.read()
-            filename = f"meeting_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-            mime = "text/markdown"
-            try:
-                os.remove(temp_md_path)
-            except Exception:
-                pass
-        else:
-            with st.spinner("Preparing PDF..."):
-                temp_pdf_path = export_to_pdf(st.session_state.report)
-                with open(temp_pdf_path, "rb") as file:
-                    file_data = file.read()
-                filename = f"meeting_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-                mime = "application/pdf"
-                try:
-                    os.remove(temp_pdf_path)
-                except:
-                    pass
-        
-        # Show download button in the second column
-        with col2:
-            st.download_button(
-                label=f"Download Report",
-                data=file_data,
-                file_name=filename,
-                mime=mime,
-                use_container_width=True
-            )
-    except Exception as e:
-        st.error(f"Export failed: {str(e)}")
+    # The file is only rendered when the download button is clicked, so other
+    # interactions never pay for it; render_report memoizes it per report and format
+    extension, mime = EXPORT_FORMATS[export_format]
+    with col2:
+        st.download_button(
+            label=f"Download Report",
+            data=deferred_export(st.session_state.report, export_format, st.session_state.session_trace),
+            file_name=f"meeting_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}{extension}",
+            mime=mime,
+            use_container_width=True
+        )
+
+# --- Diagnostics ---
+if st.sidebar.checkbox("Show diagnostics", value=False, help="Time spent in each stage for this session."):
+    session_spans = recent_spans(st.session_state.trace_ids)
+    st.sidebar.subheader("Stage timings")
+    if session_spans:
+        st.sidebar.dataframe(
+            [
+                {
+                    "stage": row["name"],
+                    "count": row["count"],
+                    "total (s)": round(row["total_seconds"], 2),
+                    "max (s)": round(row["max_seconds"], 2),
+                    "MB": round(row["bytes"] / (1024 * 1024), 2),
+                    "errors": row["errors"],
+                }
+                for row in summarize_spans(session_spans)
+            ],
+            hide_index=True
+        )
+        with st.sidebar.expander("Spans"):
+            st.json(session_spans, expanded=False)
+    else:
+        st.sidebar.info("No stages have run in this session yet.")
+    with st.sidebar.expander("Process metrics"):
+        st.code(prometheus_text(), language="text")
@@ -0,0 +1,358 @@
+"""
+HTTP API for the Meeting Transcription Tool.
+
+Run with:
+
+    OPENAI_API_KEY=sk-... uvicorn server:app --port 8000
+
+Endpoints:
+    POST /jobs                         Upload a recording (multipart field "file"); returns a job ID
+    GET  /jobs/{job_id}                Job status and progress
+    GET  /jobs/{job_id}/transcript     Cleaned transcript
+    GET  /jobs/{job_id}/report         Structured meeting report (generated on first request)
+    GET  /jobs/{job_id}/export/{fmt}   Report as json, markdown or pdf
+    GET  /metrics                      Per-stage timings in the Prometheus text format
+
+For local testing pass a stub client: create_app(client=FakeClient()).
+"""
+import os
+import tempfile
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, Response
+from utils.transcribe import MAX_UPLOAD_SIZE_MB, BYTES_PER_MB, TRANSCRIBE_MAX_WORKERS
+from utils.pipeline import transcribe_audio
+from utils.audio_source import AudioSource
+from utils.report import generate_report
+from utils.jobs import get_job_manager, QueueFullError
+from utils.exports import render_report
+from utils.instrumentation import configure_logging, span, prometheus_text
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart before 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Constants for the HTTP service
+UPLOAD_BLOCK_SIZE = 1024 * 1024  # Request body is parsed and written to disk in blocks of about 1MB
+MAX_FIELD_BYTES = 1024  # Largest accepted value of a form field other than the file
+MAX_FORM_OVERHEAD_BYTES = 64 * 1024  # Room for multipart headers and form fields in the request body
+UPLOAD_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["file"],
+            "properties": {
+                "file": {"type": "string", "format": "binary"},
+                "optimize_speech": {"type": "boolean", "default": True},
+                "include_report": {"type": "boolean", "default": False},
+            },
+        }}},
+    }
+}
+EXPORT_TYPES = {
+    "json": ("application/json", ".json"),
+    "markdown": ("text/markdown", ".md"),
+    "pdf": ("application/pdf", ".pdf"),
+}
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _form_bool(fields, name, default):
+    """Read a boolean form field the way FastAPI's Form(bool) does."""
+    value = fields.get(name)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in ("1", "true", "on", "yes"):
+        return True
+    if value in ("0", "false", "off", "no"):
+        return False
+    raise HTTPException(status_code=422, detail=f"{name} must be a boolean")
+
+class StreamedUpload:
+    """
+    Parses a multipart/form-data request body as it arrives.
+
+    The "file" part is written straight to a temporary file, so the upload is
+    stored exactly once and the size limit is enforced before the rest of an
+    oversized body is read. Other parts are kept in memory as form fields.
+
+    Args:
+        boundary: Multipart boundary from the request's Content-Type header
+        max_bytes: Largest accepted size of the file part, in bytes
+    """
+
+    def __init__(self, boundary, max_bytes):
+        self.max_bytes = max_bytes
+        self.fields = {}
+        self.path = None
+        self.filename = None
+        self.content_type = None
+        self.size = 0
+        self._file = None
+        self._headers = {}
+        self._header_name = []
+        self._header_value = []
+        self._field_name = None
+        self._field_value = []
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": lambda data, start, end: self._header_name.append(data[start:end]),
+            "on_header_value": lambda data, start, end: self._header_value.append(data[start:end]),
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_end(self):
+        self._headers[b"".join(self._header_name).lower()] = b"".join(self._header_value)
+        self._header_name.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        name = options.get(b"name", b"").decode("latin-1")
+        if name != "file":
+            self._field_name = name
+            self._field_value = []
+            return
+        if self.path is not None:
+            raise HTTPException(status_code=400, detail="Only one file can be uploaded per job")
+
+        self._field_name = None
+        self.filename = options.get(b"filename", b"").decode("utf-8", "replace") or None
+        content_type = self._headers.get(b"content-type")
+        self.content_type = content_type.decode("latin-1") if content_type else None
+        suffix = ".wav" if "wav" in (self.content_type or "") or (self.filename or "").lower().endswith(".wav") else ".mp3"
+        fd, self.path = tempfile.mkstemp(suffix=suffix)
+        self._file = os.fdopen(fd, "wb")
+
+    def _on_part_data(self, data, start, end):
+        if self._field_name is None:
+            self.size += end - start
+            if self.size > self.max_bytes:
+                raise HTTPException(status_code=413, detail=f"File is larger than {MAX_UPLOAD_SIZE_MB}MB")
+            self._file.write(data[start:end])
+        else:
+            self._field_value.append(data[start:end])
+            if sum(len(part) for part in self._field_value) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Form field {self._field_name} is too large")
+
+    def _on_part_end(self):
+        if self._field_name is None:
+            self._file.close()
+        else:
+            self.fields[self._field_name] = b"".join(self._field_value).decode("utf-8", "replace")
+
+    def write(self, block):
+        """Feed the next block of the request body to the parser."""
+        try:
+            self._parser.write(block)
+        except ValueError as e:
+            # python-multipart reports malformed bodies as FormParserError, a ValueError
+            raise HTTPException(status_code=400, detail=f"Malformed multipart body: {str(e)}")
+
+    def finish(self):
+        """Check that the body ended with a complete file part."""
+        if self.path is None or not self._file.closed:
+            raise HTTPException(status_code=422, detail='Missing or incomplete "file" field')
+
+    def discard(self):
+        """Close and delete the temporary file, e.g. after the upload was rejected."""
+        if self._file is not None:
+            self._file.close()
+        if self.path is not None:
+            _remove_file(self.path)
+
+def run_pipeline(client, audio_path, content_type=None, optimize_speech=True, include_report=False,
+                 progress_callback=None, max_workers=TRANSCRIBE_MAX_WORKERS):
+    """
+    Transcribe an uploaded recording (and optionally generate its report) in a job worker.
+    The upload is deleted when the job finishes.
+
+    Args:
+        client: OpenAI client instance
+        audio_path: Path of the uploaded recording on disk
+        content_type: Content type sent with the upload
+        optimize_speech: Re-encode files over the Whisper limit as compact speech audio
+        include_report: Generate the structured report as part of the job
+        progress_callback: Progress callback supplied by the job manager
+        max_workers: Maximum number of chunks transcribed concurrently
+
+    Returns:
+        Dictionary with the "transcript" and the "report" (None if not requested)
+    """
+    try:
+        # The upload is already on disk, so every stage works on it without copying it again
+        result = transcribe_audio(
+            client,
+            AudioSource.from_path(audio_path, content_type=content_type),
+            optimize_speech=optimize_speech,
+            progress_callback=progress_callback,
+            max_workers=max_workers
+        )
+    finally:
+        _remove_file(audio_path)
+
+    report = None
+    if include_report:
+        if progress_callback:
+            progress_callback(0, "Generating report", 100)
+        report = generate_report(client, result["cleaned"]).model_dump()
+    return {"transcript": result["cleaned"], "report": report}
+
+def create_app(client=None, job_manager=None):
+    """
+    Build the FastAPI application.
+
+    Args:
+        client: OpenAI-compatible client shared by every job; if omitted, one is
+            created from the OPENAI_API_KEY environment variable
+        job_manager: JobManager to run jobs on; defaults to the process-wide one
+
+    Returns:
+        The FastAPI application
+    """
+    configure_logging()
+    if client is None:
+        from openai import OpenAI
+        # One client for all jobs so they share its connection pool.
+        # Retries are handled by utils.retry, so the client's own retries are disabled.
+        client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], max_retries=0)
+    if job_manager is None:
+        job_manager = get_job_manager()
+
+    app = FastAPI(title="Meeting Transcription Tool API")
+    app.state.client = client
+    app.state.job_manager = job_manager
+
+    def finished_job(job_id):
+        """Return a finished, successful job or raise the matching HTTP error."""
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired job")
+        if job.status == "failed":
+            raise HTTPException(status_code=409, detail=f"Job failed: {job.error}")
+        if not job.finished:
+            raise HTTPException(status_code=409, detail="Job is not finished yet")
+        return job
+
+    @app.post("/jobs", status_code=202, openapi_extra=UPLOAD_FORM_SCHEMA)
+    async def submit_job(request: Request):
+        # The body is read from the socket as it arrives rather than through UploadFile,
+        # which Starlette would spool to its own temp file (all of it) before this runs
+        max_bytes = MAX_UPLOAD_SIZE_MB * BYTES_PER_MB
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes + MAX_FORM_OVERHEAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"File is larger than {MAX_UPLOAD_SIZE_MB}MB")
+        media_type, options = parse_options_header(request.headers.get("content-type"))
+        if media_type != b"multipart/form-data" or b"boundary" not in options:
+            raise HTTPException(status_code=415, detail="Upload the recording as multipart/form-data")
+
+        upload = StreamedUpload(options[b"boundary"], max_bytes)
+        try:
+            with span("upload") as upload_span:
+                # Parsing and disk writes run in the thread pool so a large upload never
+                # blocks the event loop; socket reads are batched to limit thread hand-offs
+                buffer = bytearray()
+                async for block in request.stream():
+                    buffer += block
+                    if len(buffer) >= UPLOAD_BLOCK_SIZE:
+                        await run_in_threadpool(upload.write, bytes(buffer))
+                        buffer.clear()
+                if buffer:
+                    await run_in_threadpool(upload.write, bytes(buffer))
+                upload.finish()
+                upload_span.set(bytes=upload.size)
+            job_id = job_manager.submit(
+                run_pipeline,
+                client,
+                upload.path,
+                content_type=upload.content_type,
+                optimize_speech=_form_bool(upload.fields, "optimize_speech", True),
+                include_report=_form_bool(upload.fields, "include_report", False),
+                name=upload.filename or "upload",
+            )
+        except QueueFullError as e:
+            await run_in_threadpool(upload.discard)
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception:
+            await run_in_threadpool(upload.discard)
+            raise
+        return {"job_id": job_id}
+
+    @app.get("/jobs/{job_id}")
+    async def job_status(job_id: str):
+        job = job_manager.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired job")
+        return {
+            "job_id": job.job_id,
+            "name": job.name,
+            "status": job.status,
+            "step": job.step,
+            "message": job.message,
+            "progress": job.progress,
+            "queue_position": job_manager.queue_position(job_id),
+            "error": job.error,
+        }
+
+    @app.get("/jobs/{job_id}/transcript")
+    async def job_transcript(job_id: str):
+        return finished_job(job_id).result["transcript"]
+
+    async def job_report_data(job_id):
+        job = finished_job(job_id)
+        if job.result["report"] is None:
+            # Report generation blocks on the API, so keep it off the event loop
+            report = await run_in_threadpool(generate_report, client, job.result["transcript"])
+            job.result["report"] = report.model_dump()
+        return job.result["report"]
+
+    @app.get("/jobs/{job_id}/report")
+    async def job_report(job_id: str):
+        try:
+            return await job_report_data(job_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Report generation failed: {str(e)}")
+
+    @app.get("/jobs/{job_id}/export/{export_format}")
+    async def job_export(job_id: str, export_format: str):
+        if export_format not in EXPORT_TYPES:
+            raise HTTPException(status_code=404, detail=f"Unknown export format: {export_format}")
+        media_type, extension = EXPORT_TYPES[export_format]
+
+        report_data = await job_report(job_id)
+        # Rendered in memory and memoized, so repeated downloads of a report are cheap
+        data = await run_in_threadpool(render_report, report_data, export_format)
+        return Response(
+            content=data,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="meeting_report_{job_id}{extension}"'},
+        )
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return prometheus_text()
+
+    return app
+
+def __getattr__(name):
+    # `uvicorn server:app` builds the app (and its client) on first access only,
+    # so importing this module in tests never needs an API key
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(name)
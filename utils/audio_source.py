@@ -0,0 +1,210 @@
+"""
+One recording shared by every stage of the transcription pipeline.
+
+Uploads arrive either as an in-memory buffer (Streamlit, the HTTP service) or
+as a file on disk (the CLI). AudioSource sends the buffer straight to the API
+client. It writes the buffer to a temporary file only when a stage needs a path
+(ffprobe, ffmpeg, pydub), and does so at most once per job, so every later
+stage shares that copy.
+"""
+import os
+import sys
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from utils.ffmpeg import ffmpeg_available, probe_duration_ms
+from utils.instrumentation import span
+
+# Constants for audio sources
+COPY_BLOCK_SIZE = 1024 * 1024  # Buffers are written to disk in 1MB blocks
+
+def audio_suffix(audio_data):
+    """Pick a file suffix from the upload's content type (or file name) so decoders can detect the format."""
+    content_type = getattr(audio_data, 'type', None)
+    if content_type and 'wav' in content_type.lower():
+        return ".wav"
+    name = getattr(audio_data, 'name', None)
+    if isinstance(name, str) and name.lower().endswith(".wav"):
+        return ".wav"
+    return ".mp3"
+
+def is_decoded_audio(value):
+    """
+    Return True if value is a decoded pydub AudioSegment. pydub is not imported
+    for the check: if it was never imported, nothing can be an AudioSegment.
+    """
+    pydub = sys.modules.get("pydub")
+    return pydub is not None and isinstance(value, pydub.AudioSegment)
+
+def copy_to_temp_file(audio_data, suffix=None):
+    """
+    Copy file-like audio data to a temporary file in fixed-size blocks.
+
+    Args:
+        audio_data: The file-like audio data
+        suffix: File suffix (picked from the upload if omitted)
+
+    Returns:
+        Path to the temporary file (the caller is responsible for deleting it)
+    """
+    audio_data.seek(0)
+    with span("temp_write") as temp_span, \
+            tempfile.NamedTemporaryFile(delete=False, suffix=suffix or audio_suffix(audio_data)) as temp_audio:
+        shutil.copyfileobj(audio_data, temp_audio, COPY_BLOCK_SIZE)
+        temp_span.set(bytes=temp_audio.tell())
+    audio_data.seek(0)  # Reset file pointer
+    return temp_audio.name
+
+class AudioSource:
+    """
+    A recording held as an in-memory buffer or as a file on disk.
+
+    The file path (path), duration (duration_ms()) and decoded audio
+    (decoded()) are produced on first use and shared by every later stage.
+    close() deletes the temporary copy and any file the source owns.
+
+    Args:
+        audio_data: File-like audio data (e.g. a Streamlit UploadedFile or BytesIO)
+    """
+
+    def __init__(self, audio_data):
+        self._data = audio_data
+        self.name = getattr(audio_data, 'name', None)
+        self.type = getattr(audio_data, 'type', None)
+        self._path = None
+        self._owns_path = False
+        self._size = None
+        self._duration_ms = None
+        self._decoded = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_path(cls, path, content_type=None, owned=False):
+        """
+        Wrap a file that is already on disk; it is never copied.
+
+        Args:
+            path: Path to the audio file
+            content_type: MIME type of the audio, if known
+            owned: Delete the file when the source is closed
+
+        Returns:
+            AudioSource for the file
+        """
+        source = cls(None)
+        source.name = path
+        source.type = content_type
+        source._path = path
+        source._owns_path = owned
+        return source
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @property
+    def size(self):
+        """Size of the audio in bytes."""
+        if self._size is None:
+            if self._data is None:
+                self._size = os.path.getsize(self._path)
+            else:
+                self._data.seek(0, 2)  # Go to end of file
+                self._size = self._data.tell()
+                self._data.seek(0)  # Reset file pointer
+        return self._size
+
+    @property
+    def path(self):
+        """Path to the audio on disk; a buffer is written to a temporary file the first time."""
+        with self._lock:
+            if self._path is None:
+                self._path = copy_to_temp_file(self._data, audio_suffix(self))
+                self._owns_path = True
+            return self._path
+
+    @contextmanager
+    def reader(self):
+        """
+        Open the audio for reading from the start, e.g. to upload or hash it.
+        A named buffer is used directly; otherwise the file on disk is opened.
+
+        Yields:
+            Readable binary file object whose name carries the format's extension
+        """
+        if self._data is not None and self._path is None and os.path.splitext(str(self.name or ""))[1]:
+            self._data.seek(0)
+            try:
+                yield self._data
+            finally:
+                self._data.seek(0)  # Reset file pointer
+        else:
+            with open(self.path, "rb") as audio_file:
+                yield audio_file
+
+    def duration_ms(self):
+        """Duration in milliseconds, read from the container with ffprobe when available."""
+        with self._lock:
+            if self._duration_ms is None:
+                if ffmpeg_available():
+                    self._duration_ms = probe_duration_ms(self.path)
+                else:
+                    self._duration_ms = len(self.decoded())
+            return self._duration_ms
+
+    def decoded(self):
+        """The audio decoded into an AudioSegment; decoded at most once."""
+        with self._lock:
+            if self._decoded is None:
+                from pydub import AudioSegment
+                # pydub can auto-detect the format
+                with span("decode", bytes=self.size) as decode_span:
+                    self._decoded = AudioSegment.from_file(self.path)
+                    decode_span.set(duration_ms=len(self._decoded))
+            return self._decoded
+
+    def release(self):
+        """
+        Free the temporary copy of a buffer and the decoded audio once no later
+        stage needs them. Files the source owns outright are kept until close().
+        """
+        with self._lock:
+            self._decoded = None
+            if self._data is not None and self._path is not None:
+                _remove(self._path)
+                self._path = None
+                self._owns_path = False
+
+    def close(self):
+        """Delete the temporary copy and any file the source owns."""
+        with self._lock:
+            self._decoded = None
+            if self._path is not None and self._owns_path:
+                _remove(self._path)
+                self._path = None
+                self._owns_path = False
+
+def as_audio_source(audio_data):
+    """
+    Return audio_data as an AudioSource.
+
+    Args:
+        audio_data: An AudioSource, or file-like audio data to wrap
+
+    Returns:
+        Tuple of (source, created), where created is True if the caller
+        wrapped the data here and should close the source when done
+    """
+    if isinstance(audio_data, AudioSource):
+        return audio_data, False
+    return AudioSource(audio_data), True
+
+def _remove(path):
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
@@ -0,0 +1,121 @@
+import logging
+from utils.ffmpeg import decode_pcm_range
+from utils.instrumentation import span
+from utils.audio_source import is_decoded_audio
+
+logger = logging.getLogger(__name__)
+
+# Constants for silence-aligned chunk boundaries
+ANALYSIS_SAMPLE_RATE = 8000  # Downsampled mono rate used for energy analysis
+ENERGY_WINDOW_MS = 20  # Length of each RMS window
+GAP_SMOOTHING_MS = 300  # Energy is averaged over this span so short dips don't count as gaps
+GAP_ENERGY_RATIO = 0.5  # A gap must be at most this fraction of the typical energy
+BOUNDARY_TOLERANCE_MS = 30 * 1000  # How far before the nominal cut we look for a gap
+
+def rms_envelope(samples, sample_rate, window_ms=ENERGY_WINDOW_MS):
+    """
+    Compute short-window RMS energy of mono PCM samples.
+    
+    Args:
+        samples: 1-D NumPy array of PCM samples
+        sample_rate: Sample rate of the samples in Hz
+        window_ms: Length of each RMS window in milliseconds
+        
+    Returns:
+        1-D float32 array with one RMS value per window
+    """
+    import numpy as np
+    
+    window = max(1, int(sample_rate * window_ms / 1000))
+    usable = (len(samples) // window) * window
+    if usable == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:usable].astype(np.float32).reshape(-1, window)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+def quietest_offset_ms(envelope, window_ms=ENERGY_WINDOW_MS, smoothing_ms=GAP_SMOOTHING_MS):
+    """
+    Find the centre of the gap closest to the end of an energy envelope.
+    
+    A gap is a stretch whose smoothed energy is at most GAP_ENERGY_RATIO of the
+    median. The envelope ends at the nominal cut, so the last gap is the one
+    that moves the cut the least; a quieter gap further back would only make
+    the chunk shorter. Within that gap the quietest point is used.
+    
+    Args:
+        envelope: RMS values from rms_envelope
+        window_ms: Length of each RMS window in milliseconds
+        smoothing_ms: Span the energy is averaged over before looking for gaps
+        
+    Returns:
+        Offset in milliseconds from the start of the envelope, or None if there is no clear gap
+    """
+    import numpy as np
+    
+    if len(envelope) == 0:
+        return None
+    span = max(1, min(len(envelope), smoothing_ms // window_ms))
+    # "valid" mode avoids the artificially quiet edges that zero padding would create
+    smoothed = np.convolve(envelope, np.ones(span, dtype=np.float32) / span, mode="valid")
+    
+    # No stretch is clearly quieter than the rest (e.g. continuous speech or music)
+    quiet = smoothed <= GAP_ENERGY_RATIO * np.median(smoothed)
+    if not quiet.any():
+        return None
+    
+    # The last gap runs back from its last quiet window to the first louder one before it
+    gap_end = len(quiet) - 1 - int(np.argmax(quiet[::-1]))
+    louder = np.flatnonzero(~quiet[:gap_end])
+    gap_start = int(louder[-1]) + 1 if len(louder) else 0
+    
+    # Search from the end so ties resolve to the latest point, keeping chunks long
+    gap = smoothed[gap_start:gap_end + 1]
+    index = gap_end - int(np.argmin(gap[::-1]))
+    return (index + span // 2) * window_ms + window_ms // 2
+
+def _analysis_samples(audio_source, start_ms, duration_ms):
+    """Decode a range of the source as mono PCM at the analysis sample rate."""
+    import numpy as np
+    
+    with span("decode", kind="analysis", duration_ms=duration_ms) as decode_span:
+        if is_decoded_audio(audio_source):
+            window = audio_source[start_ms:start_ms + duration_ms]
+            window = window.set_channels(1).set_frame_rate(ANALYSIS_SAMPLE_RATE).set_sample_width(2)
+            raw = window.raw_data
+        else:
+            raw = decode_pcm_range(audio_source, start_ms, duration_ms, ANALYSIS_SAMPLE_RATE)
+        decode_span.set(bytes=len(raw))
+    return np.frombuffer(raw, dtype=np.int16)
+
+def snap_to_silence(audio_source, target_ms, total_duration_ms, tolerance_ms=BOUNDARY_TOLERANCE_MS):
+    """
+    Move a cut point back to the nearest low-energy gap so words are not split.
+    
+    Only the tolerance window before the target is decoded, so the cost does
+    not depend on meeting length. The cut only ever moves earlier: the nominal
+    cut is where the chunk reaches the size planned for it, so moving it later
+    could push the chunk over the upload limit.
+    
+    Args:
+        audio_source: Path to the source file on disk, or a decoded AudioSegment
+        target_ms: Nominal cut position in milliseconds
+        total_duration_ms: Duration of the whole audio in milliseconds
+        tolerance_ms: Maximum distance the cut may move, in milliseconds
+        
+    Returns:
+        Adjusted cut position in milliseconds (target_ms if no gap could be found)
+    """
+    if target_ms >= total_duration_ms or tolerance_ms <= 0:
+        return min(target_ms, total_duration_ms)
+    
+    search_start_ms = max(0, target_ms - tolerance_ms)
+    try:
+        samples = _analysis_samples(audio_source, search_start_ms, target_ms - search_start_ms)
+        offset_ms = quietest_offset_ms(rms_envelope(samples, ANALYSIS_SAMPLE_RATE))
+    except Exception as e:
+        logger.warning(f"Silence detection failed near {target_ms/1000:.1f}s, using fixed cut: {str(e)}")
+        return target_ms
+    
+    if offset_ms is None:
+        return target_ms
+    return search_start_ms + offset_ms
@@ -0,0 +1,233 @@
+import logging
+import os
+import json
+import time
+import hashlib
+import tempfile
+from utils.transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# Constants for the on-disk caches
+CACHE_ROOT = os.environ.get(
+    "MEETING_TOOL_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "meeting_tool_cache")
+)
+TRANSCRIPT_CACHE_MAX_MB = 500  # Total size budget for cached transcripts
+TRANSCRIPT_CACHE_MAX_AGE_DAYS = 30  # Entries unused for this long are evicted
+REPORT_CACHE_MAX_MB = 50  # Total size budget for cached reports
+REPORT_CACHE_MAX_AGE_DAYS = 30  # Entries unused for this long are evicted
+HASH_BLOCK_SIZE = 1024 * 1024  # Read audio in 1MB blocks when hashing
+
+class DiskCache:
+    """
+    Persistent JSON cache stored as one file per key in a directory.
+
+    Entries are evicted least-recently-used first when the directory grows
+    beyond max_size_mb, and any entry not used for max_age_days is dropped.
+    The file modification time doubles as the "last used" timestamp.
+    """
+
+    def __init__(self, directory, max_size_mb, max_age_days):
+        self.directory = directory
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 24 * 60 * 60
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        """
+        Return the cached value for key, or None on a miss.
+
+        Args:
+            key: Hex digest identifying the entry
+
+        Returns:
+            The stored JSON value, or None if missing, expired or unreadable
+        """
+        path = self._path(key)
+        try:
+            last_used = os.path.getmtime(path)
+        except OSError:
+            return None
+
+        if time.time() - last_used > self.max_age_seconds:
+            self._remove(path)
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self._remove(path)
+            return None
+
+        # Mark the entry as recently used for LRU eviction
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key, value):
+        """
+        Store a JSON-serializable value under key and evict old entries.
+
+        Args:
+            key: Hex digest identifying the entry
+            value: JSON-serializable value to store
+        """
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            self._remove(temp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Remove expired entries, then least-recently-used ones until under the size budget."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        # Oldest entries first
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            self._remove(path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+_transcription_cache = None
+
+def get_transcription_cache():
+    """Return the process-wide transcription cache, creating it on first use."""
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = DiskCache(
+            os.path.join(CACHE_ROOT, "transcripts"),
+            TRANSCRIPT_CACHE_MAX_MB,
+            TRANSCRIPT_CACHE_MAX_AGE_DAYS
+        )
+    return _transcription_cache
+
+_report_cache = None
+
+def get_report_cache():
+    """Return the process-wide report cache, creating it on first use."""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = DiskCache(
+            os.path.join(CACHE_ROOT, "reports"),
+            REPORT_CACHE_MAX_MB,
+            REPORT_CACHE_MAX_AGE_DAYS
+        )
+    return _report_cache
+
+def hash_audio(audio_data):
+    """
+    Compute a SHA-256 digest of the audio bytes without loading the whole file.
+
+    Args:
+        audio_data: The file-like audio data
+
+    Returns:
+        Hex digest of the audio contents
+    """
+    digest = hashlib.sha256()
+    audio_data.seek(0)
+    for block in iter(lambda: audio_data.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    audio_data.seek(0)  # Reset file pointer
+    return digest.hexdigest()
+
+def transcription_cache_key(audio_hash, model, options):
+    """
+    Build the cache key for a transcription request.
+
+    Args:
+        audio_hash: Hex digest of the audio bytes (see hash_audio)
+        model: Transcription model name
+        options: Dict of request options that affect the result
+
+    Returns:
+        Hex digest combining audio contents, model and options
+    """
+    payload = json.dumps(
+        {"audio": audio_hash, "model": model, "options": options},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def report_cache_key(cleaned_transcript, model, prompt, schema):
+    """
+    Build the cache key for a report request.
+
+    Args:
+        cleaned_transcript: Transcript as returned by clean_transcript
+        model: Report model name
+        prompt: Everything about the prompt that affects the result (system prompts, window budget)
+        schema: JSON schema of the report model, so schema changes invalidate old entries
+
+    Returns:
+        Hex digest combining transcript, model, prompt and schema
+    """
+    payload = json.dumps(
+        {"transcript": cleaned_transcript, "model": model, "prompt": prompt, "schema": schema},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _to_plain(value):
+    """Convert an OpenAI response object (or our fallback objects) to plain dicts."""
+    if isinstance(value, Transcript):
+        return value.segment_dicts(with_ids=True)
+    if isinstance(value, dict):
+        return {k: _to_plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_plain(v) for v in value]
+    if hasattr(value, "model_dump"):
+        # Segments may have been replaced with dicts, so dump field by field
+        return {k: _to_plain(getattr(value, k)) for k in type(value).model_fields}
+    if hasattr(value, "__dict__"):
+        return {k: _to_plain(v) for k, v in vars(value).items() if not k.startswith("_")}
+    return value
+
+def serialize_transcription(transcription):
+    """
+    Convert a raw transcription result into a JSON-serializable dictionary.
+
+    Args:
+        transcription: Result of simple_transcribe or advanced_transcribe
+
+    Returns:
+        Dictionary with the same fields as the Whisper API response
+    """
+    return _to_plain(transcription)
@@ -0,0 +1,139 @@
+import logging
+import os
+import json
+import time
+import shutil
+import tempfile
+from utils.cache import CACHE_ROOT
+
+logger = logging.getLogger(__name__)
+
+# Constants for resumable transcription
+CHECKPOINT_ROOT = os.path.join(CACHE_ROOT, "checkpoints")
+CHECKPOINT_MAX_AGE_DAYS = 7  # Abandoned checkpoints are removed after this long
+
+class ChunkCheckpoint:
+    """
+    Per-job directory holding the chunk plan and each chunk's transcription.
+    
+    The plan (time ranges and durations) is written once before any chunk is
+    transcribed and every chunk result is written as soon as it arrives, so a
+    failed or restarted job only has to transcribe the chunks that are missing.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _write(self, name, value):
+        # Write to a temporary file first so a crash never leaves a partial file
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(temp_path, os.path.join(self.directory, name))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def load_plan(self, total_duration_ms, settings):
+        """
+        Return the saved chunk ranges if they were planned for the same audio and settings.
+        
+        Args:
+            total_duration_ms: Duration of the audio in milliseconds
+            settings: Dict of chunking settings the plan depends on
+            
+        Returns:
+            List of (start_ms, end_ms) tuples, or None if there is no matching plan
+        """
+        plan = self._read("plan.json")
+        if not plan:
+            return None
+        if plan.get("total_duration_ms") != total_duration_ms or plan.get("settings") != settings:
+            logger.warning("Checkpoint plan does not match this audio, starting over")
+            self.clear()
+            os.makedirs(self.directory, exist_ok=True)
+            return None
+        return [tuple(chunk_range) for chunk_range in plan["ranges"]]
+
+    def save_plan(self, chunk_ranges, total_duration_ms, settings):
+        """Persist the chunk ranges planned for this job."""
+        self._write("plan.json", {
+            "total_duration_ms": total_duration_ms,
+            "settings": settings,
+            "ranges": [list(chunk_range) for chunk_range in chunk_ranges],
+        })
+
+    def has_result(self, index):
+        """Return True if chunk index has a readable saved transcription."""
+        return self.load_result(index) is not None
+
+    def load_result(self, index):
+        """
+        Return the saved transcription (as a dict) for chunk index, or None.
+        
+        A file that cannot be read is deleted, so the chunk is encoded and
+        transcribed again instead of being skipped.
+        """
+        name = f"chunk_{index:04d}.json"
+        result = self._read(name)
+        if isinstance(result, dict):
+            return result
+        if os.path.exists(os.path.join(self.directory, name)):
+            logger.warning(f"Checkpointed result for chunk {index+1} is unreadable, transcribing it again")
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+        return None
+
+    def missing_chunks(self):
+        """Return the indices of planned chunks that have no saved transcription yet."""
+        plan = self._read("plan.json")
+        if not plan:
+            return []
+        return [i for i in range(len(plan["ranges"])) if not self.has_result(i)]
+
+    def save_result(self, index, result):
+        """Persist the serialized transcription of chunk index."""
+        self._write(f"chunk_{index:04d}.json", result)
+
+    @property
+    def incomplete(self):
+        """True while the job still has chunks without a full result (cleared checkpoints are complete)."""
+        return os.path.isdir(self.directory)
+
+    def clear(self):
+        """Delete the checkpoint once the job no longer needs it."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+def get_checkpoint(job_key):
+    """
+    Open (or create) the checkpoint for a job and remove abandoned ones.
+    
+    Args:
+        job_key: Stable identifier of the job, e.g. its transcription cache key
+        
+    Returns:
+        ChunkCheckpoint for the job
+    """
+    os.makedirs(CHECKPOINT_ROOT, exist_ok=True)
+    max_age_seconds = CHECKPOINT_MAX_AGE_DAYS * 24 * 60 * 60
+    now = time.time()
+    for name in os.listdir(CHECKPOINT_ROOT):
+        path = os.path.join(CHECKPOINT_ROOT, name)
+        try:
+            if name != job_key and now - os.path.getmtime(path) > max_age_seconds:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+    return ChunkCheckpoint(os.path.join(CHECKPOINT_ROOT, job_key))
@@ -1,76 +1,55 @@
 import json
+import hashlib
 import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
+from utils.instrumentation import span, start_span
+from utils.transcript import Transcript
+
+# Constants for exports
+EXPORT_MEMO_SIZE = 32  # Rendered exports kept in memory (one per report and format)
+EXPORT_SUFFIXES = {"json": ".json", "markdown": ".md", "pdf": ".pdf"}
+
+_export_memo = OrderedDict()
+_export_memo_lock = threading.Lock()
 
 def clean_transcript(raw_transcript):
     """
     Clean the transcript format to only include essential information.
     Handles raw dictionary, TranscriptionVerbose object, mixed segment formats, 
-    or combined chunks from the Whisper API.
+    or combined chunks from the Whisper API (whose segments are already a Transcript).
     
     Returns a standardized dictionary with:
     - text: Full transcript text
     - segments: List of segments with start, end, and text fields
     """
-    # Initialize cleaned dict with default values
-    cleaned = {
-        "text": "",
-        "segments": []
-    }
-    
-    # Extract text from transcript
+    # Extract text and segments based on the input type
     if isinstance(raw_transcript, dict):
         # Handle dictionary input
-        cleaned["text"] = raw_transcript.get("text", "")
+        text = raw_transcript.get("text", "")
+        segments = raw_transcript.get("segments", [])
     else:
         # Handle object input (from OpenAI client)
-        cleaned["text"] = raw_transcript.text if hasattr(raw_transcript, 'text') else ""
-    
-    # Process segments based on the input type
-    segments_to_process = []
+        text = raw_transcript.text if hasattr(raw_transcript, 'text') else ""
+        segments = getattr(raw_transcript, 'segments', None) or []
     
-    if isinstance(raw_transcript, dict):
-        # Get segments from dictionary
-        segments_to_process = raw_transcript.get("segments", [])
-    elif hasattr(raw_transcript, 'segments'):
-        # Get segments from object
-        segments_to_process = raw_transcript.segments
-    
-    # Process each segment to extract relevant fields
-    for segment in segments_to_process:
-        if isinstance(segment, dict):
-            # Dictionary segment
-            cleaned["segments"].append({
-                "start": segment.get("start", 0),
-                "end": segment.get("end", 0),
-                "text": segment.get("text", "")
-            })
-        else:
-            # Object segment
-            segment_data = {
-                "start": getattr(segment, 'start', 0),
-                "end": getattr(segment, 'end', 0),
-                "text": getattr(segment, 'text', "")
-            }
-            cleaned["segments"].append(segment_data)
+    # Combined chunks are already columnar; other responses are read into columns once
+    transcript = segments if isinstance(segments, Transcript) else Transcript.from_segments(segments)
     
     # Sort segments by start time to ensure chronological order
     # (important for chunked transcriptions where segments might be out of order)
-    if cleaned["segments"]:
-        cleaned["segments"] = sorted(cleaned["segments"], key=lambda x: x["start"])
-    
+    cleaned = transcript.sorted_by_start().to_cleaned()
+    cleaned["text"] = text or ""
     return cleaned
 
 
-def export_to_json(report_data):
-    """Export the report to a JSON file using a temporary file."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.json', mode='w', encoding='utf-8') as temp_file:
-        json.dump(report_data, temp_file, indent=2)
-        return temp_file.name
+def report_to_json_bytes(report_data):
+    """Render the report as UTF-8 encoded JSON."""
+    with span("export", format="json") as export_span:
+        data = json.dumps(report_data, indent=2).encode("utf-8")
+        export_span.set(bytes=len(data))
+        return data
 
 def convert_report_to_markdown(report_data):
     """Convert report data to markdown format"""
@@ -106,119 +85,79 @@ def convert_report_to_markdown(report_data):
     
     return "\n".join(md_content)
 
-def export_to_markdown(report_data):
-    """Export report to markdown file using a temporary file."""
-    md_content = convert_report_to_markdown(report_data)
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.md', mode='w', encoding='utf-8') as temp_file:
-        temp_file.write(md_content)
-        return temp_file.name
+def report_to_markdown_bytes(report_data):
+    """Render the report as UTF-8 encoded Markdown."""
+    with span("export", format="markdown") as export_span:
+        data = convert_report_to_markdown(report_data).encode("utf-8")
+        export_span.set(bytes=len(data))
+        return data
 
-def export_to_pdf(report_data):
-    """Export report to PDF file"""
-    # Use a temporary file instead of saving to the root directory
-    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-        filename = temp_file.name
-        
+def report_to_pdf_bytes(report_data):
+    """Render the report as a PDF, built in memory."""
+    export_span = start_span("export", format="pdf")
     try:
-        # Create the PDF document
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=72
-        )
-
-        # Create custom styles
-        styles = getSampleStyleSheet()
-        
-        # Use a professional blue for headings
-        heading_blue = colors.HexColor('#0066cc')
-        
-        custom_h1 = ParagraphStyle(
-            name='CustomH1',
-            parent=styles['Heading1'],
-            textColor=heading_blue,
-            fontSize=18,
-            spaceAfter=20
-        )
-        custom_h2 = ParagraphStyle(
-            name='CustomH2',
-            parent=styles['Heading2'],
-            textColor=heading_blue,
-            fontSize=14,
-            spaceAfter=15
-        )
-        custom_h3 = ParagraphStyle(
-            name='CustomH3',
-            parent=styles['Heading3'],
-            textColor=heading_blue,  # Use the same blue color
-            fontSize=12,
-            spaceBefore=6,
-            spaceAfter=10,
-            fontName='Helvetica-Bold'
-        )
-
-        # Build the document content
-        story = []
-        
-        # Title
-        story.append(Paragraph(report_data['meeting_name'], custom_h1))
-        story.append(Spacer(1, 12))
-        
-        # Purpose
-        story.append(Paragraph('Purpose', custom_h2))
-        story.append(Paragraph(report_data['purpose'], styles['Normal']))
-        story.append(Spacer(1, 12))
-        
-        # Create custom bullet style with more spacing
-        bullet_style = ParagraphStyle(
-            name='BulletStyle',
-            parent=styles['Normal'],
-            leftIndent=20,
-            spaceBefore=2,
-            spaceAfter=5
-        )
-        
-        # Key Takeaways
-        story.append(Paragraph('Key Takeaways', custom_h2))
-        story.append(Spacer(1, 6))
-        takeaway_items = [ListItem(Paragraph(item, styles['Normal'])) for item in report_data['takeaways']]
-        story.append(ListFlowable(takeaway_items, bulletType='bullet', leftIndent=20))
-        story.append(Spacer(1, 12))
-        
-        # Detailed Summary
-        story.append(Paragraph('Detailed Summary', custom_h2))
-        story.append(Spacer(1, 6))
-        for section in report_data['detailed_summary']:
-            story.append(Paragraph(section['section_title'], custom_h3))
-            story.append(Spacer(1, 4))
-            points = [ListItem(Paragraph(point, styles['Normal'])) for point in section['points']]
-            story.append(ListFlowable(points, bulletType='bullet', leftIndent=20))
-            story.append(Spacer(1, 12))
-        
-        # Action Items
-        story.append(Paragraph('Action Items', custom_h2))
-        story.append(Spacer(1, 6))
-        for item in report_data['action_items']:
-            story.append(Paragraph(item['title'], custom_h3))
-            
-            # Create a custom style for the action item details
-            detail_style = ParagraphStyle(
-                name='DetailStyle',
-                parent=styles['Normal'],
-                leftIndent=10,
-                spaceBefore=2,
-                spaceAfter=2
-            )
-            
-            story.append(Paragraph(f"<b>Assignee:</b> {item['assignee']}", detail_style))
-            story.append(Paragraph(f"<b>Description:</b> {item['description']}", detail_style))
-            story.append(Spacer(1, 12))
-        
-        # Generate the PDF
-        doc.build(story)
-        return filename
+        # reportlab is only loaded once a PDF is actually requested
+        from utils.pdf import render_pdf
+        data = render_pdf(report_data)
+        export_span.finish(bytes=len(data))
+        return data
     except Exception as e:
+        export_span.error = str(e)
+        export_span.finish()
         raise Exception(f"Failed to export to PDF: {str(e)}")
+
+RENDERERS = {
+    "json": report_to_json_bytes,
+    "markdown": report_to_markdown_bytes,
+    "pdf": report_to_pdf_bytes,
+}
+
+def report_digest(report_data):
+    """Hex digest of the report contents, used to memoize its exports."""
+    payload = json.dumps(report_data, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def render_report(report_data, export_format):
+    """
+    Render the report in one format, reusing the result for an unchanged report.
+
+    Args:
+        report_data: Report dictionary (MeetingReport.model_dump())
+        export_format: "json", "markdown" or "pdf"
+
+    Returns:
+        The rendered file contents as bytes
+    """
+    key = (report_digest(report_data), export_format)
+    with _export_memo_lock:
+        if key in _export_memo:
+            _export_memo.move_to_end(key)
+            return _export_memo[key]
+
+    data = RENDERERS[export_format](report_data)
+
+    with _export_memo_lock:
+        _export_memo[key] = data
+        _export_memo.move_to_end(key)
+        while len(_export_memo) > EXPORT_MEMO_SIZE:
+            _export_memo.popitem(last=False)
+    return data
+
+def _export_to_file(report_data, export_format):
+    """Write the rendered report to a temporary file and return its path."""
+    data = render_report(report_data, export_format)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=EXPORT_SUFFIXES[export_format]) as temp_file:
+        temp_file.write(data)
+    return temp_file.name
+
+def export_to_json(report_data):
+    """Export the report to a JSON file using a temporary file."""
+    return _export_to_file(report_data, "json")
+
+def export_to_markdown(report_data):
+    """Export report to markdown file using a temporary file."""
+    return _export_to_file(report_data, "markdown")
+
+def export_to_pdf(report_data):
+    """Export report to PDF file using a temporary file."""
+    return _export_to_file(report_data, "pdf")
@@ -0,0 +1,261 @@
+"""
+Offline stand-in for the OpenAI client, for benchmarks and local testing.
+
+FakeOpenAI implements the calls this project makes (audio.transcriptions.create,
+responses.parse and responses.stream) with deterministic synthetic output, and
+can simulate latency, limited throughput and transient errors:
+
+    client = FakeOpenAI(latency=0.5, seconds_per_audio_minute=0.2, rate_limit_error_rate=0.1)
+
+Set MEETING_TOOL_FAKE_OPENAI=1 to run the Streamlit app against it, or pass
+--fake-api to cli.py.
+"""
+import os
+import time
+import random
+import hashlib
+import threading
+from collections import deque
+from openai.types.audio import Transcription, TranscriptionVerbose, TranscriptionSegment
+from utils.ffmpeg import ffmpeg_available, probe_duration_ms
+from utils.prompt import format_timestamp
+
+# Constants for the synthetic responses
+FAKE_SEGMENT_SECONDS = 5  # Length of each synthetic transcript segment
+FAKE_ASSUMED_BITRATE_KBPS = 64  # Used to estimate duration when ffprobe is not available
+FAKE_UPLOAD_LIMIT_MB = 25  # Same request size limit as the real Whisper API
+FAKE_STREAM_DELTA_CHARS = 16  # Characters per streamed text delta
+FAKE_WORDS = (
+    "we", "should", "review", "the", "budget", "timeline", "for", "next", "quarter", "and",
+    "agree", "on", "who", "owns", "each", "task", "customer", "feedback", "release", "plan",
+    "design", "meeting", "follow", "up", "with", "team", "about", "metrics", "launch", "risks",
+)
+
+class FakeAPIError(Exception):
+    """
+    Error raised by FakeOpenAI. Like openai.APIStatusError it carries a
+    status_code and response headers, so utils.retry classifies it the same way.
+    """
+
+    def __init__(self, status_code, message, headers=None):
+        super().__init__(f"Error code: {status_code} - {message}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+class _Behaviour:
+    """Latency, throughput and error settings shared by all fake endpoints."""
+
+    def __init__(self, latency, seconds_per_audio_minute, max_concurrency, requests_per_minute,
+                 rate_limit_error_rate, server_error_rate, seed):
+        self.latency = latency
+        self.seconds_per_audio_minute = seconds_per_audio_minute
+        self.requests_per_minute = requests_per_minute
+        self.rate_limit_error_rate = rate_limit_error_rate
+        self.server_error_rate = server_error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._recent = deque()  # Start times of requests in the last minute
+        self.stats = {"requests": 0, "rate_limited": 0, "server_errors": 0, "audio_seconds": 0.0}
+
+    def begin(self, endpoint):
+        """Count a request and raise an injected error if one is due."""
+        with self._lock:
+            self.stats["requests"] += 1
+            self.stats[endpoint] = self.stats.get(endpoint, 0) + 1
+
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            if self.requests_per_minute and len(self._recent) >= self.requests_per_minute:
+                self.stats["rate_limited"] += 1
+                retry_after = 60 - (now - self._recent[0])
+                raise FakeAPIError(429, "Rate limit reached", {"retry-after": f"{retry_after:.2f}"})
+            self._recent.append(now)
+
+            roll = self._random.random()
+        if roll < self.rate_limit_error_rate:
+            with self._lock:
+                self.stats["rate_limited"] += 1
+            raise FakeAPIError(429, "Rate limit reached", {"retry-after-ms": "200"})
+        if roll < self.rate_limit_error_rate + self.server_error_rate:
+            with self._lock:
+                self.stats["server_errors"] += 1
+            raise FakeAPIError(503, "The server is overloaded")
+
+    def wait(self, audio_seconds=0):
+        """Sleep for the simulated processing time, holding a concurrency slot if limited."""
+        with self._lock:
+            self.stats["audio_seconds"] += audio_seconds
+        delay = self.latency + audio_seconds / 60 * self.seconds_per_audio_minute
+        if self._slots is None:
+            time.sleep(delay)
+            return
+        with self._slots:
+            time.sleep(delay)
+
+def _audio_duration_seconds(file):
+    """Duration of an uploaded file, from ffprobe if possible, otherwise from its size."""
+    path = getattr(file, "name", None)
+    if isinstance(path, str) and os.path.exists(path) and ffmpeg_available():
+        try:
+            return probe_duration_ms(path) / 1000
+        except Exception:
+            pass
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size * 8 / (FAKE_ASSUMED_BITRATE_KBPS * 1000)
+
+def _synthetic_segments(seed, duration):
+    """Deterministic segments covering duration seconds."""
+    rng = random.Random(seed)
+    segments = []
+    start = 0.0
+    while start < duration:
+        end = min(duration, start + FAKE_SEGMENT_SECONDS)
+        words = [rng.choice(FAKE_WORDS) for _ in range(max(1, int((end - start) * 2.5)))]
+        segments.append({"id": len(segments), "start": round(start, 2), "end": round(end, 2),
+                         "text": " " + " ".join(words).capitalize() + "."})
+        start = end
+    return segments
+
+class _Transcriptions:
+    def __init__(self, behaviour):
+        self._behaviour = behaviour
+
+    def create(self, model, file, response_format="json", timestamp_granularities=None, **kwargs):
+        self._behaviour.begin("transcriptions")
+
+        file.seek(0, 2)
+        size = file.tell()
+        file.seek(0)
+        if size > FAKE_UPLOAD_LIMIT_MB * 1024 * 1024:
+            raise FakeAPIError(413, f"Maximum content size limit ({FAKE_UPLOAD_LIMIT_MB * 1024 * 1024}) exceeded")
+
+        duration = _audio_duration_seconds(file)
+        # Same audio, same transcript
+        seed = hashlib.sha256(file.read(64 * 1024) + str(size).encode()).hexdigest()
+        file.seek(0)
+        self._behaviour.wait(duration)
+
+        segments = _synthetic_segments(seed, duration)
+        text = "".join(segment["text"] for segment in segments).strip()
+        if response_format == "text":
+            return text
+        if response_format == "verbose_json":
+            return TranscriptionVerbose(
+                duration=duration,
+                language="english",
+                text=text,
+                segments=[
+                    TranscriptionSegment(
+                        avg_logprob=-0.2, compression_ratio=1.5, no_speech_prob=0.01,
+                        seek=0, temperature=0.0, tokens=[], **segment
+                    )
+                    for segment in segments
+                ],
+            )
+        return Transcription(text=text)
+
+class _Audio:
+    def __init__(self, behaviour):
+        self.transcriptions = _Transcriptions(behaviour)
+
+def _synthetic_report(text_format, input):
+    """Build a deterministic instance of text_format (a MeetingReport) from the prompt."""
+    transcript = input[-1]["content"] if input else ""
+    lines = [line for line in transcript.splitlines() if line.startswith("[")]
+    first = lines[0].split("] ", 1)[-1] if lines else "No transcript"
+    last_time = lines[-1][1:].split("]", 1)[0] if lines else format_timestamp(0)
+    report = {
+        "meeting_name": "Synthetic meeting",
+        "purpose": f"Discussion ending at {last_time}: {first}",
+        "takeaways": [line.split("] ", 1)[-1] for line in lines[:3]],
+        "detailed_summary": [
+            {"section_title": f"Topic from {line[1:].split(']', 1)[0]}", "points": [line.split("] ", 1)[-1]]}
+            for line in lines[::max(1, len(lines) // 3)][:3]
+        ],
+        "action_items": [
+            {"assignee": "Alex", "title": "Follow up", "description": f"Follow up on: {first}"}
+        ],
+    }
+    return text_format.model_validate(report)
+
+class _ParsedResponse:
+    def __init__(self, parsed):
+        self.output_parsed = parsed
+        self.output_text = parsed.model_dump_json()
+
+class _StreamEvent:
+    def __init__(self, type, delta=None):
+        self.type = type
+        self.delta = delta
+
+class _ResponseStream:
+    """Context manager mimicking client.responses.stream(...)."""
+
+    def __init__(self, behaviour, parsed):
+        self._behaviour = behaviour
+        self._parsed = parsed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __iter__(self):
+        text = self._parsed.model_dump_json()
+        pieces = [text[i:i + FAKE_STREAM_DELTA_CHARS] for i in range(0, len(text), FAKE_STREAM_DELTA_CHARS)]
+        # Spread the simulated latency over the stream
+        delay = self._behaviour.latency / max(1, len(pieces))
+        for piece in pieces:
+            time.sleep(delay)
+            yield _StreamEvent("response.output_text.delta", piece)
+        yield _StreamEvent("response.output_text.done")
+
+    def get_final_response(self):
+        return _ParsedResponse(self._parsed)
+
+class _Responses:
+    def __init__(self, behaviour):
+        self._behaviour = behaviour
+
+    def parse(self, model, input, text_format, **kwargs):
+        self._behaviour.begin("responses")
+        self._behaviour.wait()
+        return _ParsedResponse(_synthetic_report(text_format, input))
+
+    def stream(self, model, input, text_format, **kwargs):
+        self._behaviour.begin("responses")
+        return _ResponseStream(self._behaviour, _synthetic_report(text_format, input))
+
+class FakeOpenAI:
+    """
+    Drop-in replacement for openai.OpenAI covering the calls this project makes.
+
+    Args:
+        latency: Seconds added to every request
+        seconds_per_audio_minute: Extra seconds per minute of uploaded audio (transcription throughput)
+        max_concurrency: Requests processed at once; further requests wait (None for unlimited)
+        requests_per_minute: Requests accepted per minute before 429 errors (None for unlimited)
+        rate_limit_error_rate: Fraction of requests that fail with a 429 error
+        server_error_rate: Fraction of requests that fail with a 503 error
+        seed: Seed for the injected errors
+    """
+
+    def __init__(self, latency=0.0, seconds_per_audio_minute=0.0, max_concurrency=None,
+                 requests_per_minute=None, rate_limit_error_rate=0.0, server_error_rate=0.0, seed=0,
+                 **kwargs):
+        self._behaviour = _Behaviour(
+            latency, seconds_per_audio_minute, max_concurrency, requests_per_minute,
+            rate_limit_error_rate, server_error_rate, seed
+        )
+        self.audio = _Audio(self._behaviour)
+        self.responses = _Responses(self._behaviour)
+
+    @property
+    def stats(self):
+        """Counts of requests, injected errors and transcribed audio seconds."""
+        return dict(self._behaviour.stats)
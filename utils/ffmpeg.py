@@ -0,0 +1,112 @@
+import json
+import shutil
+import subprocess
+
+# ffmpeg binaries (pydub relies on the same tools being on PATH)
+FFMPEG_BINARY = "ffmpeg"
+FFPROBE_BINARY = "ffprobe"
+
+def ffmpeg_available():
+    """Return True if both ffmpeg and ffprobe can be found on PATH."""
+    return shutil.which(FFMPEG_BINARY) is not None and shutil.which(FFPROBE_BINARY) is not None
+
+def _run(cmd):
+    """Run an ffmpeg/ffprobe command and raise with its error output on failure."""
+    result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        error_output = result.stderr.decode("utf-8", errors="replace").strip()
+        raise RuntimeError(f"{cmd[0]} failed: {error_output[-500:]}")
+    return result.stdout
+
+def probe_duration_ms(path):
+    """
+    Read the duration of an audio file from its container metadata.
+    The audio itself is not decoded.
+    
+    Args:
+        path: Path to the audio file
+        
+    Returns:
+        Duration in milliseconds
+    """
+    output = _run([
+        FFPROBE_BINARY, "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "json",
+        path,
+    ])
+    return int(float(json.loads(output)["format"]["duration"]) * 1000)
+
+def export_audio_range(source_path, dest_path, start_ms, duration_ms, bitrate="64k", parameters=None):
+    """
+    Encode one time range of an audio file to MP3.
+    ffmpeg seeks in the input and decodes only the requested range through
+    a small streaming buffer, so memory use does not depend on file length.
+    
+    Args:
+        source_path: Path to the source audio file
+        dest_path: Path of the MP3 file to write
+        start_ms: Start of the range in milliseconds
+        duration_ms: Length of the range in milliseconds
+        bitrate: Target audio bitrate, e.g. "64k"
+        parameters: Optional list of extra ffmpeg output arguments
+    """
+    cmd = [
+        FFMPEG_BINARY, "-v", "error", "-y",
+        "-ss", f"{start_ms / 1000:.3f}",
+        "-t", f"{duration_ms / 1000:.3f}",
+        "-i", source_path,
+        "-vn",
+        "-acodec", "libmp3lame",
+        "-b:a", bitrate,
+    ]
+    cmd += parameters or []
+    cmd += ["-f", "mp3", dest_path]
+    _run(cmd)
+
+def decode_pcm_range(source_path, start_ms, duration_ms, sample_rate=8000):
+    """
+    Decode one time range of an audio file to mono 16-bit PCM.
+    
+    Args:
+        source_path: Path to the source audio file
+        start_ms: Start of the range in milliseconds
+        duration_ms: Length of the range in milliseconds
+        sample_rate: Output sample rate in Hz
+        
+    Returns:
+        Raw little-endian 16-bit PCM bytes
+    """
+    return _run([
+        FFMPEG_BINARY, "-v", "error",
+        "-ss", f"{start_ms / 1000:.3f}",
+        "-t", f"{duration_ms / 1000:.3f}",
+        "-i", source_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-f", "s16le",
+        "-",
+    ])
+
+def encode_speech_audio(source_path, dest_path, sample_rate=16000, bitrate="32k"):
+    """
+    Downmix, resample and re-encode a whole file to compact mono MP3 for speech.
+    
+    Args:
+        source_path: Path to the source audio file
+        dest_path: Path of the MP3 file to write
+        sample_rate: Output sample rate in Hz
+        bitrate: Target audio bitrate, e.g. "32k"
+    """
+    _run([
+        FFMPEG_BINARY, "-v", "error", "-y",
+        "-i", source_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(sample_rate),
+        "-acodec", "libmp3lame",
+        "-b:a", bitrate,
+        "-f", "mp3",
+        dest_path,
+    ])
@@ -0,0 +1,255 @@
+"""
+Named timing spans for the transcription and report pipeline.
+
+Every span records its duration and optional attributes such as bytes and
+counts. Finished spans are:
+
+- kept in a bounded in-memory history, grouped by trace (one trace per job or
+  session), for the diagnostics panel in main.py
+- aggregated per span name for Prometheus text output (server.py /metrics)
+- logged as JSON lines on the "meeting_tool.spans" logger at DEBUG level;
+  set MEETING_TOOL_SPAN_LOG to a file path to write them there
+
+Usage:
+
+    with span("encode", chunk=3) as s:
+        ...
+        s.set(bytes=os.path.getsize(path))
+"""
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+
+# Constants for instrumentation
+SPAN_HISTORY_LIMIT = 5000  # Finished spans kept in memory for diagnostics
+SPAN_LOG_PATH = os.environ.get("MEETING_TOOL_SPAN_LOG")  # Optional JSON lines file for spans
+METRIC_PREFIX = "meeting_tool"  # Prefix for Prometheus metric names
+
+span_logger = logging.getLogger("meeting_tool.spans")
+
+_current_trace = contextvars.ContextVar("meeting_tool_trace", default=None)
+_current_span = contextvars.ContextVar("meeting_tool_span", default=None)
+
+class Span:
+    """
+    One timed stage of the pipeline. Attributes are free-form; numeric
+    "bytes" and "count" attributes are also summed in the metrics.
+    """
+
+    def __init__(self, name, attributes=None):
+        parent = _current_span.get()
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.trace_id = _current_trace.get()
+        self.attributes = dict(attributes or {})
+        self.start_time = time.time()
+        self.duration_seconds = None
+        self.error = None
+        self._started = time.perf_counter()
+
+    def set(self, **attributes):
+        """Set or replace attributes."""
+        self.attributes.update(attributes)
+
+    def add(self, key, amount=1):
+        """Increase a numeric attribute, e.g. span.add("retries")."""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def finish(self, **attributes):
+        """Stop the clock and record the span. Only the first call has an effect."""
+        if self.duration_seconds is not None:
+            return
+        self.attributes.update(attributes)
+        self.duration_seconds = time.perf_counter() - self._started
+        _registry.record(self)
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "trace_id": self.trace_id,
+            "start_time": self.start_time,
+            "duration_seconds": self.duration_seconds,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+class _Registry:
+    """Process-wide store of finished spans and per-name totals."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=SPAN_HISTORY_LIMIT)
+        self._metrics = {}
+
+    def record(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self._history.append(record)
+            metrics = self._metrics.setdefault(span.name, {"count": 0, "seconds": 0.0, "errors": 0, "bytes": 0})
+            metrics["count"] += 1
+            metrics["seconds"] += span.duration_seconds
+            if span.error:
+                metrics["errors"] += 1
+            if isinstance(span.attributes.get("bytes"), (int, float)):
+                metrics["bytes"] += span.attributes["bytes"]
+
+        if span_logger.isEnabledFor(logging.DEBUG):
+            span_logger.debug(json.dumps(record, default=str))
+
+    def spans(self, trace_ids=None):
+        with self._lock:
+            records = list(self._history)
+        if trace_ids is None:
+            return records
+        trace_ids = set(trace_ids)
+        return [record for record in records if record["trace_id"] in trace_ids]
+
+    def metrics(self):
+        with self._lock:
+            return {name: dict(values) for name, values in self._metrics.items()}
+
+_registry = _Registry()
+
+def start_span(name, **attributes):
+    """
+    Start a span that is finished explicitly with span.finish(). Prefer the span()
+    context manager; this is for stages that do not fit in one block.
+    """
+    return Span(name, attributes)
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Time the enclosed block as a named span. Spans opened inside it (in this
+    thread, or in threads started with submit_in_context) become its children.
+
+    Args:
+        name: Stage name, e.g. "encode" or "api_call"
+        **attributes: Initial attributes, e.g. chunk=3
+
+    Yields:
+        The Span, so the block can add attributes as it learns them
+    """
+    current = Span(name, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.finish()
+
+@contextmanager
+def trace(trace_id=None):
+    """
+    Group the spans recorded inside the block (and in threads started from it
+    with submit_in_context) under one trace ID.
+
+    Args:
+        trace_id: ID to use, e.g. a job ID; a new one is generated if omitted
+
+    Yields:
+        The trace ID
+    """
+    trace_id = trace_id or uuid.uuid4().hex
+    token = _current_trace.set(trace_id)
+    try:
+        yield trace_id
+    finally:
+        _current_trace.reset(token)
+
+def submit_in_context(executor, fn, *args, **kwargs):
+    """executor.submit that carries the current trace and parent span into the worker thread."""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def recent_spans(trace_ids=None):
+    """
+    Return finished spans, oldest first.
+
+    Args:
+        trace_ids: Only return spans from these traces (all spans if None)
+
+    Returns:
+        List of span dictionaries
+    """
+    return _registry.spans(trace_ids)
+
+def summarize_spans(spans):
+    """
+    Aggregate span dictionaries by name.
+
+    Args:
+        spans: Span dictionaries, e.g. from recent_spans
+
+    Returns:
+        List of rows with name, count, total/max seconds, bytes and errors,
+        ordered by total time (largest first)
+    """
+    rows = {}
+    for record in spans:
+        row = rows.setdefault(record["name"], {
+            "name": record["name"], "count": 0, "total_seconds": 0.0, "max_seconds": 0.0, "bytes": 0, "errors": 0
+        })
+        row["count"] += 1
+        row["total_seconds"] += record["duration_seconds"]
+        row["max_seconds"] = max(row["max_seconds"], record["duration_seconds"])
+        if isinstance(record["attributes"].get("bytes"), (int, float)):
+            row["bytes"] += record["attributes"]["bytes"]
+        if record["error"]:
+            row["errors"] += 1
+    return sorted(rows.values(), key=lambda row: row["total_seconds"], reverse=True)
+
+def prometheus_text():
+    """Render per-span totals in the Prometheus text exposition format."""
+    metrics = _registry.metrics()
+    lines = [
+        f"# HELP {METRIC_PREFIX}_span_seconds Time spent in each pipeline stage.",
+        f"# TYPE {METRIC_PREFIX}_span_seconds summary",
+    ]
+    for name, values in sorted(metrics.items()):
+        lines.append(f'{METRIC_PREFIX}_span_seconds_count{{span="{name}"}} {values["count"]}')
+        lines.append(f'{METRIC_PREFIX}_span_seconds_sum{{span="{name}"}} {values["seconds"]:.6f}')
+    lines += [
+        f"# HELP {METRIC_PREFIX}_span_bytes_total Bytes processed by each pipeline stage.",
+        f"# TYPE {METRIC_PREFIX}_span_bytes_total counter",
+    ]
+    for name, values in sorted(metrics.items()):
+        lines.append(f'{METRIC_PREFIX}_span_bytes_total{{span="{name}"}} {values["bytes"]}')
+    lines += [
+        f"# HELP {METRIC_PREFIX}_span_errors_total Pipeline stages that raised an error.",
+        f"# TYPE {METRIC_PREFIX}_span_errors_total counter",
+    ]
+    for name, values in sorted(metrics.items()):
+        lines.append(f'{METRIC_PREFIX}_span_errors_total{{span="{name}"}} {values["errors"]}')
+    return "\n".join(lines) + "\n"
+
+def configure_logging(level=logging.INFO):
+    """
+    Set up logging for the app, CLI or server: readable messages on the console
+    and, if MEETING_TOOL_SPAN_LOG is set, span JSON lines in that file.
+    Safe to call more than once.
+    """
+    root = logging.getLogger()
+    if not root.handlers:
+        logging.basicConfig(level=level, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    logging.getLogger("meeting_tool").setLevel(level)
+    logging.getLogger("utils").setLevel(level)
+
+    if SPAN_LOG_PATH and not any(getattr(h, "_meeting_tool_spans", False) for h in span_logger.handlers):
+        handler = logging.FileHandler(SPAN_LOG_PATH, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._meeting_tool_spans = True
+        span_logger.addHandler(handler)
+        span_logger.setLevel(logging.DEBUG)
+        span_logger.propagate = False  # Keep JSON lines off the console
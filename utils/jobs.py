@@ -0,0 +1,137 @@
+import logging
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.instrumentation import trace
+
+logger = logging.getLogger(__name__)
+
+# Constants for background jobs (shared by every session in the process)
+JOB_WORKERS = 2  # Jobs that may run at the same time across the whole server
+JOB_QUEUE_LIMIT = 20  # Jobs that may wait for a free worker before new ones are refused
+JOB_RESULT_TTL_SECONDS = 60 * 60  # Finished jobs are forgotten after this long
+
+class QueueFullError(Exception):
+    """Raised when the server already has the maximum number of jobs queued."""
+
+class Job:
+    """
+    State of one background job. Workers update it, Streamlit reruns read it.
+    """
+    def __init__(self, job_id, name):
+        self.job_id = job_id
+        self.name = name
+        self.status = "queued"  # queued, running, done or failed
+        self.step = 0
+        self.message = "Waiting for a free worker"
+        self.progress = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+class JobManager:
+    """
+    Process-wide worker pool for long-running jobs such as transcription.
+    
+    Jobs outlive the Streamlit script run that submitted them: the session
+    only keeps the job ID and collects the result on a later rerun. At most
+    max_workers jobs run at once and at most max_queued more may wait, so a
+    burst of uploads queues instead of all running at the same time.
+    """
+    def __init__(self, max_workers=JOB_WORKERS, max_queued=JOB_QUEUE_LIMIT):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, name="job", **kwargs):
+        """
+        Queue fn(*args, progress_callback=..., **kwargs) to run in the worker pool.
+        
+        Args:
+            fn: Function to run; it must accept a progress_callback keyword argument
+            name: Short description of the job for status displays
+            
+        Returns:
+            The new job ID
+            
+        Raises:
+            QueueFullError: If the server already has too many jobs waiting
+        """
+        with self._lock:
+            self._purge_expired()
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            if active >= self.max_workers + self.max_queued:
+                raise QueueFullError(f"The server is busy with {active} jobs. Please try again in a few minutes.")
+            
+            job = Job(uuid.uuid4().hex, name)
+            self._jobs[job.job_id] = job
+        
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job.job_id
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = "running"
+        job.message = "Starting"
+        
+        def progress_callback(step, message, percentage):
+            job.step = step
+            job.message = message
+            job.progress = percentage
+        
+        try:
+            # Spans recorded by the job are grouped under its ID for diagnostics
+            with trace(job.job_id):
+                job.result = fn(*args, progress_callback=progress_callback, **kwargs)
+            job.progress = 100
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Job {job.job_id} ({job.name}) failed: {str(e)}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        """Return the Job for job_id, or None if it is unknown or expired."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id):
+        """Return how many queued jobs were submitted before job_id."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != "queued":
+                return 0
+            return sum(1 for other in self._jobs.values()
+                       if other.status == "queued" and other.created_at < job.created_at)
+
+    def discard(self, job_id):
+        """Forget a job once its result has been collected."""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and now - job.finished_at > JOB_RESULT_TTL_SECONDS]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager():
+    """Return the process-wide job manager, creating it on first use."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager()
+        return _job_manager
@@ -0,0 +1,155 @@
+"""
+PDF rendering of meeting reports.
+
+Paragraph styles are built once per process and shared by every render, report
+text is escaped before it reaches reportlab's paragraph markup, and bullet
+lists are built as plain bullet paragraphs in one pass, which lays out much
+faster than ListFlowable for reports with thousands of points.
+"""
+import io
+import threading
+from xml.sax.saxutils import escape
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+# Constants for PDF rendering
+PDF_PAGE_SIZE = A4
+PDF_MARGIN = 72  # Page margins in points (1 inch)
+HEADING_COLOR = "#0066cc"  # Professional blue used for all headings
+BULLET = "•"
+
+_styles = None
+_styles_lock = threading.Lock()
+
+def _build_styles():
+    styles = getSampleStyleSheet()
+    heading_blue = colors.HexColor(HEADING_COLOR)
+    return {
+        "h1": ParagraphStyle(
+            name="CustomH1",
+            parent=styles["Heading1"],
+            textColor=heading_blue,
+            fontSize=18,
+            spaceAfter=20
+        ),
+        "h2": ParagraphStyle(
+            name="CustomH2",
+            parent=styles["Heading2"],
+            textColor=heading_blue,
+            fontSize=14,
+            spaceAfter=15
+        ),
+        "h3": ParagraphStyle(
+            name="CustomH3",
+            parent=styles["Heading3"],
+            textColor=heading_blue,
+            fontSize=12,
+            spaceBefore=6,
+            spaceAfter=10,
+            fontName="Helvetica-Bold"
+        ),
+        "body": styles["Normal"],
+        "bullet": ParagraphStyle(
+            name="BulletStyle",
+            parent=styles["Normal"],
+            leftIndent=20,
+            bulletIndent=8,
+            spaceBefore=2,
+            spaceAfter=5
+        ),
+        "detail": ParagraphStyle(
+            name="DetailStyle",
+            parent=styles["Normal"],
+            leftIndent=10,
+            spaceBefore=2,
+            spaceAfter=2
+        ),
+    }
+
+def get_pdf_styles():
+    """Return the shared paragraph styles, building them on first use."""
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                _styles = _build_styles()
+    return _styles
+
+def escape_markup(text):
+    """
+    Escape report text for reportlab's paragraph markup.
+
+    Args:
+        text: Text from the report (model output, so it may contain <, > or &)
+
+    Returns:
+        The text with markup characters escaped and line breaks kept
+    """
+    return escape(str(text)).replace("\n", "<br/>")
+
+def _bullets(items, style):
+    return [Paragraph(escape_markup(item), style, bulletText=BULLET) for item in items]
+
+def build_report_story(report_data):
+    """
+    Build the flowables for a report.
+
+    Args:
+        report_data: Report dictionary (MeetingReport.model_dump())
+
+    Returns:
+        List of reportlab flowables
+    """
+    styles = get_pdf_styles()
+    h2, h3, detail = styles["h2"], styles["h3"], styles["detail"]
+
+    story = [
+        Paragraph(escape_markup(report_data["meeting_name"]), styles["h1"]),
+        Spacer(1, 12),
+        Paragraph("Purpose", h2),
+        Paragraph(escape_markup(report_data["purpose"]), styles["body"]),
+        Spacer(1, 12),
+        Paragraph("Key Takeaways", h2),
+        Spacer(1, 6),
+    ]
+    story += _bullets(report_data["takeaways"], styles["bullet"])
+    story += [Spacer(1, 12), Paragraph("Detailed Summary", h2), Spacer(1, 6)]
+
+    for section in report_data["detailed_summary"]:
+        story += [Paragraph(escape_markup(section["section_title"]), h3), Spacer(1, 4)]
+        story += _bullets(section["points"], styles["bullet"])
+        story.append(Spacer(1, 12))
+
+    story += [Paragraph("Action Items", h2), Spacer(1, 6)]
+    for item in report_data["action_items"]:
+        story += [
+            Paragraph(escape_markup(item["title"]), h3),
+            Paragraph(f"<b>Assignee:</b> {escape_markup(item['assignee'])}", detail),
+            Paragraph(f"<b>Description:</b> {escape_markup(item['description'])}", detail),
+            Spacer(1, 12),
+        ]
+    return story
+
+def render_pdf(report_data):
+    """
+    Render a report as a PDF in memory.
+
+    Args:
+        report_data: Report dictionary (MeetingReport.model_dump())
+
+    Returns:
+        The PDF file contents as bytes
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=PDF_PAGE_SIZE,
+        rightMargin=PDF_MARGIN,
+        leftMargin=PDF_MARGIN,
+        topMargin=PDF_MARGIN,
+        bottomMargin=PDF_MARGIN
+    )
+    doc.build(build_report_story(report_data))
+    return buffer.getvalue()
@@ -0,0 +1,147 @@
+import logging
+from utils.transcribe import simple_transcribe, advanced_transcribe, prepare_speech_audio
+from utils.transcribe import WHISPER_SIZE_LIMIT_MB, WHISPER_MODEL, BYTES_PER_MB, TRANSCRIBE_MAX_WORKERS
+from utils.exports import clean_transcript
+from utils.cache import get_transcription_cache, hash_audio, transcription_cache_key, serialize_transcription
+from utils.checkpoint import get_checkpoint
+from utils.instrumentation import span
+from utils.audio_source import as_audio_source
+
+logger = logging.getLogger(__name__)
+
+def transcription_key(audio_data, optimize_speech=True):
+    """
+    Build the transcription cache key for an upload and the options it will be processed with.
+    
+    Args:
+        audio_data: An AudioSource or the file-like audio data
+        optimize_speech: Whether large files are re-encoded as speech audio first
+        
+    Returns:
+        Cache key for get_transcription_cache()
+    """
+    source, created = as_audio_source(audio_data)
+    try:
+        use_chunking = source.size > WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB
+        with source.reader() as audio_file:
+            audio_hash = hash_audio(audio_file)
+    finally:
+        if created:
+            source.close()
+    return transcription_cache_key(
+        audio_hash,
+        WHISPER_MODEL,
+        {
+            "response_format": "verbose_json",
+            "timestamp_granularities": ["segment"],
+            "chunked": use_chunking,
+            "speech_optimized": use_chunking and optimize_speech,
+        }
+    )
+
+def transcription_coverage(transcription, cleaned):
+    """
+    Fraction of the recording covered by the transcript, from the end of its
+    last segment and the duration the API (or advanced_transcribe) reported.
+    
+    Returns:
+        Coverage between 0 and 1, or None if the duration is unknown
+    """
+    duration = transcription.get("duration") if isinstance(transcription, dict) else getattr(transcription, "duration", None)
+    if not duration:
+        return None
+    if not cleaned["segments"]:
+        return 0.0
+    return min(1.0, max(segment["end"] for segment in cleaned["segments"]) / duration)
+
+def transcribe_audio(client, audio_data, optimize_speech=True, progress_callback=None,
+                     max_workers=TRANSCRIBE_MAX_WORKERS):
+    """
+    Run the full transcription pipeline for one recording: cache lookup,
+    optional speech re-encoding, single-request or chunked transcription,
+    and transcript cleaning.
+    
+    Args:
+        client: OpenAI client instance
+        audio_data: An AudioSource or the file-like audio data; it is shared by
+            every stage and written to disk at most once
+        optimize_speech: Re-encode files over the Whisper limit as compact speech audio
+        progress_callback: Optional callback function to update progress
+        max_workers: Maximum number of chunks transcribed concurrently
+        
+    Returns:
+        Dictionary with the serialized "raw" transcription, the "cleaned"
+        transcript, its "coverage" of the recording (0 to 1, or None if unknown)
+        and "text_only_chunks", the 1-based numbers of chunks that were only
+        recovered as plain text and so have one segment for the whole chunk
+    """
+    source, created = as_audio_source(audio_data)
+    speech_audio = None
+    try:
+        transcription_cache = get_transcription_cache()
+        with span("cache_lookup", bytes=source.size) as lookup_span:
+            cache_key = transcription_key(source, optimize_speech)
+            cached = transcription_cache.get(cache_key)
+            lookup_span.set(hit=cached is not None)
+        if cached is not None:
+            if progress_callback:
+                progress_callback(0, "Loaded transcript from cache", 100)
+            return cached
+        
+        use_chunking = source.size > WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB
+        
+        # Re-encode large files as compact speech audio; most meetings then fit in one request
+        transcription_audio = source
+        if use_chunking and optimize_speech:
+            if progress_callback:
+                progress_callback(0, "Optimizing audio for speech", 5)
+            try:
+                speech_audio = prepare_speech_audio(source)
+            except Exception as e:
+                logger.warning(f"Speech optimization failed, using the original audio: {str(e)}")
+                speech_audio = None
+            if speech_audio is not None and speech_audio.size <= WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB:
+                transcription_audio = speech_audio
+                use_chunking = False
+                # Only the speech audio is uploaded, so the original's copy on disk can go
+                source.release()
+        
+        checkpoint = None
+        if use_chunking:
+            checkpoint = get_checkpoint(cache_key)
+            transcription = advanced_transcribe(
+                client,
+                transcription_audio,
+                progress_callback=progress_callback,
+                max_workers=max_workers,
+                checkpoint=checkpoint
+            )
+        else:
+            if progress_callback:
+                progress_callback(0, "Transcribing audio", 20)
+            transcription = simple_transcribe(client, transcription_audio)
+    finally:
+        if speech_audio is not None:
+            speech_audio.close()
+        if created:
+            source.close()
+    
+    with span("clean_transcript") as clean_span:
+        result = {
+            "raw": serialize_transcription(transcription),
+            "cleaned": clean_transcript(transcription),
+        }
+        result["coverage"] = transcription_coverage(transcription, result["cleaned"])
+        result["text_only_chunks"] = []
+        clean_span.set(count=len(result["cleaned"]["segments"]))
+    # Chunks that failed outright raise in advanced_transcribe. Chunks recovered as
+    # plain text are not cached, so the next attempt retries them for segments.
+    if checkpoint is not None and checkpoint.incomplete:
+        result["text_only_chunks"] = [i + 1 for i in checkpoint.missing_chunks()]
+        logger.warning("Some chunks were only recovered as plain text; keeping the checkpoint instead of caching the result")
+    else:
+        transcription_cache.set(cache_key, result)
+    
+    if progress_callback:
+        progress_callback(1, "Transcription complete", 100)
+    return result
@@ -0,0 +1,88 @@
+import threading
+from utils.transcript import Transcript
+
+# Constants for building model prompts
+TOKEN_ENCODING = "o200k_base"  # Tokenizer used by the gpt-4.1 family
+CHARS_PER_TOKEN = 4  # Estimate used when tiktoken is not installed
+
+class TokenBudgetError(Exception):
+    """Raised when a prompt is larger than the token budget allowed for a request."""
+
+_encoder = None
+_encoder_loaded = False
+_encoder_lock = threading.Lock()
+
+def _get_encoder():
+    """Return the tiktoken encoder, or None if tiktoken is not installed."""
+    global _encoder, _encoder_loaded
+    with _encoder_lock:
+        if not _encoder_loaded:
+            try:
+                import tiktoken
+                _encoder = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception:
+                # tiktoken is optional; fall back to a length-based estimate
+                _encoder = None
+            _encoder_loaded = True
+    return _encoder
+
+def count_tokens(text):
+    """
+    Count the tokens in text, exactly with tiktoken if it is installed,
+    otherwise estimated from the text length.
+
+    Args:
+        text: Prompt text
+
+    Returns:
+        Number of tokens
+    """
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def check_token_budget(text, budget):
+    """
+    Make sure a prompt fits its token budget before it is sent.
+
+    Args:
+        text: Prompt text
+        budget: Maximum number of tokens allowed
+
+    Returns:
+        The number of tokens in text
+
+    Raises:
+        TokenBudgetError: If text is over the budget
+    """
+    tokens = count_tokens(text)
+    if tokens > budget:
+        raise TokenBudgetError(f"Prompt is {tokens} tokens, over the budget of {budget} tokens")
+    return tokens
+
+def format_timestamp(seconds):
+    """Format seconds as mm:ss (minutes keep counting past an hour)."""
+    seconds = int(seconds)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+def encode_segment(segment):
+    """Encode one transcript segment as a "[mm:ss] text" line."""
+    return f"[{format_timestamp(segment.get('start', 0))}] {segment.get('text', '').strip()}"
+
+def encode_transcript(segments):
+    """
+    Encode transcript segments compactly for a model prompt: one "[mm:ss] text"
+    line per segment, without the duplicated full text, JSON quoting or
+    high-precision float timestamps.
+
+    Args:
+        segments: Cleaned transcript segments, or a Transcript
+
+    Returns:
+        The encoded transcript
+    """
+    if isinstance(segments, Transcript):
+        return "\n".join(f"[{format_timestamp(start)}] {text.strip()}"
+                         for start, text in zip(segments.starts, segments.texts))
+    return "\n".join(encode_segment(segment) for segment in segments)
@@ -0,0 +1,285 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.report_model import MeetingReport
+from utils.retry import call_with_retry
+from utils.cache import get_report_cache, report_cache_key
+from utils.streaming import PartialJSONParser
+from utils.instrumentation import span, submit_in_context
+from utils.prompt import encode_transcript, encode_segment, count_tokens, check_token_budget, format_timestamp
+
+logger = logging.getLogger(__name__)
+
+# Constants for report generation
+REPORT_MODEL = "gpt-4.1-mini-2025-04-14"  # gpt-4.1 mini
+REPORT_SYSTEM_PROMPT = "From the given transcript, extract a structured meeting report with meeting_name, purpose, takeaways, detailed_summary (as sections with title and points), action_items (with assignee, title, description). The transcript has one line per segment, prefixed with its [mm:ss] start time. Use the MeetingReport pydantic model."
+WINDOW_SYSTEM_PROMPT = "The given transcript is one consecutive part of a longer meeting. Extract a structured meeting report for this part only: meeting_name and purpose as far as this part reveals them, takeaways, detailed_summary (as sections with title and points) and action_items (with assignee, title, description). Do not invent content from other parts. The transcript has one line per segment, prefixed with its [mm:ss] start time. Use the MeetingReport pydantic model."
+WINDOW_TOKEN_BUDGET = 12000  # Approximate transcript tokens sent per window
+REPORT_PROMPT_TOKEN_LIMIT = 1000000  # gpt-4.1 mini context window, less room for the report
+REPORT_MAX_WORKERS = 4  # Windows summarized concurrently
+
+def _transcript_segments(cleaned_transcript):
+    """Return the transcript segments, or the full text as one segment if there are none."""
+    segments = cleaned_transcript.get("segments") or []
+    if not segments and cleaned_transcript.get("text"):
+        segments = [{"start": 0, "end": 0, "text": cleaned_transcript["text"]}]
+    return segments
+
+def split_transcript_windows(segments, token_budget=WINDOW_TOKEN_BUDGET):
+    """
+    Split transcript segments into consecutive time windows that each fit a token budget.
+
+    Args:
+        segments: Cleaned transcript segments in chronological order
+        token_budget: Approximate number of prompt tokens allowed per window
+
+    Returns:
+        List of windows, each a non-empty list of segments. A single segment
+        larger than the budget gets a window of its own.
+    """
+    windows = []
+    current = []
+    current_tokens = 0
+    for segment in segments:
+        # One encoded line per segment, plus its newline
+        segment_tokens = count_tokens(encode_segment(segment)) + 1
+        if current and current_tokens + segment_tokens > token_budget:
+            windows.append(current)
+            current = []
+            current_tokens = 0
+        current.append(segment)
+        current_tokens += segment_tokens
+
+    if current:
+        windows.append(current)
+    return windows
+
+def _request_report(client, system_prompt, payload, window=None):
+    """Run one structured report request through the shared retry layer."""
+    tokens = check_token_budget(system_prompt + payload, REPORT_PROMPT_TOKEN_LIMIT)
+    response = call_with_retry(lambda: client.responses.parse(
+        model=REPORT_MODEL,
+        input=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": payload},
+        ],
+        text_format=MeetingReport,
+    ), api="responses", window=window, tokens=tokens)
+    return response.output_parsed
+
+def _stream_report(client, system_prompt, payload, on_partial):
+    """
+    Run one structured report request as a stream, calling on_partial with the
+    fields completed so far whenever a new one arrives.
+
+    Args:
+        client: OpenAI client instance
+        system_prompt: System message for the request
+        payload: Encoded transcript
+        on_partial: Function called with a dict of the completed report fields
+
+    Returns:
+        The validated MeetingReport
+    """
+    tokens = check_token_budget(system_prompt + payload, REPORT_PROMPT_TOKEN_LIMIT)
+
+    def request():
+        # A retried stream starts over, so the parser starts over with it
+        parser = PartialJSONParser()
+        with client.responses.stream(
+            model=REPORT_MODEL,
+            input=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": payload},
+            ],
+            text_format=MeetingReport,
+        ) as stream:
+            for event in stream:
+                if event.type == "response.output_text.delta" and parser.feed(event.delta):
+                    if isinstance(parser.value, dict):
+                        on_partial(parser.value)
+        # Partial output is only for display; the final text must match the schema
+        return MeetingReport.model_validate_json(parser.text)
+
+    return call_with_retry(request, api="responses", streamed=True, tokens=tokens)
+
+def _summarize_window(client, window, index, total):
+    """Extract a partial report from one transcript window."""
+    header = (
+        f"Part {index+1} of {total} "
+        f"({format_timestamp(window[0]['start'])} to {format_timestamp(window[-1]['end'])})\n"
+    )
+    return _request_report(client, WINDOW_SYSTEM_PROMPT, header + encode_transcript(window), window=index+1)
+
+def _normalize(text):
+    """Lower-case text and strip punctuation so repeated items compare equal."""
+    return " ".join("".join(c for c in text.lower() if c.isalnum() or c.isspace()).split())
+
+def merge_partial_reports(partial_reports):
+    """
+    Merge partial reports from consecutive windows into a single report.
+    The merge is deterministic: items keep the order in which they were first
+    mentioned and repeated items are dropped.
+
+    Args:
+        partial_reports: List of MeetingReport objects in transcript order
+
+    Returns:
+        A combined MeetingReport
+    """
+    # The opening of a meeting is where its name and purpose are usually stated
+    meeting_name = next((r.meeting_name for r in partial_reports if r.meeting_name.strip()), "Meeting")
+    purpose = next((r.purpose for r in partial_reports if r.purpose.strip()), "")
+
+    takeaways = []
+    seen_takeaways = set()
+    sections = {}
+    action_items = {}
+    for report in partial_reports:
+        for takeaway in report.takeaways:
+            key = _normalize(takeaway)
+            if key and key not in seen_takeaways:
+                seen_takeaways.add(key)
+                takeaways.append(takeaway)
+
+        # Sections on the same topic in different windows are combined
+        for section in report.detailed_summary:
+            key = _normalize(section.section_title)
+            if key not in sections:
+                sections[key] = {"section_title": section.section_title, "points": [], "seen": set()}
+            merged = sections[key]
+            for point in section.points:
+                point_key = _normalize(point)
+                if point_key and point_key not in merged["seen"]:
+                    merged["seen"].add(point_key)
+                    merged["points"].append(point)
+
+        # The same task for the same person is kept once, with the fullest description
+        for item in report.action_items:
+            key = (_normalize(item.assignee), _normalize(item.title))
+            if key not in action_items:
+                action_items[key] = item
+            elif len(item.description) > len(action_items[key].description):
+                action_items[key] = action_items[key].model_copy(update={"description": item.description})
+
+    return MeetingReport(
+        meeting_name=meeting_name,
+        purpose=purpose,
+        takeaways=takeaways,
+        detailed_summary=[
+            {"section_title": s["section_title"], "points": s["points"]} for s in sections.values()
+        ],
+        action_items=list(action_items.values()),
+    )
+
+def report_key(cleaned_transcript, token_budget=WINDOW_TOKEN_BUDGET):
+    """
+    Build the report cache key for a transcript and the current model, prompts and schema.
+
+    Args:
+        cleaned_transcript: Transcript as returned by clean_transcript
+        token_budget: Window token budget, since it changes how the transcript is split
+
+    Returns:
+        Cache key for get_report_cache()
+    """
+    return report_cache_key(
+        cleaned_transcript,
+        REPORT_MODEL,
+        {
+            "system": REPORT_SYSTEM_PROMPT,
+            "window": WINDOW_SYSTEM_PROMPT,
+            "window_token_budget": token_budget,
+        },
+        MeetingReport.model_json_schema()
+    )
+
+def generate_report(client, cleaned_transcript, progress_callback=None, max_workers=REPORT_MAX_WORKERS,
+                    token_budget=WINDOW_TOKEN_BUDGET, force_regenerate=False, on_partial=None):
+    """
+    Generate a structured meeting report. Transcripts that fit one window are
+    summarized in a single request; longer ones are split into time windows that
+    are summarized in parallel and then merged, so latency is bounded by the
+    slowest window rather than the length of the meeting.
+
+    Args:
+        client: OpenAI client instance
+        cleaned_transcript: Transcript as returned by clean_transcript
+        progress_callback: Optional function to report progress (step, message, percentage)
+        max_workers: Maximum number of windows summarized at the same time
+        token_budget: Approximate number of prompt tokens allowed per window
+        force_regenerate: Ignore any cached report and generate a fresh one
+        on_partial: Optional function called with a dict of the report fields available
+            so far. Single-request reports are streamed field by field; long meetings
+            report the merge of the windows finished so far. It is called from the
+            calling thread only.
+
+    Returns:
+        MeetingReport for the whole meeting
+    """
+    with span("report", force_regenerate=force_regenerate) as report_span:
+        cache = get_report_cache()
+        cache_key = report_key(cleaned_transcript, token_budget)
+        if not force_regenerate:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached report")
+                report_span.set(cached=True)
+                return MeetingReport.model_validate(cached)
+
+        report, complete = _generate_report(
+            client, cleaned_transcript, progress_callback, max_workers, token_budget, on_partial
+        )
+        report_span.set(cached=False, complete=complete)
+        # A report missing failed windows is not cached, so the next attempt retries them
+        if complete:
+            cache.set(cache_key, report.model_dump())
+        return report
+
+def _generate_report(client, cleaned_transcript, progress_callback, max_workers, token_budget, on_partial):
+    """
+    Generate a report without the cache (see generate_report).
+
+    Returns:
+        Tuple of (MeetingReport, whether every window was summarized)
+    """
+    windows = split_transcript_windows(_transcript_segments(cleaned_transcript), token_budget)
+
+    if len(windows) <= 1:
+        # Short meeting: a single request over the whole transcript
+        payload = encode_transcript(windows[0] if windows else [])
+        if on_partial:
+            return _stream_report(client, REPORT_SYSTEM_PROMPT, payload, on_partial), True
+        return _request_report(client, REPORT_SYSTEM_PROMPT, payload), True
+
+    logger.info(f"Summarizing {len(windows)} transcript windows ({max_workers} at a time)")
+    if progress_callback:
+        progress_callback(0, f"Summarizing {len(windows)} parts of the meeting", 0)
+
+    partial_reports = [None] * len(windows)
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            submit_in_context(executor, _summarize_window, client, window, i, len(windows)): i
+            for i, window in enumerate(windows)
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                partial_reports[i] = future.result()
+            except Exception as e:
+                # One failed window should not lose the rest of the report
+                logger.warning(f"Error summarizing window {i+1}: {str(e)}")
+
+            if on_partial and partial_reports[i] is not None:
+                # Show everything finished so far, still in meeting order
+                on_partial(merge_partial_reports([r for r in partial_reports if r is not None]).model_dump())
+
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, f"Summarized {completed} of {len(windows)} parts", completed / len(windows) * 100)
+
+    summarized = [report for report in partial_reports if report is not None]
+    if not summarized:
+        raise Exception("Report generation failed for every part of the transcript")
+
+    return merge_partial_reports(summarized), len(summarized) == len(windows)
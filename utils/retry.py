@@ -0,0 +1,143 @@
+import logging
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from utils.instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# Constants for OpenAI request pacing and retries (shared by every session in the process)
+RATE_LIMITS_PER_MINUTE = {
+    "audio": 50,  # Whisper transcription requests
+    "responses": 60,  # Report generation requests
+}
+RATE_LIMIT_BURST = 5  # Requests that may start back to back before pacing kicks in
+MAX_RETRIES = 5  # Retries for transient errors before giving up
+BACKOFF_BASE_SECONDS = 1  # First retry waits up to this long, doubling each attempt
+BACKOFF_MAX_SECONDS = 60  # Upper bound for a single wait
+TRANSIENT_STATUS_CODES = {408, 409, 429}  # Plus every 5xx
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Each request takes one token; tokens refill at a
+    fixed rate up to a small burst capacity, and callers block until one is free.
+    """
+
+    def __init__(self, rate_per_minute, capacity=RATE_LIMIT_BURST):
+        self.rate_per_second = rate_per_minute / 60
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate_per_second
+            # Sleep outside the lock so other threads can refill and check too
+            time.sleep(wait_seconds)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(name):
+    """Return the process-wide TokenBucket for an API (see RATE_LIMITS_PER_MINUTE)."""
+    with _rate_limiters_lock:
+        if name not in _rate_limiters:
+            _rate_limiters[name] = TokenBucket(RATE_LIMITS_PER_MINUTE[name])
+        return _rate_limiters[name]
+
+def _status_code(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+def is_transient_error(error):
+    """
+    Classify an exception from the OpenAI client.
+    
+    Args:
+        error: The exception raised by the request
+        
+    Returns:
+        True for rate limits, server errors, timeouts and dropped connections,
+        which are worth retrying unchanged; False for everything else
+    """
+    status = _status_code(error)
+    if status is not None:
+        return status in TRANSIENT_STATUS_CODES or status >= 500
+    
+    # Errors without a response never reached the API (connection problems, timeouts)
+    return isinstance(error, (ConnectionError, TimeoutError)) or \
+        type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def retry_after_seconds(error):
+    """Return the wait requested by the server's Retry-After headers, or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # HTTP-date form
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def call_with_retry(request, api="audio", max_retries=MAX_RETRIES, **span_attributes):
+    """
+    Run an OpenAI request through the shared rate limiter, retrying transient
+    errors with jittered exponential backoff. The same request is repeated on
+    each attempt, so retries never change the response format. The whole call,
+    including waits, is recorded as an "api_call" span.
+    
+    Args:
+        request: Zero-argument function that performs the request; it is called
+            again on every attempt, so it must reopen or rewind any files it sends
+        api: Which rate limiter to use ("audio" or "responses")
+        max_retries: Retries allowed for transient errors
+        **span_attributes: Extra attributes for the span (e.g. chunk, bytes)
+        
+    Returns:
+        Whatever request returns
+        
+    Raises:
+        The last exception if it is not transient or retries are exhausted
+    """
+    limiter = get_rate_limiter(api)
+    attempt = 0
+    with span("api_call", api=api, **span_attributes) as call_span:
+        while True:
+            limiter.acquire()
+            try:
+                return request()
+            except Exception as e:
+                if not is_transient_error(e) or attempt >= max_retries:
+                    raise
+                
+                # Full jitter spreads retries from concurrent chunks and sessions apart
+                delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                requested = retry_after_seconds(e)
+                if requested is not None:
+                    delay = min(BACKOFF_MAX_SECONDS, requested) + random.uniform(0, BACKOFF_BASE_SECONDS)
+                
+                attempt += 1
+                call_span.set(retries=attempt)
+                logger.warning(f"Transient API error ({str(e)}), retrying in {delay:.1f}s (attempt {attempt} of {max_retries})")
+                time.sleep(delay)
@@ -0,0 +1,164 @@
+import re
+import json
+
+# Matches a JSON number or literal at the start of the remaining text
+_SCALAR_PATTERN = re.compile(r"-?\d+(\.\d+)?([eE][+-]?\d+)?|true|false|null")
+# Matches the first character after a number or literal
+_TOKEN_END_PATTERN = re.compile(r'[\s,:{}\[\]"]')
+_SEPARATORS = " \t\r\n,:"
+_MISSING = object()
+
+def _find_string_end(text, start, i):
+    """
+    Find the closing quote of the string opened at text[start].
+
+    Args:
+        text: Text holding the string
+        start: Index of the opening quote
+        i: Index to resume searching from (everything before it has no closing quote)
+
+    Returns:
+        Index of the closing quote, or -1 if it has not arrived yet
+    """
+    i = max(i, start + 1)
+    while True:
+        i = text.find('"', i)
+        if i < 0:
+            return -1
+        # The quote is escaped if an odd number of backslashes precede it
+        backslashes = 0
+        while text[i - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return i
+        i += 1
+
+def parse_partial_json(text):
+    """
+    Parse the beginning of a JSON document as it is being streamed.
+
+    Only completed values are returned: a string appears once its closing quote
+    has arrived, and an array lists only its completed items. Objects and arrays
+    that are still open are returned with what they contain so far.
+
+    Args:
+        text: JSON text received so far
+
+    Returns:
+        The parsed value so far, or None if nothing is complete yet
+    """
+    parser = PartialJSONParser()
+    parser.feed(text)
+    return parser.value
+
+class PartialJSONParser:
+    """
+    Accumulates streamed JSON deltas and reports the parsed value after each one.
+
+    Parsing is incremental: the open containers and the unparsed tail (at most
+    one unfinished string, number or literal) are kept between feeds, so each
+    delta is only read once and the total cost is linear in the response size.
+    value is updated in place as items complete.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pending = ""  # Unparsed text, starting at an unfinished token
+        self._scanned = 0  # How far into _pending an unfinished string has been searched
+        self._stack = []  # Open containers as [container, key awaiting its value, visible in value]
+        self._invalid = False
+        self.value = None
+
+    @property
+    def text(self):
+        """All text received so far."""
+        return "".join(self._chunks)
+
+    def _in_array(self):
+        return bool(self._stack) and isinstance(self._stack[-1][0], list)
+
+    def _add(self, value):
+        """
+        Attach a value to the innermost open container.
+
+        Returns:
+            True if the value is now part of value (its container may still be held back)
+        """
+        if not self._stack:
+            self.value = value
+            return True
+        frame = self._stack[-1]
+        if isinstance(frame[0], list):
+            frame[0].append(value)
+        else:
+            frame[0][frame[1]] = value
+            frame[1] = _MISSING
+        return frame[2]
+
+    def feed(self, delta):
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            delta: The next piece of JSON text
+
+        Returns:
+            True if the parsed value changed, so the caller knows to re-render
+        """
+        self._chunks.append(delta)
+        if self._invalid:
+            return False
+
+        text = self._pending + delta
+        changed = False
+        i = 0
+        while i < len(text):
+            char = text[i]
+            if char in _SEPARATORS:
+                i += 1
+            elif char == "{" or char == "[":
+                container = {} if char == "{" else []
+                if self._in_array():
+                    # Array items are only added once they are complete
+                    visible = False
+                else:
+                    visible = self._add(container)
+                    changed = changed or visible
+                self._stack.append([container, _MISSING, visible])
+                i += 1
+            elif char == "}" or char == "]":
+                if self._stack:
+                    container = self._stack.pop()[0]
+                    if self._in_array():
+                        changed = self._add(container) or changed
+                i += 1
+            elif char == '"':
+                end = _find_string_end(text, i, self._scanned)
+                if end < 0:
+                    # _pending will start at the opening quote; no need to search this part again
+                    self._scanned = len(text) - i
+                    break
+                self._scanned = 0
+                value = json.loads(text[i:end+1])
+                frame = self._stack[-1] if self._stack else None
+                if frame is not None and isinstance(frame[0], dict) and frame[1] is _MISSING:
+                    # An object key; it shows up once its value does
+                    frame[1] = value
+                else:
+                    changed = self._add(value) or changed
+                i = end + 1
+            else:
+                match = _TOKEN_END_PATTERN.search(text, i)
+                if match is None:
+                    # A number or literal at the end may still grow
+                    break
+                token = text[i:match.start()]
+                if _SCALAR_PATTERN.fullmatch(token) is None:
+                    # Not JSON; stop parsing and leave the error to the final validation
+                    self._invalid = True
+                    break
+                changed = self._add(json.loads(token)) or changed
+                i = match.start()
+
+        self._pending = text[i:]
+        return changed
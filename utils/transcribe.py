@@ -1,13 +1,31 @@
+import logging
 import os
 import math
 import tempfile
-from pydub import AudioSegment
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.ffmpeg import ffmpeg_available, probe_duration_ms, export_audio_range, encode_speech_audio
+from utils.boundaries import snap_to_silence, BOUNDARY_TOLERANCE_MS
+from utils.cache import serialize_transcription
+from utils.retry import call_with_retry, is_transient_error
+from utils.instrumentation import span, start_span, submit_in_context
+from utils.audio_source import AudioSource, as_audio_source, copy_to_temp_file, is_decoded_audio
+from utils.transcript import Transcript
+
+logger = logging.getLogger(__name__)
 
 # Constants for audio chunking
-MAX_CHUNK_SIZE_MB = 15  # Maximum size for each chunk in MB (reduced to avoid 413 errors)
 BYTES_PER_MB = 1024 * 1024  # Convert MB to bytes
 MAX_UPLOAD_SIZE_MB = 250  # Maximum upload file size in MB
 WHISPER_SIZE_LIMIT_MB = 25  # Maximum allowed size for Whisper API
+WHISPER_MODEL = "whisper-1"  # Transcription model used for every request
+TRANSCRIBE_MAX_WORKERS = 4  # Maximum number of chunks sent to the API at the same time
+CHUNK_BITRATE_KBPS = 64  # Chunks are encoded as constant-bitrate MP3 so their size is predictable
+CHUNK_SIZE_MARGIN = 0.95  # Fraction of the Whisper limit a planned chunk may use
+MP3_OVERHEAD_BYTES = 64 * 1024  # Allowance for MP3 headers and frame padding
+SPEECH_BITRATE_KBPS = 32  # Bitrate of the compact mono speech encoding
+SPEECH_SAMPLE_RATE = 16000  # Whisper works at 16 kHz internally, so higher rates add no accuracy
+CHUNK_OVERLAP_MS = 0  # Optional audio repeated at the start of each chunk (duplicates are removed on merge)
+OVERLAP_TEXT_MEMORY = 5  # Number of previous segments compared against when removing overlap duplicates
 
 def simple_transcribe(client, audio_data):
     """
@@ -15,235 +33,222 @@ def simple_transcribe(client, audio_data):
     
     Args:
         client: OpenAI client instance
-        audio_data: The file-like audio data
+        audio_data: An AudioSource or the file-like audio data
         
     Returns:
         Transcription result in Whisper API format
     """
-    # Create a temporary file to store the audio data
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_audio:
-        tmp_audio.write(audio_data.read())
-        audio_data.seek(0)  # Reset file pointer
-        tmp_audio_path = tmp_audio.name
-    
+    # The buffer is uploaded as it is; nothing is written to disk
+    source, created = as_audio_source(audio_data)
     try:
         # Call Whisper API directly
-        with open(tmp_audio_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-1",
-                file=audio_file,
-                response_format="verbose_json",
-                timestamp_granularities=["segment"],
-            )
-        return transcription
+        return _create_transcription(
+            client,
+            source,
+            response_format="verbose_json",
+            timestamp_granularities=["segment"],
+        )
     except Exception as e:
         raise Exception(f"Transcription failed: {str(e)}")
     finally:
-        # Clean up the temporary file
-        if os.path.exists(tmp_audio_path):
-            os.remove(tmp_audio_path)
+        if created:
+            source.close()
+
+def prepare_speech_audio(audio_data):
+    """
+    Re-encode audio to compact speech audio (mono, 16 kHz, low-bitrate MP3) so
+    that long meetings fit in a single Whisper request.
+    
+    Args:
+        audio_data: An AudioSource, whose copy on disk is kept for later stages,
+            or file-like audio data, whose temporary copy is deleted afterwards
+        
+    Returns:
+        AudioSource for the MP3 file (deleted when the source is closed), or None
+        if ffmpeg is unavailable or the re-encoded audio would still exceed the Whisper limit
+    """
+    if not ffmpeg_available():
+        logger.warning("ffmpeg not found, skipping speech optimization")
+        return None
+    
+    source, created = as_audio_source(audio_data)
+    try:
+        # The encoded size follows from the duration, so skip encoding if it can't fit
+        duration_ms = source.duration_ms()
+        if duration_ms > max_chunk_duration_ms(SPEECH_BITRATE_KBPS):
+            logger.warning(f"Audio is {duration_ms/60000:.1f} minutes, too long for a single request even as speech audio")
+            return None
+        
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as speech_file:
+            speech_path = speech_file.name
+        try:
+            with span("encode", kind="speech", duration_ms=duration_ms) as encode_span:
+                encode_speech_audio(source.path, speech_path, SPEECH_SAMPLE_RATE, f"{SPEECH_BITRATE_KBPS}k")
+                encode_span.set(bytes=os.path.getsize(speech_path))
+        except Exception:
+            os.unlink(speech_path)
+            raise
+    finally:
+        if created:
+            source.close()
+    
+    # The encoded file is uploaded straight from disk, never read back into memory
+    speech_audio = AudioSource.from_path(speech_path, content_type="audio/mpeg", owned=True)
+    logger.info(f"Speech-optimized audio: {speech_audio.size/BYTES_PER_MB:.1f} MB for {duration_ms/60000:.1f} minutes")
+    return speech_audio
 
-def advanced_transcribe(client, audio_data, progress_callback=None):
+def advanced_transcribe(client, audio_data, progress_callback=None, max_workers=TRANSCRIBE_MAX_WORKERS,
+                        overlap_ms=CHUNK_OVERLAP_MS, checkpoint=None):
     """
     Transcribe large audio files (>25MB) by splitting into chunks and combining results.
     
     Args:
         client: OpenAI client instance
-        audio_data: The file-like audio data
+        audio_data: An AudioSource or the file-like audio data
         progress_callback: Optional callback function to update progress
+        max_workers: Maximum number of chunks transcribed concurrently
+        overlap_ms: Audio repeated at the start of each chunk after the first, in milliseconds
+        checkpoint: Optional ChunkCheckpoint (see utils.checkpoint); chunks it already
+            holds are neither encoded nor transcribed again
         
     Returns:
         Combined transcription result in Whisper API format
     """
-    # Get file size
-    audio_data.seek(0, 2)  # Go to end of file
-    file_size = audio_data.tell()  # Get file size
-    audio_data.seek(0)  # Reset file pointer
+    source, created = as_audio_source(audio_data)
+    file_size = source.size
     
-    # Get audio duration to calculate optimal chunk size
-    audio_duration_ms = get_audio_duration(audio_data)
-    audio_data.seek(0)  # Reset file pointer
-    
-    # Calculate optimal chunk duration
-    chunk_duration_ms = calculate_chunk_duration(file_size, audio_duration_ms)
+    # With ffmpeg available, chunks are cut straight from the upload on disk
+    # (copied there at most once per job) so the whole meeting is never held in
+    # memory as PCM. Otherwise the upload is decoded exactly once and every later
+    # stage works on that segment.
+    try:
+        if ffmpeg_available():
+            audio_source = source.path
+            audio_duration_ms = source.duration_ms()
+        else:
+            audio_source = source.decoded()
+            audio_duration_ms = len(audio_source)
+        if audio_duration_ms <= 0:
+            raise ValueError("Audio has no duration")
+    except Exception as e:
+        if created:
+            source.close()
+        raise ValueError(f"Could not read audio file: {str(e)}")
     
     # Show processing info if callback is available
     if progress_callback:
         progress_callback(0, "Splitting audio into chunks", 10)
     
-    # Calculate estimated chunk size for logging
-    bytes_per_ms = file_size / audio_duration_ms
-    estimated_chunk_size_mb = (chunk_duration_ms * bytes_per_ms) / (1024 * 1024)
-    print(f"Processing audio ({file_size/1024/1024:.1f} MB, {audio_duration_ms/60000:.1f} min)")
-    print(f"Each chunk will be ~{estimated_chunk_size_mb:.1f} MB (max: {WHISPER_SIZE_LIMIT_MB} MB)")
-    
-    # Apply extra safety factor if we're very close to the limit
-    # Be more generous with the threshold to allow for larger chunks
-    if estimated_chunk_size_mb > WHISPER_SIZE_LIMIT_MB * 0.85:
-        safety_factor = (WHISPER_SIZE_LIMIT_MB * 0.8) / estimated_chunk_size_mb
-        chunk_duration_ms = int(chunk_duration_ms * safety_factor)
-        estimated_chunk_size_mb = (chunk_duration_ms * bytes_per_ms) / (1024 * 1024)
-        print(f"Chunk size adjusted for safety: {estimated_chunk_size_mb:.1f} MB")
-        
-    # Ensure we're getting chunks of at least 8-10 minutes when possible
-    minute_ms = 60 * 1000
-    if chunk_duration_ms < 8 * minute_ms and estimated_chunk_size_mb < WHISPER_SIZE_LIMIT_MB * 0.7:
-        # If our chunks are small but we have room to make them bigger, increase size
-        target_duration_ms = 10 * minute_ms  # Target 10-minute chunks
-        target_size_mb = (target_duration_ms * bytes_per_ms) / (1024 * 1024)
-        
-        if target_size_mb < WHISPER_SIZE_LIMIT_MB * 0.8:
-            chunk_duration_ms = target_duration_ms
-            estimated_chunk_size_mb = target_size_mb
-            print(f"Chunk size increased to 10 minutes: {estimated_chunk_size_mb:.1f} MB")
+    logger.info(f"Processing audio ({file_size/1024/1024:.1f} MB, {audio_duration_ms/60000:.1f} min)")
     
-    # Try to split the audio file into chunks
+    # Plan every chunk up front from the output encoding (or reuse the checkpointed
+    # plan), then encode each range that still needs transcribing exactly once
     try:
-        # We need to verify the entire duration is being processed
-        # First get the total duration
-        audio_data.seek(0)  # Make sure we're at the start
-        original_audio_duration = get_audio_duration(audio_data) 
-        audio_data.seek(0)  # Reset for further processing
-        
-        print(f"Original audio duration: {original_audio_duration/1000:.2f} seconds ({original_audio_duration/60000:.1f} minutes)")
-        
-        # Now chunk the audio
-        chunk_files = chunk_audio(audio_data, chunk_duration_ms)
-        
-        if not chunk_files:
-            print("Warning: No chunks were created by chunk_audio function.")
-            # Try with a more conservative chunk size
-            print("Retrying with a smaller chunk size...")
-            # Half the chunk duration to get smaller chunks
-            chunk_duration_ms = int(chunk_duration_ms * 0.5)
-            audio_data.seek(0)  # Reset pointer before trying again
-            chunk_files = chunk_audio(audio_data, chunk_duration_ms)
-            
-            if not chunk_files:
-                raise ValueError("Failed to create valid audio chunks even with reduced chunk size")
+        plan_settings = {
+            "bitrate_kbps": CHUNK_BITRATE_KBPS,
+            "max_duration_ms": max_chunk_duration_ms(),
+            "overlap_ms": overlap_ms,
+        }
+        chunk_ranges = checkpoint.load_plan(audio_duration_ms, plan_settings) if checkpoint else None
+        completed = set()
+        if chunk_ranges is None:
+            with span("plan", duration_ms=audio_duration_ms) as plan_span:
+                chunk_ranges = plan_chunk_ranges(audio_source, audio_duration_ms, overlap_ms=overlap_ms)
+                plan_span.set(count=len(chunk_ranges))
+            if checkpoint:
+                checkpoint.save_plan(chunk_ranges, audio_duration_ms, plan_settings)
+        elif checkpoint:
+            completed = {i for i in range(len(chunk_ranges)) if checkpoint.has_result(i)}
+            logger.info(f"Resuming from checkpoint: {len(completed)} of {len(chunk_ranges)} chunks already transcribed")
+        chunk_files = _export_planned_chunks(audio_source, chunk_ranges, overlap_ms, skip=completed)
     except Exception as e:
-        print(f"Error in chunk_audio: {str(e)}")
-        # Last resort - use a very conservative approach with fixed small chunks
-        print("Using emergency chunking with fixed small chunks...")
-        
-        # Reset file pointer in case it was modified
-        audio_data.seek(0)
-        
-        # Save the audio to a temporary file for manual processing
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-            temp_audio.write(audio_data.read())
-            audio_data.seek(0)  # Reset file pointer
-            temp_path = temp_audio.name
-        
-        try:
-            # Load audio
-            audio = AudioSegment.from_file(temp_path)
-            total_duration = len(audio)
-            chunk_files = []
-            
-            # Display total duration for verification
-            print(f"Emergency chunking - audio duration: {total_duration/1000:.2f} seconds ({total_duration/60000:.1f} minutes)")
-            print(f"Emergency chunking - attempting to use 20-minute chunks first")
-            
-            # Try 20-minute chunks for emergency chunking, then fall back if needed
-            chunk_durations_ms = [
-                20 * 60 * 1000,  # 20 minutes
-                15 * 60 * 1000,  # 15 minutes
-                10 * 60 * 1000,  # 10 minutes
-                5 * 60 * 1000,   # 5 minutes
-            ]
-            
-            # Calculate approximate size for each duration
-            bytes_per_ms = file_size / total_duration if total_duration > 0 else 10000
-            
-            # Find the largest viable chunk size
-            fixed_chunk_ms = 5 * 60 * 1000  # Default to 5 minutes
-            
-            # Print emergency chunking details for each duration
-            print("Emergency chunking - chunk size estimates:")
-            for duration in chunk_durations_ms:
-                size_mb = (duration * bytes_per_ms) / (1024 * 1024)
-                print(f"- {duration/(60*1000):.0f} minutes: {size_mb:.1f}MB")
-                
-                # If this size is small enough, use it
-                if size_mb <= WHISPER_SIZE_LIMIT_MB * 0.9:
-                    fixed_chunk_ms = duration
-                    print(f"Emergency chunking - using {fixed_chunk_ms/(60*1000):.0f}-minute chunks")
-                    break
-            
-            # Process in 10-minute chunks (or 5-minute if we had to fall back)
-            for position in range(0, total_duration, fixed_chunk_ms):
-                end_position = min(position + fixed_chunk_ms, total_duration)
-                chunk = audio[position:end_position]
-                
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as chunk_file:
-                    chunk.export(chunk_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-                    chunk_files.append(chunk_file.name)
-                    print(f"Created emergency chunk {len(chunk_files)}: {position/1000:.1f}s to {end_position/1000:.1f}s")
-                    
-            # Clean up original file
-            os.unlink(temp_path)
-            
-            if not chunk_files:
-                raise ValueError("Emergency chunking failed to create any valid chunks")
-                
-        except Exception as emergency_error:
-            raise ValueError(f"All chunking methods failed: {str(emergency_error)}")
+        raise ValueError(f"Failed to split audio into chunks: {str(e)}")
+    finally:
+        # The chunks are independent files, so the upload's copy on disk and the
+        # decoded audio are no longer needed
+        audio_source = None
+        source.release()
+        if created:
+            source.close()
     
     # Update progress after successful chunking
     if progress_callback:
         progress_callback(1, f"Split into {len(chunk_files)} chunks", 20)
     
-    print(f"Successfully created {len(chunk_files)} audio chunks")
+    logger.info(f"Successfully created {len(chunk_files)} audio chunks")
     
     # Process each chunk and combine results
-    combined_result = process_audio_chunks(client, chunk_files, progress_callback)
+    combined_result = process_audio_chunks(client, chunk_files, progress_callback, max_workers=max_workers,
+                                           checkpoint=checkpoint)
     
     # Verify we processed the full duration
     if hasattr(combined_result, 'segments') and combined_result.segments:
-        total_processed_duration = 0
-        if isinstance(combined_result.segments[-1], dict):
-            total_processed_duration = combined_result.segments[-1].get('end', 0)
-        else:
-            total_processed_duration = getattr(combined_result.segments[-1], 'end', 0)
-            
-        print(f"Transcription summary:")
-        print(f"- Original audio duration: {audio_duration_ms/1000:.2f} seconds ({audio_duration_ms/60000:.1f} minutes)")
-        print(f"- Processed duration: {total_processed_duration:.2f} seconds ({total_processed_duration/60:.1f} minutes)")
-        print(f"- Coverage: {(total_processed_duration*1000/audio_duration_ms)*100:.1f}%")
-        print(f"- Total segments: {len(combined_result.segments)}\n")
+        total_processed_duration = combined_result.segments.ends[-1]
+        
+        logger.info("Transcription summary:")
+        logger.info(f"- Original audio duration: {audio_duration_ms/1000:.2f} seconds ({audio_duration_ms/60000:.1f} minutes)")
+        logger.info(f"- Processed duration: {total_processed_duration:.2f} seconds ({total_processed_duration/60:.1f} minutes)")
+        logger.info(f"- Coverage: {(total_processed_duration*1000/audio_duration_ms)*100:.1f}%")
+        logger.info(f"- Total segments: {len(combined_result.segments)}")
+    
+    # The response structure is copied from the first chunk, so its duration is that
+    # chunk's; report the whole recording so callers can check coverage
+    if isinstance(combined_result, dict):
+        combined_result["duration"] = audio_duration_ms / 1000
+    elif hasattr(combined_result, 'duration'):
+        combined_result.duration = audio_duration_ms / 1000
     
     # Return the unified transcript that matches Whisper API format
     return combined_result
 
-def process_audio_chunks(client, chunk_files, progress_callback=None):
+def process_audio_chunks(client, chunk_files, progress_callback=None, max_workers=TRANSCRIBE_MAX_WORKERS,
+                         checkpoint=None):
     """
     Process multiple audio chunks and combine into a unified transcript.
     This function ensures timestamps are continuous across chunks.
     
+    Chunks are sent to the API concurrently (up to max_workers at a time) and
+    reassembled in their original order once all of them have finished.
+    
     Args:
         client: OpenAI client instance
-        chunk_files: List of file paths to audio chunks
+        chunk_files: List of chunk dicts from chunk_audio (path, start_ms, duration_ms)
+            or plain file paths to audio chunks
         progress_callback: Optional callback function to update progress
+        max_workers: Maximum number of chunks transcribed at the same time
+        checkpoint: Optional ChunkCheckpoint; chunks it holds are reused and new
+            results are saved to it as soon as they arrive
         
     Returns:
         Combined transcription result in Whisper API format
+        
+    Raises:
+        ValueError: If a chunk could not be transcribed even as plain text
     """
-    # First get all chunk durations to calculate precise timestamp offsets
+    # First get all chunk durations to calculate precise timestamp offsets.
+    # Chunks from chunk_audio carry their duration; only plain paths are decoded.
     chunk_durations = []
     total_audio_duration = 0
-    print(f"Reading durations for {len(chunk_files)} audio chunks...")
+    logger.info(f"Reading durations for {len(chunk_files)} audio chunks...")
     
-    for i, chunk_path in enumerate(chunk_files):
+    for i, chunk in enumerate(chunk_files):
+        if isinstance(chunk, dict):
+            duration_sec = chunk["duration_ms"] / 1000
+            chunk_durations.append(duration_sec)
+            total_audio_duration += duration_sec
+            continue
+        
+        chunk_path = chunk
         try:
+            from pydub import AudioSegment
             audio = AudioSegment.from_file(chunk_path)
             # Store duration in seconds for timestamp calculations
             duration_sec = len(audio) / 1000
             chunk_durations.append(duration_sec)
             total_audio_duration += duration_sec
-            print(f"Chunk {i+1} duration: {duration_sec:.2f} seconds (running total: {total_audio_duration:.2f}s)")
+            logger.info(f"Chunk {i+1} duration: {duration_sec:.2f} seconds (running total: {total_audio_duration:.2f}s)")
         except Exception as e:
-            print(f"Error reading chunk duration: {str(e)}")
+            logger.warning(f"Error reading chunk duration: {str(e)}")
             # Estimate duration based on file size - better than zero
             try:
                 file_size = os.path.getsize(chunk_path)
@@ -251,244 +256,184 @@ def process_audio_chunks(client, chunk_files, progress_callback=None):
                 estimated_duration = (file_size / (10 * BYTES_PER_MB)) * 60
                 chunk_durations.append(estimated_duration)
                 total_audio_duration += estimated_duration
-                print(f"Using estimated duration for chunk {i+1}: {estimated_duration:.2f} seconds (running total: {total_audio_duration:.2f}s)")
+                logger.warning(f"Using estimated duration for chunk {i+1}: {estimated_duration:.2f} seconds (running total: {total_audio_duration:.2f}s)")
             except:
                 # Fallback to a reasonable default (5 minutes)
                 chunk_durations.append(300)
                 total_audio_duration += 300
-                print(f"Using default 300 second duration for chunk {i+1} (running total: {total_audio_duration:.2f}s)")
+                logger.warning(f"Using default 300 second duration for chunk {i+1} (running total: {total_audio_duration:.2f}s)")
+    
+    # Chunks from chunk_audio know where they start in the original audio; plain
+    # paths are assumed to follow each other. Offsets are fixed before any request
+    # is sent so chunks can finish in any order without shifting timestamps.
+    chunk_offsets = []
+    time_offset = 0
+    for chunk, duration in zip(chunk_files, chunk_durations):
+        if isinstance(chunk, dict):
+            time_offset = chunk["start_ms"] / 1000
+        chunk_offsets.append(time_offset)
+        time_offset += duration
+    
+    # Transcribe chunks concurrently, keeping each outcome at its chunk index
+    max_workers = max(1, min(max_workers, len(chunk_files)))
+    chunk_outcomes = [None] * len(chunk_files)
+    completion_percentage_base = 20  # Start at 20% when chunk processing begins
+    completed_chunks = 0
+    
+    # Chunks finished by an earlier run come straight from the checkpoint
+    pending = []
+    for i, chunk in enumerate(chunk_files):
+        saved = checkpoint.load_result(i) if checkpoint else None
+        if saved is not None:
+            chunk_outcomes[i] = ("result", SimpleResponse(saved.get("text", ""), saved.get("segments", [])))
+            completed_chunks += 1
+        else:
+            pending.append(i)
+    
+    if progress_callback:
+        progress_callback(0, f"Transcribing {len(chunk_files)} chunks ({max_workers} at a time)", completion_percentage_base)
     
-    # Now process each chunk with accurate timestamp adjustments
-    all_segments = []
-    full_text = ""
-    time_offset = 0  # Accumulate time offset for each chunk
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            submit_in_context(executor, _transcribe_chunk, client, _chunk_path(chunk_files[i]), i, chunk_durations[i]): i
+            for i in pending
+        }
+        # Progress is reported from this thread so callbacks never run inside a worker
+        for future in as_completed(futures):
+            i = futures[future]
+            chunk_outcomes[i] = future.result()
+            completed_chunks += 1
+            
+            # Persist full results right away; text-only recoveries are retried on resume
+            if checkpoint and chunk_outcomes[i] and chunk_outcomes[i][0] == "result":
+                try:
+                    checkpoint.save_result(i, serialize_transcription(chunk_outcomes[i][1]))
+                except Exception as e:
+                    logger.warning(f"Could not checkpoint chunk {i+1}: {str(e)}")
+            if progress_callback:
+                # Calculate progress as percentage (from 20% to 90%)
+                progress_percentage = completion_percentage_base + int((completed_chunks / len(chunk_files)) * 70)
+                progress_callback(completed_chunks, f"Transcribed {completed_chunks} of {len(chunk_files)} chunks", progress_percentage)
+    
+    # A transcript with a hole in it is not a result; the chunks that did finish
+    # are checkpointed, so transcribing the recording again only sends the missing ones
+    failed = [i for i, outcome in enumerate(chunk_outcomes) if outcome is None]
+    if failed:
+        raise ValueError(
+            f"{len(failed)} of {len(chunk_files)} chunks could not be transcribed "
+            f"(chunk{'s' if len(failed) > 1 else ''} {', '.join(str(i+1) for i in failed)})"
+            + ("; retrying resumes from the finished chunks" if checkpoint else "")
+        )
+    
+    # Now combine the chunk results in order with accurate timestamp adjustments.
+    # Segments are collected in a columnar Transcript; each chunk's times are
+    # shifted in one pass instead of rebuilding every segment.
+    merge_span = start_span("merge", chunks=len(chunk_files))
+    transcript = Transcript()
+    text_parts = []  # Text of each chunk, joined into the full text at the end
     template = None  # Store first valid response structure as template
-    completion_percentage_base = 20  # Start at 20% when chunk processing begins
     successful_chunks = 0  # Track how many chunks we process successfully
-    
-    for i, chunk_path in enumerate(chunk_files):
-        # Update progress if callback provided
-        if progress_callback:
-            # Calculate progress as percentage (from 20% to 90%)
-            progress_percentage = completion_percentage_base + int((i / len(chunk_files)) * 70)
-            progress_callback(i, f"Transcribing chunk {i+1} of {len(chunk_files)}", progress_percentage)
+    covered_until = 0  # End time of the last segment kept so far
+    recent_texts = []  # Normalized text of the last few kept segments
+    # Overlap de-duplication needs to know where the kept transcript ends
+    track_coverage = any(isinstance(chunk, dict) and chunk.get("overlap_ms") for chunk in chunk_files)
+    
+    for i, outcome in enumerate(chunk_outcomes):
+        time_offset = chunk_offsets[i]
+        kind, chunk_result = outcome
+        overlap_sec = chunk_files[i].get("overlap_ms", 0) / 1000 if isinstance(chunk_files[i], dict) else 0
         
-        try:
-            # Verify chunk size is within API limits
-            file_size = os.path.getsize(chunk_path)
-            if file_size > WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB:
-                print(f"Warning: Chunk {i+1} exceeds Whisper's limit ({file_size/BYTES_PER_MB:.2f} MB). Skipping.")
-                continue
-            
-            # Transcribe this chunk with backup response handling
-            try:
-                with open(chunk_path, "rb") as audio_file:
-                    # First attempt with verbose_json format
-                    chunk_result = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="verbose_json",
-                        timestamp_granularities=["segment"],
-                    )
-            except Exception as api_error:
-                print(f"Error with verbose_json format: {str(api_error)}")
-                print("Retrying with standard JSON format...")
-                
-                # Retry with standard JSON format if verbose_json fails
-                with open(chunk_path, "rb") as audio_file:
-                    chunk_result = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="json",
-                    )
-                    
-                    # Convert simple response to our needed format
-                    if isinstance(chunk_result, dict):
-                        # Just extract text if we only get a simple response
-                        chunk_text = chunk_result.get("text", "")
-                        
-                        # Create a minimal segment covering the whole chunk
-                        chunk_segments = [{
-                            "id": 0,
-                            "start": 0,
-                            "end": chunk_durations[i] if i < len(chunk_durations) else 0,
-                            "text": chunk_text
-                        }]
-                        
-                        # Create an object-like structure
-                        class SimpleResponse:
-                            def __init__(self, text, segments):
-                                self.text = text
-                                self.segments = segments
-                        
-                        chunk_result = SimpleResponse(chunk_text, chunk_segments)
-            
-            # Store template structure if this is the first successful transcription
-            if template is None:
-                template = chunk_result
-            
-            # Add this chunk's text to full text
+        if kind == "text":
+            # Text-only recovery: create a simple segment covering the whole chunk
+            text_parts.append(chunk_result)
+            transcript.append(time_offset, time_offset + chunk_durations[i], chunk_result)
+            covered_until = max(covered_until, time_offset + chunk_durations[i])
+            recent_texts = []
+            continue
+        
+        # Store template structure if this is the first successful transcription
+        if template is None:
+            template = chunk_result
+        
+        # Add this chunk's text to full text (overlapping chunks are rebuilt from kept segments below)
+        if not overlap_sec:
             if hasattr(chunk_result, 'text'):
-                full_text += chunk_result.text + " "
+                text_parts.append(chunk_result.text)
             elif isinstance(chunk_result, dict) and "text" in chunk_result:
-                full_text += chunk_result["text"] + " "
-            
-            # Adjust timestamps and add to unified segments list
-            adjusted_segments = []
-            
-            # Get segments from object or dictionary
-            segments_to_process = []
-            if hasattr(chunk_result, 'segments'):
-                segments_to_process = chunk_result.segments
-            elif isinstance(chunk_result, dict) and "segments" in chunk_result:
-                segments_to_process = chunk_result["segments"]
-            
-            for segment in segments_to_process:
-                try:
-                    # Handle both object and dictionary segments
-                    if isinstance(segment, dict):
-                        # For dictionary segments
-                        segment_dict = {
-                            'id': segment.get('id', 0),
-                            'start': segment.get('start', 0) + time_offset,
-                            'end': segment.get('end', 0) + time_offset,
-                            'text': segment.get('text', ""),
-                            # Default values for required fields
-                            'avg_logprob': segment.get('avg_logprob', 0.0),
-                            'compression_ratio': segment.get('compression_ratio', 1.0),
-                            'no_speech_prob': segment.get('no_speech_prob', 0.0),
-                            'temperature': segment.get('temperature', 0.0),
-                            'tokens': segment.get('tokens', [])
-                        }
-                        # Just add as dictionary rather than trying to create an object
-                        all_segments.append(segment_dict)
-                    else:
-                        # For object segments
-                        segment_dict = {
-                            'id': getattr(segment, 'id', 0),
-                            'seek': getattr(segment, 'seek', 0),
-                            'start': getattr(segment, 'start', 0) + time_offset,
-                            'end': getattr(segment, 'end', 0) + time_offset,
-                            'text': getattr(segment, 'text', ""),
-                            # Default values for required fields
-                            'avg_logprob': getattr(segment, 'avg_logprob', 0.0),
-                            'compression_ratio': getattr(segment, 'compression_ratio', 1.0),
-                            'no_speech_prob': getattr(segment, 'no_speech_prob', 0.0),
-                            'temperature': getattr(segment, 'temperature', 0.0),
-                            'tokens': getattr(segment, 'tokens', [])
-                        }
-                        
-                        try:
-                            # Try to create a proper segment object
-                            adj_segment = type(segment)(**segment_dict)
-                            adjusted_segments.append(adj_segment)
-                        except Exception as obj_error:
-                            print(f"Error creating segment object: {obj_error}")
-                            # Fallback to dictionary if object creation fails
-                            all_segments.append(segment_dict)
-                except Exception as e:
-                    print(f"Error processing segment: {e}")
-                    # Create minimal segment if everything else fails
-                    minimal_segment = {
-                        'id': 0,
-                        'start': time_offset,
-                        'end': time_offset + 1,  # 1 second default duration
-                        'text': "..."  # Placeholder for missing text
-                    }
-                    all_segments.append(minimal_segment)
-            
-            # Add adjusted segments to our complete list if any were created
-            if adjusted_segments:
-                all_segments.extend(adjusted_segments)
-                
-            seg_count = len(adjusted_segments) if adjusted_segments else "dictionary-based segments"
-            print(f"Chunk {i+1} processed: {seg_count}")
-            
-            # Count this as a successful chunk
-            successful_chunks += 1
-            
-            # Update time offset for the next chunk
-            time_offset += chunk_durations[i]
-            
-        except Exception as e:
-            print(f"Error processing chunk {i+1}: {str(e)}")
-            # Try to extract any useful information from the chunk if possible
-            try:
-                with open(chunk_path, "rb") as audio_file:
-                    # Try with text-only format as last resort
-                    simple_result = client.audio.transcriptions.create(
-                        model="whisper-1",
-                        file=audio_file,
-                        response_format="text"
-                    )
-                    
-                    if simple_result:
-                        print(f"Recovered text-only content from chunk {i+1}")
-                        # Add to full text
-                        full_text += str(simple_result) + " "
-                        
-                        # Create a simple segment
-                        basic_segment = {
-                            'id': len(all_segments),
-                            'start': time_offset,
-                            'end': time_offset + chunk_durations[i],
-                            'text': str(simple_result)
-                        }
-                        all_segments.append(basic_segment)
-            except Exception as recovery_error:
-                print(f"Recovery attempt also failed: {recovery_error}")
-        finally:
-            # Clean up the temporary chunk file
-            if os.path.exists(chunk_path):
-                os.unlink(chunk_path)
+                text_parts.append(chunk_result["text"])
+        
+        # Get segments from object or dictionary
+        segments_to_process = []
+        if hasattr(chunk_result, 'segments'):
+            segments_to_process = chunk_result.segments
+        elif isinstance(chunk_result, dict) and "segments" in chunk_result:
+            segments_to_process = chunk_result["segments"]
+        chunk_transcript = Transcript.from_segments(segments_to_process or [])
+        
+        # Skip segments that repeat audio already transcribed by the previous chunk
+        if overlap_sec:
+            overlap_end = time_offset + overlap_sec
+            chunk_transcript = chunk_transcript.take(
+                j for j, (start, end, text) in enumerate(chunk_transcript.rows())
+                if not _is_overlap_duplicate(start + time_offset, end + time_offset, text, overlap_end,
+                                             covered_until, recent_texts)
+            )
+        
+        chunk_start_index = len(transcript)
+        transcript.extend(chunk_transcript, offset=time_offset)
+        
+        # Remember where this chunk's transcript ends for overlap de-duplication
+        if track_coverage:
+            for kept_end, kept_text in zip(transcript.ends[chunk_start_index:], transcript.texts[chunk_start_index:]):
+                if kept_end >= covered_until:
+                    covered_until = kept_end
+                    recent_texts = (recent_texts + [_normalize_text(kept_text)])[-OVERLAP_TEXT_MEMORY:]
+        if overlap_sec:
+            text_parts.append(" ".join(text.strip() for text in chunk_transcript.texts))
+        
+        logger.info(f"Chunk {i+1} processed: {len(chunk_transcript)} segments")
+        
+        # Count this as a successful chunk
+        successful_chunks += 1
+    
+    full_text = " ".join(text_parts).strip()
+    transcript.text = full_text
     
     # Print summary of processing
-    print(f"Processed {successful_chunks} of {len(chunk_files)} chunks successfully")
-    print(f"Collected {len(all_segments)} segments in total")
+    logger.info(f"Processed {successful_chunks} of {len(chunk_files)} chunks successfully")
+    logger.info(f"Collected {len(transcript)} segments in total")
     
     # If we have no segments but some text, create at least one segment
-    if not all_segments and full_text:
-        print("Creating fallback segment from collected text")
-        all_segments = [{
-            'id': 0,
-            'start': 0,
-            'end': sum(chunk_durations),  # Use total duration
-            'text': full_text.strip()
-        }]
+    if not len(transcript) and full_text:
+        logger.warning("Creating fallback segment from collected text")
+        transcript.append(0, sum(chunk_durations), full_text)  # Use total duration
     
     # Error if no segments were collected and no text was found
-    if not all_segments and not full_text:
+    if not len(transcript) and not full_text:
         raise ValueError("No transcription segments or text were collected from any chunk")
     
     # Handle the case where we don't have a valid template but have segments
     if template is None:
-        print("No template structure found. Creating dictionary response.")
+        logger.warning("No template structure found. Creating dictionary response.")
         # Create a simple dictionary response format
         combined_result = {
-            "text": full_text.strip(),
-            "segments": all_segments,
+            "text": full_text,
+            "segments": transcript,
             "language": "en"  # Default language
         }
     else:
-        # Use the template structure for the response format
+        # Use the template structure for the response format; the segments stay
+        # a Transcript and are only turned into dictionaries when serialized
         combined_result = template
-        
-        # Ensure text field is set
         if hasattr(combined_result, 'text'):
-            combined_result.text = full_text.strip()
-        
-        # Handle segments based on whether they're objects or dictionaries
-        all_dict_segments = all(isinstance(s, dict) for s in all_segments)
-        
-        if all_dict_segments and hasattr(combined_result, 'segments'):
-            # If we're working with dictionary segments, ensure consistent format
-            combined_result.segments = all_segments 
-        elif not all_dict_segments and hasattr(combined_result, 'segments'):
-            # Mix of objects and dictionaries - use only objects
-            combined_result.segments = [s for s in all_segments if not isinstance(s, dict)]
-        else:
-            # Fallback - just attach segments as a property
-            combined_result.segments = all_segments
+            combined_result.text = full_text
+        combined_result.segments = transcript
+    
+    merge_span.finish(count=len(transcript))
+    
+    # The checkpoint is only needed until every chunk has a full result
+    if checkpoint and all(outcome[0] == "result" for outcome in chunk_outcomes):
+        checkpoint.clear()
     
     # Final progress update if callback provided
     if progress_callback:
@@ -496,274 +441,390 @@ def process_audio_chunks(client, chunk_files, progress_callback=None):
     
     return combined_result
 
-def get_audio_duration(audio_data):
+def _create_transcription(client, audio, chunk=None, **options):
     """
-    Get the duration of an audio segment in milliseconds.
+    Send one Whisper request through the shared rate limiter and retry layer.
     
     Args:
-        audio_data: The file-like audio data
+        client: OpenAI client instance
+        audio: AudioSource or path to the audio file to upload
+        chunk: Chunk number, recorded on the request's timing span
+        **options: Extra arguments for client.audio.transcriptions.create
         
     Returns:
-        Duration in milliseconds
+        The Whisper API response
     """
-    temp_path = None
+    source = audio if isinstance(audio, AudioSource) else AudioSource.from_path(audio)
+    
+    def request():
+        # Reopen the audio on every attempt so a retry uploads it from the start
+        with source.reader() as audio_file:
+            return client.audio.transcriptions.create(
+                model=WHISPER_MODEL,
+                file=audio_file,
+                **options
+            )
+    
+    return call_with_retry(
+        request,
+        api="audio",
+        chunk=chunk,
+        response_format=options.get("response_format"),
+        bytes=source.size
+    )
+
+def _transcribe_chunk(client, chunk_path, index, chunk_duration):
+    """
+    Transcribe a single chunk file, falling back to simpler response formats on errors.
+    Safe to run in a worker thread; the chunk file is always deleted afterwards.
+    
+    Args:
+        client: OpenAI client instance
+        chunk_path: Path to the audio chunk
+        index: Position of the chunk, used for logging
+        chunk_duration: Duration of the chunk in seconds
+        
+    Returns:
+        ("result", transcription) on success, ("text", text) if only plain text
+        could be recovered, or None if the chunk could not be transcribed
+    """
+    if chunk_path is None:
+        logger.warning(f"No audio available for chunk {index+1}. Skipping.")
+        return None
+    
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-            temp_audio.write(audio_data.read())
-            temp_path = temp_audio.name
+        # Verify chunk size is within API limits
+        file_size = os.path.getsize(chunk_path)
+        if file_size > WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB:
+            logger.warning(f"Warning: Chunk {index+1} exceeds Whisper's limit ({file_size/BYTES_PER_MB:.2f} MB). Skipping.")
+            return None
+        
+        # Transcribe this chunk with backup response handling. Transient errors
+        # (rate limits, server errors) are retried with the same format inside
+        # _create_transcription; only other errors fall back to a simpler format.
+        try:
+            # First attempt with verbose_json format
+            chunk_result = _create_transcription(
+                client,
+                chunk_path,
+                chunk=index+1,
+                response_format="verbose_json",
+                timestamp_granularities=["segment"],
+            )
+        except Exception as api_error:
+            if is_transient_error(api_error):
+                raise
+            logger.warning(f"Error with verbose_json format: {str(api_error)}")
+            logger.warning("Retrying with standard JSON format...")
             
-        audio_data.seek(0)  # Reset file pointer
-        audio = AudioSegment.from_file(temp_path)
-        return len(audio)
+            # Retry with standard JSON format if verbose_json fails
+            chunk_result = _create_transcription(client, chunk_path, chunk=index+1, response_format="json")
+            
+            # Convert simple response to our needed format
+            if isinstance(chunk_result, dict):
+                # Just extract text if we only get a simple response
+                chunk_text = chunk_result.get("text", "")
+                
+                # Create a minimal segment covering the whole chunk
+                chunk_segments = [{
+                    "id": 0,
+                    "start": 0,
+                    "end": chunk_duration,
+                    "text": chunk_text
+                }]
+                
+                chunk_result = SimpleResponse(chunk_text, chunk_segments)
+        
+        return ("result", chunk_result)
+    
     except Exception as e:
-        print(f"Error getting audio duration: {str(e)}")
-        # Provide a fallback estimation based on file size
-        # Assuming average quality audio (16-bit PCM stereo at 44.1kHz)
-        # ~10MB per minute of audio
-        audio_data.seek(0, 2)  # Seek to end
-        file_size_bytes = audio_data.tell()
-        audio_data.seek(0)  # Reset
+        logger.error(f"Error processing chunk {index+1}: {str(e)}")
+        if is_transient_error(e):
+            # Retries are already exhausted; another format would only add load
+            return None
         
-        estimated_duration_ms = (file_size_bytes / (10 * 1024 * 1024)) * 60 * 1000
-        print(f"Using estimated duration based on file size: {estimated_duration_ms/60000:.1f} minutes")
-        return estimated_duration_ms
+        # Try to extract any useful information from the chunk if possible
+        try:
+            # Try with text-only format as last resort
+            simple_result = _create_transcription(client, chunk_path, chunk=index+1, response_format="text")
+            
+            if simple_result:
+                logger.info(f"Recovered text-only content from chunk {index+1}")
+                return ("text", str(simple_result))
+        except Exception as recovery_error:
+            logger.warning(f"Recovery attempt also failed: {recovery_error}")
+        return None
     finally:
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Clean up the temporary chunk file
+        if os.path.exists(chunk_path):
+            os.unlink(chunk_path)
+
+def _normalize_text(text):
+    """Lower-case text and strip punctuation so repeated phrases compare equal."""
+    return " ".join("".join(c for c in text.lower() if c.isalnum() or c.isspace()).split())
 
-def chunk_audio(audio_data, segment_duration_ms):
+def _is_overlap_duplicate(start, end, text, overlap_end, covered_until, recent_texts):
     """
-    Split audio into chunks of specified duration with stricter size control.
-    Ensures the entire audio file is covered by creating sequential chunks.
+    Decide whether a segment from the overlapping head of a chunk was already
+    transcribed by the previous chunk.
     
     Args:
-        audio_data: The file-like audio data
-        segment_duration_ms: Duration of each segment in milliseconds
-    
+        start: Start of the segment in the original audio, in seconds
+        end: End of the segment in the original audio, in seconds
+        text: Text of the segment
+        overlap_end: End of the overlapping region in the original audio, in seconds
+        covered_until: End time of the last segment already kept, in seconds
+        recent_texts: Normalized text of the last few kept segments
+        
     Returns:
-        List of temporary file paths containing audio chunks
-    """
-    # Save the audio to a temporary file, preserving original format
-    content_type = getattr(audio_data, 'type', None)
-    suffix = ".mp3"  # Default
-    
-    # Try to detect file format from content_type if available
-    if content_type:
-        if 'wav' in content_type.lower():
-            suffix = ".wav"
-        elif 'mp3' in content_type.lower():
-            suffix = ".mp3"
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_audio:
-        temp_audio.write(audio_data.read())
-        audio_data.seek(0)  # Reset file pointer
-        temp_path = temp_audio.name
-    
-    # Load the audio file (pydub can auto-detect format)
-    audio = AudioSegment.from_file(temp_path)
-    total_duration = len(audio)
-    chunk_files = []
-    position = 0  # Current position in the audio in milliseconds
-    
-    # Print total duration for debugging
-    print(f"Total audio duration: {total_duration/1000:.2f} seconds ({total_duration/60000:.1f} minutes)")
-    
-    # Calculate actual max chunk size in bytes (with margin for safety)
-    max_chunk_size_bytes = int(WHISPER_SIZE_LIMIT_MB * 0.85 * BYTES_PER_MB)  # 85% of limit for safety
+        True if the segment should be dropped
+    """
+    if start >= overlap_end:
+        return False
     
-    # Calculate approximately how many chunks we'll need for continuous coverage
-    estimated_chunks = math.ceil(total_duration / segment_duration_ms)
-    print(f"Preparing to create approximately {estimated_chunks} chunks")
-    print(f"Target chunk duration: {segment_duration_ms/1000:.1f} seconds ({segment_duration_ms/60000:.1f} minutes)")
+    # Entirely inside audio the previous chunk already covered
+    if end <= covered_until:
+        return True
     
-    # Continue chunking until we've covered the entire file
-    while position < total_duration:
-        # Calculate end time for this chunk
-        end_position = min(position + segment_duration_ms, total_duration)
-        chunk_number = len(chunk_files) + 1
-        
-        # Extract chunk with exact timing
-        chunk = audio[position:end_position]
-        chunk_duration = len(chunk) / 1000  # Duration in seconds
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as chunk_file:
-            chunk.export(chunk_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-            chunk_size = os.path.getsize(chunk_file.name)
-            
-            # If the chunk is too large, reduce its duration
-            if chunk_size > max_chunk_size_bytes:
-                # Before reducing, log the actual vs. estimated size
-                print(f"WARNING: Chunk {chunk_number} is {chunk_size/BYTES_PER_MB:.2f}MB, " +
-                      f"larger than our estimate for {segment_duration_ms/1000:.1f}s")
+    # Straddles the boundary: drop it only if its words were already kept
+    text = _normalize_text(text)
+    return bool(text) and start < covered_until and text in " ".join(recent_texts)
 
-                # Check a smaller sample to get more accurate size estimation
-                test_duration = 1 * 60 * 1000  # 1 minute test
-                test_chunk = audio[position:position + test_duration]
-                with tempfile.NamedTemporaryFile(delete=True, suffix=".mp3") as test_file:
-                    test_chunk.export(test_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-                    test_size = os.path.getsize(test_file.name)
+class SimpleResponse:
+    """Object-like transcription result built from a plain JSON response."""
+    def __init__(self, text, segments):
+        self.text = text
+        self.segments = segments
 
-                # Recalculate bytes per second based on this test
-                actual_bytes_per_ms = test_size / test_duration
-                print(f"Recalibrating size estimates: {actual_bytes_per_ms * 1000 / BYTES_PER_MB:.2f}MB per second")
-                
-                # Calculate safe duration based on actual size
-                safe_duration = int(max_chunk_size_bytes / actual_bytes_per_ms * 0.9)  # 90% of safe limit
-                
-                # Ensure it's not too small
-                min_duration = 2 * 60 * 1000  # 2 minutes minimum
-                safe_duration = max(safe_duration, min_duration)
-                
-                print(f"Adjusting to {safe_duration/1000:.1f} seconds per chunk")
-                
-                # Create a smaller chunk with recalibrated size
-                smaller_chunk = audio[position:position + safe_duration]
-                smaller_duration = len(smaller_chunk) / 1000  # Duration in seconds
-                
-                # Save the smaller chunk
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as smaller_file:
-                    smaller_chunk.export(smaller_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-                    smaller_size = os.path.getsize(smaller_file.name)
-                    
-                    if smaller_size <= max_chunk_size_bytes:
-                        # Delete the original chunk file
-                        os.unlink(chunk_file.name)
-                        # Use the smaller chunk instead
-                        chunk_files.append(smaller_file.name)
-                        print(f"Chunk {chunk_number}: Reduced size at {position/1000:.1f}s: " +
-                              f"{smaller_size / BYTES_PER_MB:.2f} MB, duration: {smaller_duration:.1f}s")
-                        # Update position by the actual processed duration
-                        position += safe_duration
-                    else:
-                        # If still too large, try an even smaller chunk
-                        os.unlink(smaller_file.name)
-                        
-                        # Fallback to 5-minute chunks and retry
-                        fallback_duration = min(5 * 60 * 1000, safe_duration // 2)
-                        final_attempt = audio[position:position + fallback_duration]
-                        final_duration = len(final_attempt) / 1000
+def _chunk_info(path, start_ms, duration_ms, overlap_ms=0):
+    """Describe an exported chunk so later stages never need to decode it again."""
+    return {"path": path, "start_ms": start_ms, "duration_ms": duration_ms, "overlap_ms": overlap_ms}
 
-                        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as final_file:
-                            final_attempt.export(final_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-                            if os.path.getsize(final_file.name) <= max_chunk_size_bytes:
-                                os.unlink(chunk_file.name)
-                                chunk_files.append(final_file.name)
-                                print(f"Chunk {chunk_number}: Final reduced at {position/1000:.1f}s: " +
-                                    f"{os.path.getsize(final_file.name) / BYTES_PER_MB:.2f} MB, " +
-                                    f"duration: {final_duration:.1f}s")
-                                position += fallback_duration
-                            else:
-                                os.unlink(final_file.name)
-                                os.unlink(chunk_file.name)
-                                print(f"Warning: Chunk at {position/1000:.1f}s still too large. " +
-                                      "Falling back to 2-minute chunks.")
-                                # Final fallback - use 2 minute chunks
-                                small_fallback = 2 * 60 * 1000
-                                last_attempt = audio[position:position + small_fallback]
-                                
-                                with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as last_file:
-                                    last_attempt.export(last_file.name, format="mp3", bitrate="64k", parameters=["-q:a", "4"])
-                                    chunk_files.append(last_file.name)
-                                    print(f"Emergency chunk: {os.path.getsize(last_file.name) / BYTES_PER_MB:.2f}MB, " +
-                                          f"duration: {len(last_attempt)/1000:.1f}s")
-                                position += small_fallback
-            else:
-                # If size is ok, add to our list
-                chunk_files.append(chunk_file.name)
-                print(f"Chunk {chunk_number}: Added at {position/1000:.1f}s: " +
-                      f"{chunk_size / BYTES_PER_MB:.2f} MB, duration: {chunk_duration:.1f}s")
-                # Update position to next segment
-                position = end_position
-    
-    # Clean up original temp file
-    os.unlink(temp_path)
-    
-    # Ensure we have at least one chunk
-    if not chunk_files:
-        raise ValueError("Could not create any valid audio chunks within size limits")
-    
-    # Verify chunking coverage 
-    print(f"\nChunking completion summary:")
-    print(f"- Original audio duration: {total_duration/1000:.2f} seconds ({total_duration/60000:.1f} minutes)")
-    
-    # Calculate and verify the total chunked duration
-    total_chunked_duration = 0
-    for i, chunk_path in enumerate(chunk_files):
-        try:
-            chunk_audio = AudioSegment.from_file(chunk_path)
-            chunk_duration = len(chunk_audio) / 1000
-            total_chunked_duration += chunk_duration
-            print(f"- Chunk {i+1}: {chunk_duration:.2f} seconds")
-        except Exception as e:
-            print(f"- Error verifying chunk {i+1}: {str(e)}")
-    
-    coverage_percentage = (total_chunked_duration * 1000 / total_duration) * 100
-    print(f"- Total chunked duration: {total_chunked_duration:.2f} seconds ({total_chunked_duration/60:.1f} minutes)")
-    print(f"- Coverage: {coverage_percentage:.1f}%")
-    
-    # Warn if coverage is significantly under 100%
-    if coverage_percentage < 95:
-        print(f"WARNING: Audio chunking coverage is only {coverage_percentage:.1f}%. Some parts of the audio may not be transcribed.")
+def _chunk_path(chunk):
+    """Return the file path for a chunk dict or a plain path."""
+    return chunk["path"] if isinstance(chunk, dict) else chunk
+
+def save_upload(audio_data):
+    """
+    Copy the upload to a temporary file on disk in fixed-size blocks.
     
-    return chunk_files
+    Args:
+        audio_data: The file-like audio data
+        
+    Returns:
+        Path to the temporary file (the caller is responsible for deleting it)
+    """
+    return copy_to_temp_file(audio_data)
 
-def calculate_chunk_duration(file_size_bytes, audio_duration_ms):
+def _export_chunk(audio_source, start_ms, duration_ms, overlap_ms=0):
     """
-    Calculate the optimal chunk duration based on file size and audio duration.
-    Start with 20-minute chunks, then reduce by 5 minutes until reaching a viable size (min 5 minutes).
+    Export one chunk to a temporary MP3 file.
     
     Args:
-        file_size_bytes: Size of the audio file in bytes
-        audio_duration_ms: Duration of the audio file in milliseconds
+        audio_source: Path to the source file on disk, or a decoded AudioSegment
+        start_ms: Start of the chunk in milliseconds
+        duration_ms: Length of the chunk in milliseconds
+        overlap_ms: Audio before start_ms to include as well, in milliseconds
         
     Returns:
-        Duration for each chunk in milliseconds
+        Chunk dict with the temporary file path, start_ms, duration_ms and overlap_ms
+    """
+    overlap_ms = min(overlap_ms, start_ms)
+    start_ms -= overlap_ms
+    duration_ms += overlap_ms
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as chunk_file:
+        chunk_path = chunk_file.name
+    
+    with span("encode", kind="chunk", start_ms=start_ms) as encode_span:
+        if is_decoded_audio(audio_source):
+            chunk = audio_source[start_ms:start_ms + duration_ms]
+            chunk.export(chunk_path, format="mp3", bitrate=f"{CHUNK_BITRATE_KBPS}k")
+            duration_ms = len(chunk)
+        else:
+            export_audio_range(audio_source, chunk_path, start_ms, duration_ms, bitrate=f"{CHUNK_BITRATE_KBPS}k")
+        encode_span.set(duration_ms=duration_ms, bytes=os.path.getsize(chunk_path))
+    return _chunk_info(chunk_path, start_ms, duration_ms, overlap_ms)
+
+def load_audio(audio_data):
     """
-    # Calculate bytes per millisecond for this specific audio file
-    bytes_per_ms = file_size_bytes / audio_duration_ms
+    Decode the audio once into an AudioSegment.
     
-    # Define common durations
-    minute_in_ms = 60 * 1000
-    twenty_min_ms = 20 * minute_in_ms
-    fifteen_min_ms = 15 * minute_in_ms
-    ten_min_ms = 10 * minute_in_ms
-    five_min_ms = 5 * minute_in_ms
+    Args:
+        audio_data: An AudioSource, the file-like audio data, or an already decoded AudioSegment
+        
+    Returns:
+        AudioSegment with the full decoded audio
+    """
+    if is_decoded_audio(audio_data):
+        return audio_data
     
-    # Start with 20-minute chunks and decrease if needed
-    chunk_durations = [twenty_min_ms, fifteen_min_ms, ten_min_ms, five_min_ms]
-    target_duration_ms = five_min_ms  # Default fallback
+    source, created = as_audio_source(audio_data)
+    try:
+        return source.decoded()
+    finally:
+        if created:
+            source.close()
+
+def get_audio_duration(audio_data):
+    """
+    Get the duration of an audio segment in milliseconds.
     
-    # Print size estimates for different durations
-    print("Calculating chunk size estimates:")
-    for duration in chunk_durations:
-        size_mb = (duration * bytes_per_ms) / BYTES_PER_MB
-        print(f"- {duration/minute_in_ms:.0f}min: {size_mb:.1f}MB")
+    Args:
+        audio_data: An AudioSource or the file-like audio data
+        
+    Returns:
+        Duration in milliseconds
+    """
+    source, created = as_audio_source(audio_data)
+    try:
+        return source.duration_ms()
+    except Exception as e:
+        logger.warning(f"Error getting audio duration: {str(e)}")
+        # Provide a fallback estimation based on file size
+        # Assuming average quality audio (16-bit PCM stereo at 44.1kHz)
+        # ~10MB per minute of audio
+        estimated_duration_ms = (source.size / (10 * 1024 * 1024)) * 60 * 1000
+        logger.warning(f"Using estimated duration based on file size: {estimated_duration_ms/60000:.1f} minutes")
+        return estimated_duration_ms
+    finally:
+        if created:
+            source.close()
+
+def max_chunk_duration_ms(bitrate_kbps=CHUNK_BITRATE_KBPS, size_limit_mb=WHISPER_SIZE_LIMIT_MB):
+    """
+    Longest chunk that is guaranteed to fit under the size limit once encoded.
+    Chunks are encoded as constant-bitrate MP3, so their size is the bitrate
+    times the duration plus a small, fixed container overhead.
     
-    print(f"API limit: {WHISPER_SIZE_LIMIT_MB}MB, Target size: {MAX_CHUNK_SIZE_MB}MB")
+    Args:
+        bitrate_kbps: Bitrate chunks are encoded at, in kilobits per second
+        size_limit_mb: Maximum allowed size of one chunk in MB
+        
+    Returns:
+        Maximum chunk duration in milliseconds
+    """
+    usable_bytes = size_limit_mb * BYTES_PER_MB * CHUNK_SIZE_MARGIN - MP3_OVERHEAD_BYTES
+    bytes_per_ms = bitrate_kbps * 1000 / 8 / 1000
+    return int(usable_bytes / bytes_per_ms)
+
+def plan_chunk_ranges(audio_source, total_duration_ms, max_duration_ms=None, overlap_ms=CHUNK_OVERLAP_MS):
+    """
+    Plan the chunk time ranges for a whole recording before anything is encoded.
+    Uses the fewest chunks that fit the size limit, spreads the audio evenly
+    across them and moves each cut back to the nearest quiet gap. The snapping
+    tolerance is bounded by the slack between the even split and the maximum
+    duration, so no chunk can exceed the limit.
     
-    # Find the largest viable chunk size, starting from largest
-    for duration in chunk_durations:
-        size_mb = (duration * bytes_per_ms) / BYTES_PER_MB
+    Args:
+        audio_source: Path to the source file on disk, or a decoded AudioSegment
+        total_duration_ms: Duration of the whole audio in milliseconds
+        max_duration_ms: Maximum chunk duration (defaults to max_chunk_duration_ms())
+        overlap_ms: Audio repeated at the start of each chunk after the first, in milliseconds
         
-        # If this size is acceptably below the limit, use it
-        if size_mb <= WHISPER_SIZE_LIMIT_MB * 0.9:
-            target_duration_ms = duration
-            break
-    
-    # If even 5-minute chunks are too large, calculate custom size
-    if target_duration_ms == five_min_ms:
-        five_min_size_mb = (five_min_ms * bytes_per_ms) / BYTES_PER_MB
+    Returns:
+        List of (start_ms, end_ms) tuples covering the audio without gaps
+    """
+    if max_duration_ms is None:
+        max_duration_ms = max_chunk_duration_ms()
+    # Overlap is encoded too, so it comes out of each chunk's budget
+    max_duration_ms -= overlap_ms
+    if max_duration_ms <= 0:
+        raise ValueError("Chunk overlap is longer than the maximum chunk duration")
+    
+    chunk_count = max(1, math.ceil(total_duration_ms / max_duration_ms))
+    even_duration_ms = math.ceil(total_duration_ms / chunk_count)
+    tolerance_ms = min(BOUNDARY_TOLERANCE_MS, even_duration_ms // 4, max_duration_ms - even_duration_ms)
+    
+    logger.info(f"Planning {chunk_count} chunks of ~{even_duration_ms/60000:.1f} minutes "
+          f"(max {max_duration_ms/60000:.1f} minutes at {CHUNK_BITRATE_KBPS} kbps)")
+    
+    cuts = [0]
+    for i in range(1, chunk_count):
+        nominal_ms = round(i * total_duration_ms / chunk_count)
+        cut_ms = snap_to_silence(audio_source, nominal_ms, total_duration_ms, tolerance_ms)
+        cuts.append(cut_ms if cut_ms > cuts[-1] else nominal_ms)
+    cuts.append(total_duration_ms)
+    
+    return [(start_ms, end_ms) for start_ms, end_ms in zip(cuts, cuts[1:]) if end_ms > start_ms]
+
+def _export_planned_chunks(audio_source, chunk_ranges, overlap_ms=CHUNK_OVERLAP_MS, skip=()):
+    """
+    Encode each planned range exactly once.
+    
+    Args:
+        audio_source: Path to the source file on disk, or a decoded AudioSegment
+        chunk_ranges: List of (start_ms, end_ms) tuples from plan_chunk_ranges
+        overlap_ms: Audio repeated at the start of each chunk after the first, in milliseconds
+        skip: Indexes of chunks that need no audio (e.g. already checkpointed);
+            they are returned with a path of None
         
-        if five_min_size_mb > WHISPER_SIZE_LIMIT_MB * 0.9:
-            # Calculate a more appropriate duration, aim for 80% of limit
-            target_duration_ms = int((WHISPER_SIZE_LIMIT_MB * 0.8 * BYTES_PER_MB) / bytes_per_ms)
-            # Round to nearest minute for cleaner splitting
-            target_duration_ms = int(target_duration_ms / minute_in_ms) * minute_in_ms
+    Returns:
+        List of chunk dicts with the temporary file path, start_ms, duration_ms and overlap_ms
+    """
+    chunk_files = []
+    try:
+        for i, (start_ms, end_ms) in enumerate(chunk_ranges):
+            if i in skip:
+                chunk_overlap_ms = min(overlap_ms, start_ms)
+                chunk_files.append(_chunk_info(None, start_ms - chunk_overlap_ms,
+                                               end_ms - start_ms + chunk_overlap_ms, chunk_overlap_ms))
+                continue
             
-            # Ensure at least 2 minutes per chunk
-            min_chunk_duration_ms = 2 * minute_in_ms
-            target_duration_ms = max(min_chunk_duration_ms, target_duration_ms)
+            chunk_info = _export_chunk(audio_source, start_ms, end_ms - start_ms, overlap_ms)
+            chunk_size = os.path.getsize(chunk_info["path"])
+            chunk_files.append(chunk_info)
+            logger.info(f"Chunk {len(chunk_files)}: {start_ms/1000:.1f}s to {end_ms/1000:.1f}s, "
+                  f"{chunk_size / BYTES_PER_MB:.2f} MB")
+            
+            # The planner guarantees this; a violation means the encoder ignored the bitrate
+            if chunk_size > WHISPER_SIZE_LIMIT_MB * BYTES_PER_MB:
+                raise ValueError(f"Chunk {len(chunk_files)} is {chunk_size/BYTES_PER_MB:.2f} MB, "
+                                 f"over the {WHISPER_SIZE_LIMIT_MB} MB limit")
+    except Exception:
+        # Don't leave partial chunk files behind
+        for chunk_info in chunk_files:
+            if chunk_info["path"] and os.path.exists(chunk_info["path"]):
+                os.unlink(chunk_info["path"])
+        raise
     
-    # Print the selected chunk duration for debugging
-    print(f"Selected chunk duration: {target_duration_ms/minute_in_ms:.1f} minutes")
+    return chunk_files
+
+def chunk_audio(audio_data, segment_duration_ms=None, overlap_ms=CHUNK_OVERLAP_MS):
+    """
+    Split decoded audio into chunks that each fit within the Whisper size limit.
+    Ensures the entire audio file is covered by creating sequential chunks.
+    
+    Args:
+        audio_data: A decoded AudioSegment (see load_audio) or the file-like audio data
+        segment_duration_ms: Maximum duration of each segment in milliseconds
+            (defaults to the longest chunk that fits the size limit)
+        overlap_ms: Audio repeated at the start of each chunk after the first, in milliseconds
     
-    return target_duration_ms
+    Returns:
+        List of chunk dicts with the temporary file path, start_ms, duration_ms and overlap_ms
+    """
+    # Decode only if the caller has not already done so
+    audio = load_audio(audio_data)
+    chunk_ranges = plan_chunk_ranges(audio, len(audio), segment_duration_ms, overlap_ms)
+    return _export_planned_chunks(audio, chunk_ranges, overlap_ms)
+
+def stream_chunk_audio(source_path, segment_duration_ms=None, total_duration_ms=None, overlap_ms=CHUNK_OVERLAP_MS):
+    """
+    Split an audio file on disk into chunks without decoding it into memory.
+    Each chunk is cut and encoded by ffmpeg directly from the source file, so
+    peak memory stays the same no matter how long the meeting is.
+    
+    Args:
+        source_path: Path to the source audio file
+        segment_duration_ms: Maximum duration of each segment in milliseconds
+            (defaults to the longest chunk that fits the size limit)
+        total_duration_ms: Duration of the source audio in milliseconds (probed if omitted)
+        overlap_ms: Audio repeated at the start of each chunk after the first, in milliseconds
+    
+    Returns:
+        List of chunk dicts with the temporary file path, start_ms, duration_ms and overlap_ms
+    """
+    if total_duration_ms is None:
+        total_duration_ms = probe_duration_ms(source_path)
+    chunk_ranges = plan_chunk_ranges(source_path, total_duration_ms, segment_duration_ms, overlap_ms)
+    return _export_planned_chunks(source_path, chunk_ranges, overlap_ms)
@@ -0,0 +1,143 @@
+"""
+Compact transcript representation used while merging and cleaning transcriptions.
+
+Whisper segments carry token lists and decoder statistics that nothing after
+the merge reads. Transcript keeps only what the app uses, as three columns:
+start and end times in float arrays, and a list of segment texts. Chunk
+results are appended a column at a time with their time offset applied in
+one pass, and the dictionary format of the cleaned transcript (used by the
+caches, the report and the HTTP service) is only built at the end.
+"""
+from array import array
+
+def _field(segment, name, default):
+    """Read a field from a dictionary or object segment."""
+    if isinstance(segment, dict):
+        return segment.get(name, default)
+    return getattr(segment, name, default)
+
+class Transcript:
+    """
+    Transcript segments stored as columns.
+
+    Args:
+        text: Full transcript text
+    """
+    __slots__ = ("text", "starts", "ends", "texts")
+
+    def __init__(self, text=""):
+        self.text = text
+        self.starts = array("d")  # Segment start times in seconds
+        self.ends = array("d")  # Segment end times in seconds
+        self.texts = []
+
+    @classmethod
+    def from_segments(cls, segments, text=""):
+        """
+        Read segments into columns.
+
+        Args:
+            segments: Dictionary or object segments with start, end and text fields
+                (Whisper API segments, cleaned segments or another Transcript)
+            text: Full transcript text
+
+        Returns:
+            Transcript with the segments in their original order
+        """
+        if isinstance(segments, Transcript):
+            return segments.take(range(len(segments)), text)
+        transcript = cls(text)
+        transcript.starts = array("d", [_field(segment, "start", 0) or 0 for segment in segments])
+        transcript.ends = array("d", [_field(segment, "end", 0) or 0 for segment in segments])
+        transcript.texts = [_field(segment, "text", "") or "" for segment in segments]
+        return transcript
+
+    @classmethod
+    def from_cleaned(cls, cleaned_transcript):
+        """
+        Read a cleaned transcript dictionary (see clean_transcript).
+
+        Args:
+            cleaned_transcript: Dictionary with "text" and "segments"
+
+        Returns:
+            Transcript with the same segments
+        """
+        return cls.from_segments(cleaned_transcript.get("segments") or [], cleaned_transcript.get("text", ""))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def append(self, start, end, text):
+        """Add one segment at the end."""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.texts.append(text)
+
+    def extend(self, other, offset=0.0):
+        """
+        Add all segments of another transcript, shifting their times by offset.
+
+        Args:
+            other: Transcript whose times are relative to offset (e.g. one chunk)
+            offset: Seconds added to every start and end time
+        """
+        if offset:
+            self.starts.extend(array("d", [start + offset for start in other.starts]))
+            self.ends.extend(array("d", [end + offset for end in other.ends]))
+        else:
+            self.starts.extend(other.starts)
+            self.ends.extend(other.ends)
+        self.texts.extend(other.texts)
+
+    def take(self, indices, text=None):
+        """
+        Return a new transcript with the segments at the given indices.
+
+        Args:
+            indices: Segment indices, in the order they should appear
+            text: Full text of the new transcript (this transcript's text if omitted)
+
+        Returns:
+            The selected segments as a new Transcript
+        """
+        indices = list(indices)
+        transcript = Transcript(self.text if text is None else text)
+        transcript.starts = array("d", [self.starts[i] for i in indices])
+        transcript.ends = array("d", [self.ends[i] for i in indices])
+        transcript.texts = [self.texts[i] for i in indices]
+        return transcript
+
+    def sorted_by_start(self):
+        """
+        Return the transcript in chronological order. Chunks are merged in
+        order, so this is usually the transcript itself and nothing is copied.
+        """
+        starts = self.starts
+        if all(starts[i] <= starts[i + 1] for i in range(len(starts) - 1)):
+            return self
+        # sorted() is stable, so segments with the same start keep their order
+        return self.take(sorted(range(len(starts)), key=starts.__getitem__))
+
+    def rows(self):
+        """Iterate over (start, end, text) tuples."""
+        return zip(self.starts, self.ends, self.texts)
+
+    def segment_dicts(self, with_ids=False):
+        """
+        Build one dictionary per segment.
+
+        Args:
+            with_ids: Include each segment's position as "id", as in Whisper API responses
+
+        Returns:
+            List of {"start", "end", "text"} dictionaries
+        """
+        if with_ids:
+            return [{"id": i, "start": start, "end": end, "text": text}
+                    for i, (start, end, text) in enumerate(self.rows())]
+        return [{"start": start, "end": end, "text": text} for start, end, text in self.rows()]
+
+    def to_cleaned(self):
+        """Return the cleaned transcript dictionary stored in caches and sent to the report."""
+        return {"text": self.text, "segments": self.segment_dicts()}